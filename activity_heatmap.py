@@ -0,0 +1,118 @@
+"""
+Activity Heatmap - Minute-resolution activity slots
+Stores each day as per-category 1440-minute bitmaps and builds heatmaps from them
+"""
+import base64
+from datetime import datetime, timedelta
+
+SLOTS_PER_DAY = 1440
+SLOT_BYTES = SLOTS_PER_DAY // 8
+SLOT_CATEGORIES = ['building', 'studying', 'applying', 'knowledge', 'pseudo_productive']
+PRODUCTIVE_CATEGORIES = ['building', 'studying', 'applying', 'knowledge']
+
+# Bit i of a day bitmap is minute i, so each hour is a contiguous 60-bit mask
+HOUR_MASKS = [((1 << 60) - 1) << (hour * 60) for hour in range(24)]
+
+
+def decode_slots(encoded):
+    """Decode a base64 minute bitmap into an int (bit i = minute i)"""
+    if not encoded:
+        return 0
+    try:
+        return int.from_bytes(base64.b64decode(encoded), 'little')
+    except (ValueError, TypeError):
+        return 0
+
+
+def encode_slots(bits):
+    """Encode a minute bitmap int as compact base64 (180 bytes raw)"""
+    return base64.b64encode(bits.to_bytes(SLOT_BYTES, 'little')).decode('ascii')
+
+
+def session_minute_range(start_time, duration_minutes):
+    """Return the [start, end) minute slots covered by a session, or None"""
+    if not start_time or not duration_minutes or duration_minutes <= 0:
+        return None
+    try:
+        start = datetime.strptime(start_time, '%H:%M:%S')
+    except ValueError:
+        return None
+
+    start_seconds = start.hour * 3600 + start.minute * 60 + start.second
+    end_seconds = start_seconds + duration_minutes * 60
+    start_slot = start_seconds // 60
+    end_slot = min(SLOTS_PER_DAY, int(-(-end_seconds // 60)))  # Ceil, clamped to midnight
+
+    if end_slot <= start_slot:
+        return None
+    return start_slot, end_slot
+
+
+def mark_slots(bits, start_slot, end_slot):
+    """Set minutes [start_slot, end_slot) in a bitmap int"""
+    return bits | (((1 << (end_slot - start_slot)) - 1) << start_slot)
+
+
+def hourly_minutes(bits):
+    """Count active minutes per hour of day for a bitmap"""
+    return [bin(bits & mask).count('1') for mask in HOUR_MASKS]
+
+
+class HeatmapCalculator:
+    def __init__(self, data_logger):
+        self.data_logger = data_logger
+
+    def _day_bits(self, day_data, categories):
+        """Union the requested category bitmaps for a single day"""
+        slots = day_data.get('minute_slots', {})
+        bits = 0
+        for category in categories:
+            bits |= decode_slots(slots.get(category))
+        return bits
+
+    def get_hourly_heatmap(self, start_date, end_date, categories=None):
+        """Active minutes per hour of day summed over a date range"""
+        categories = categories or PRODUCTIVE_CATEGORIES
+        totals = [0] * 24
+
+        for day_data in self.data_logger.iter_range_data(start_date, end_date):
+            bits = self._day_bits(day_data, categories)
+            if bits:
+                totals = [t + m for t, m in zip(totals, hourly_minutes(bits))]
+
+        return totals
+
+    def get_weekday_hour_heatmap(self, start_date, end_date, categories=None):
+        """Active minutes as a 7x24 grid (Mon..Sun by hour) over a date range"""
+        categories = categories or PRODUCTIVE_CATEGORIES
+        grid = [[0] * 24 for _ in range(7)]
+
+        for day_data in self.data_logger.iter_range_data(start_date, end_date):
+            bits = self._day_bits(day_data, categories)
+            if not bits:
+                continue
+            weekday = datetime.strptime(day_data['date'], '%Y-%m-%d').weekday()
+            grid[weekday] = [t + m for t, m in zip(grid[weekday], hourly_minutes(bits))]
+
+        return grid
+
+    def get_category_hourly_heatmaps(self, start_date, end_date):
+        """Per-category hour-of-day minutes over a date range"""
+        heatmaps = {category: [0] * 24 for category in SLOT_CATEGORIES}
+
+        for day_data in self.data_logger.iter_range_data(start_date, end_date):
+            slots = day_data.get('minute_slots', {})
+            for category in SLOT_CATEGORIES:
+                bits = decode_slots(slots.get(category))
+                if bits:
+                    heatmaps[category] = [t + m for t, m in zip(heatmaps[category], hourly_minutes(bits))]
+
+        return heatmaps
+
+    def get_peak_hours(self, days_back=90, top_n=3):
+        """Hours of the day with the most productive minutes recently"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back - 1)
+        totals = self.get_hourly_heatmap(start_date, end_date)
+        ranked = sorted(range(24), key=lambda hour: totals[hour], reverse=True)
+        return [{'hour': hour, 'minutes': totals[hour]} for hour in ranked[:top_n] if totals[hour] > 0]
@@ -2,31 +2,48 @@
 Activity Monitor - Real-time activity detection
 Tracks active windows, applications, and detects idle time
 """
-import psutil
-import time
 import json
-from datetime import datetime
 from category_engine import CategoryEngine
+from clock import SYSTEM_CLOCK
 
-try:
-    import win32gui
-    import win32process
-    WINDOWS_AVAILABLE = True
-except ImportError:
-    WINDOWS_AVAILABLE = False
+# psutil and pywin32 are slow to import, so they load on the monitor
+# thread's first update rather than before the window can appear
+psutil = None
+win32gui = None
+win32process = None
+WINDOWS_AVAILABLE = None
+
+
+def load_platform_modules():
+    """Import psutil/pywin32 on first use"""
+    global psutil, win32gui, win32process, WINDOWS_AVAILABLE
+    if WINDOWS_AVAILABLE is not None:
+        return
+    import psutil as _psutil
+    psutil = _psutil
+    try:
+        import win32gui as _win32gui
+        import win32process as _win32process
+        win32gui, win32process = _win32gui, _win32process
+        WINDOWS_AVAILABLE = True
+    except ImportError:
+        WINDOWS_AVAILABLE = False
 
 class ActivityMonitor:
-    def __init__(self, data_logger):
+    def __init__(self, data_logger, clock=None):
         self.data_logger = data_logger
+        self.clock = clock or SYSTEM_CLOCK
         self.category_engine = CategoryEngine()
         self.current_app = None
         self.current_window_title = ""
-        self.last_activity_time = time.time()
+        self.last_activity_time = self.clock.monotonic()
         self.idle_threshold = 5 * 60  # 5 minutes in seconds
-        self.session_start = None
+        self.session_start = None  # Wall time the session started
+        self._session_start_mono = None
         
     def get_active_window_info(self):
         """Get information about the currently active window"""
+        load_platform_modules()
         if not WINDOWS_AVAILABLE:
             return "Unknown", "Unknown"
             
@@ -56,6 +73,7 @@ class ActivityMonitor:
         # For simplicity, we'll consider the system active if CPU usage > 1%
         # In a full implementation, you'd use keyboard/mouse hooks
         try:
+            load_platform_modules()
             cpu_percent = psutil.cpu_percent(interval=0.1)
             return cpu_percent > 1.0
         except:
@@ -64,10 +82,10 @@ class ActivityMonitor:
     def is_idle(self):
         """Check if user has been idle for too long"""
         if not self.detect_keyboard_activity():
-            if time.time() - self.last_activity_time > self.idle_threshold:
+            if self.clock.monotonic() - self.last_activity_time > self.idle_threshold:
                 return True
         else:
-            self.last_activity_time = time.time()
+            self.last_activity_time = self.clock.monotonic()
         return False
     
     def update(self):
@@ -92,7 +110,8 @@ class ActivityMonitor:
     
     def start_new_session(self, app_name, window_title):
         """Start tracking a new application session"""
-        self.session_start = datetime.now()
+        self.session_start = self.clock.now()
+        self._session_start_mono = self.clock.monotonic()
         category = self.category_engine.categorize_activity(app_name, window_title)
         
         # Log session start
@@ -109,11 +128,11 @@ class ActivityMonitor:
     def end_current_session(self):
         """End the current application session"""
         if self.session_start:
-            duration = (datetime.now() - self.session_start).total_seconds() / 60  # minutes
+            duration = (self.clock.monotonic() - self._session_start_mono) / 60  # minutes
             
             if duration > 0.5:  # Only log sessions longer than 30 seconds
                 session_data = {
-                    'end_time': datetime.now().strftime('%H:%M:%S'),
+                    'end_time': self.clock.now().strftime('%H:%M:%S'),
                     'duration_minutes': round(duration, 1),
                     'application': self.current_app,
                     'window_title': self.current_window_title
@@ -124,7 +143,7 @@ class ActivityMonitor:
     def get_current_activity(self):
         """Get current activity information for dashboard"""
         if self.session_start and self.current_app:
-            duration = (datetime.now() - self.session_start).total_seconds() / 60
+            duration = (self.clock.monotonic() - self._session_start_mono) / 60
             category = self.category_engine.categorize_activity(self.current_app, self.current_window_title)
             
             return {
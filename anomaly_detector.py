@@ -0,0 +1,215 @@
+"""
+Anomaly Detector - Streaming robust outlier detection on productivity series
+Flags unusual days (and optionally hours) with a rolling median/MAD z-score;
+days are compared with the same weekday so a normal weekend is never an outlier
+"""
+import bisect
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from activity_heatmap import PRODUCTIVE_CATEGORIES, decode_slots, hourly_minutes
+from clock import SYSTEM_CLOCK
+
+MAD_TO_SIGMA = 0.6745  # Makes the MAD-based z comparable to a normal z-score
+STATE_VERSION = 2  # 2: one daily window per weekday
+
+# Series checked per day and which direction counts as a problem
+DAILY_SERIES = {
+    'total_productive': 'low',
+    'pseudo_productive': 'high'
+}
+
+
+class RollingRobustWindow:
+    """Fixed-size window; each update costs O(window) regardless of history length"""
+
+    def __init__(self, size, values=None):
+        self.size = size
+        self.values = deque(values or [], maxlen=size)
+        self.sorted_values = sorted(self.values)
+
+    def stats(self):
+        """Current median and MAD of the window"""
+        n = len(self.sorted_values)
+        if n == 0:
+            return 0.0, 0.0
+        mid = n // 2
+        values = self.sorted_values
+        median = values[mid] if n % 2 else (values[mid - 1] + values[mid]) / 2
+
+        # Deviations grow outwards from the median on both sides of the sorted list,
+        # so merging the two runs up to the middle gives the MAD without a sort
+        left = bisect.bisect_left(values, median) - 1
+        right = left + 1
+        deviations = []
+        while len(deviations) <= mid:
+            if right < n and (left < 0 or values[right] - median <= median - values[left]):
+                deviations.append(values[right] - median)
+                right += 1
+            else:
+                deviations.append(median - values[left])
+                left -= 1
+        mad = deviations[mid] if n % 2 else (deviations[mid - 1] + deviations[mid]) / 2
+        return median, mad
+
+    def push(self, value):
+        """Add a value, evicting the oldest once full"""
+        if len(self.values) == self.size:
+            oldest = self.values[0]
+            del self.sorted_values[bisect.bisect_left(self.sorted_values, oldest)]
+        self.values.append(value)
+        bisect.insort(self.sorted_values, value)
+
+
+class StreamingAnomalyDetector:
+    def __init__(self, data_dir="productivity_data", window=28, threshold=3.5,
+                 min_samples=7, min_scale=15, hourly=False, max_flags=60, clock=None,
+                 weekday_window=8, weekday_min_samples=4):
+        self.state_file = os.path.join(data_dir, "anomaly_state.json")
+        self.clock = clock or SYSTEM_CLOCK
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.min_scale = min_scale  # Minutes; stops a perfectly steady history flagging tiny changes
+        self.hourly = hourly
+        self.max_flags = max_flags
+        self.weekday_window = weekday_window  # Same-weekday samples per baseline (8 = two months)
+        self.weekday_min_samples = weekday_min_samples
+        self._lock = threading.Lock()
+
+        self.last_date = None
+        self.daily_windows = self._empty_daily_windows()
+        self.hourly_windows = [RollingRobustWindow(window) for _ in range(24)]
+        self.flags = []
+        self.load_state()
+
+    def _empty_daily_windows(self):
+        """series -> one window per weekday (Monday first)"""
+        return {series: [RollingRobustWindow(self.weekday_window) for _ in range(7)] for series in DAILY_SERIES}
+
+    def load_state(self):
+        """Load persisted windows and recent flags"""
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if state.get('version') != STATE_VERSION:
+                return  # Older layout: catch_up rebuilds the baselines from the day files
+            self.last_date = state['last_date']
+            self.daily_windows = {series: [RollingRobustWindow(self.weekday_window, values)
+                                           for values in state['daily'][series]]
+                                  for series in DAILY_SERIES}
+            self.hourly_windows = [RollingRobustWindow(self.window, values) for values in state['hourly']]
+            self.flags = state['flags']
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            print(f"Error loading anomaly state, rebuilding: {e}")
+
+    def save_state(self):
+        """Persist windows and recent flags"""
+        state = {
+            'version': STATE_VERSION,
+            'last_date': self.last_date,
+            'daily': {series: [list(w.values) for w in windows] for series, windows in self.daily_windows.items()},
+            'hourly': [list(w.values) for w in self.hourly_windows],
+            'flags': self.flags
+        }
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            print(f"Error saving anomaly state: {e}")
+
+    def _score(self, window, value, min_samples):
+        """Robust z-score of value against the window, or None while warming up"""
+        if len(window.values) < min_samples:
+            return None, 0.0
+        median, mad = window.stats()
+        return MAD_TO_SIGMA * (value - median) / max(mad, self.min_scale), median
+
+    def _check(self, window, value, direction, date_str, series, hour=None):
+        """Score a value, then add it to its window"""
+        # Hourly buckets use the day-count window; daily series use same-weekday windows
+        min_samples = self.min_samples if hour is not None else self.weekday_min_samples
+        z, median = self._score(window, value, min_samples)
+        window.push(value)
+
+        if z is None:
+            return None
+        if (direction == 'low' and z <= -self.threshold) or (direction == 'high' and z >= self.threshold) \
+                or (direction == 'both' and abs(z) >= self.threshold):
+            flag = {
+                'date': date_str,
+                'series': series,
+                'value': round(value, 1),
+                'median': round(median, 1),
+                'z': round(z, 2),
+                'direction': 'low' if z < 0 else 'high'
+            }
+            if hour is not None:
+                flag['hour'] = hour
+            return flag
+        return None
+
+    def ingest_day(self, day_data, persist=True):
+        """Score a closed day against its rolling baseline; returns the new flags"""
+        with self._lock:
+            date_str = day_data['date']
+            if self.last_date is not None and date_str <= self.last_date:
+                return []
+
+            summary = day_data.get('daily_summary', {})
+            weekday = datetime.strptime(date_str, '%Y-%m-%d').weekday()
+            new_flags = []
+            for series, direction in DAILY_SERIES.items():
+                flag = self._check(self.daily_windows[series][weekday], float(summary.get(series, 0) or 0),
+                                   direction, date_str, series)
+                if flag:
+                    new_flags.append(flag)
+
+            if self.hourly:
+                slots = day_data.get('minute_slots', {})
+                bits = 0
+                for category in PRODUCTIVE_CATEGORIES:
+                    bits |= decode_slots(slots.get(category))
+                for hour, minutes in enumerate(hourly_minutes(bits)):
+                    flag = self._check(self.hourly_windows[hour], float(minutes), 'both',
+                                       date_str, 'hourly_productive', hour)
+                    if flag:
+                        new_flags.append(flag)
+
+            self.last_date = date_str
+            self.flags = (self.flags + new_flags)[-self.max_flags:]
+            if persist:
+                self.save_state()
+            return new_flags
+
+    def catch_up(self, data_logger, until=None):
+        """Score closed days missing since the last run, up to until (yesterday by default;
+        at most one window back)"""
+        yesterday = until or self.clock.now() - timedelta(days=1)
+        yesterday = datetime(yesterday.year, yesterday.month, yesterday.day)
+        start = yesterday - timedelta(days=max(self.window, self.weekday_window * 7) - 1)
+
+        with self._lock:
+            if self.last_date is not None:
+                start = max(start, datetime.strptime(self.last_date, '%Y-%m-%d') + timedelta(days=1))
+        if start > yesterday:
+            return 0
+
+        count = 0
+        for day_data in data_logger.iter_range_data(start, yesterday):
+            self.ingest_day(day_data, persist=False)
+            count += 1
+        with self._lock:
+            self.save_state()
+        return count
+
+    def get_recent_flags(self, days=7):
+        """Flags raised for days within the last `days` days"""
+        cutoff = (self.clock.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        with self._lock:
+            return [flag for flag in self.flags if flag['date'] >= cutoff]
@@ -0,0 +1,241 @@
+"""
+Benchmark Suite - Storage, stats and trend performance
+Generates deterministic synthetic history and times the analytics stack,
+writing machine-readable JSON so runs can be compared across commits
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from activity_heatmap import encode_slots, mark_slots, session_minute_range
+from category_engine import CategoryEngine
+from clock import VirtualClock
+from data_logger import DataLogger
+from stats_calculator import StatsCalculator
+from switch_analyzer import SwitchAnalyzer
+from trend_analyzer import TrendAnalyzer
+
+SYNTHETIC_APPS = [
+    ("code.exe", "Building"), ("pycharm64.exe", "Building"), ("powershell.exe", "Building"),
+    ("acrobat.exe", "Studying"), ("notion.exe", "Studying"),
+    ("chrome.exe", "Knowledge"), ("firefox.exe", "Knowledge"),
+    ("chrome.exe", "Applying"), ("explorer.exe", "Knowledge")
+]
+# Fixed "today" for the history and every stats/trend call, so the weekday mix and
+# month boundaries are identical on every run
+BENCHMARK_TODAY = datetime(2025, 6, 18, 17, 0)
+TITLE_WORDS = ["react", "python", "linkedin jobs", "lecture", "youtube", "docs", "github",
+               "stack overflow", "reddit", "canvas", "resume", "notes", "tutorial", "api"]
+
+
+class SyntheticHistory:
+    """Deterministic multi-year session history written in DataLogger's day-file format"""
+
+    def __init__(self, years=1, sessions_per_day=40, title_cardinality=500, seed=42, today=BENCHMARK_TODAY):
+        self.years = years
+        self.today = today
+        self.sessions_per_day = sessions_per_day
+        self.title_cardinality = title_cardinality
+        self.seed = seed
+
+    def _titles(self, rng):
+        """Build the pool of distinct window titles"""
+        return [f"{rng.choice(TITLE_WORDS)} {i} - {rng.choice(TITLE_WORDS)}" for i in range(self.title_cardinality)]
+
+    def _build_day(self, rng, date, titles):
+        """Build one day's data with sessions, summary and minute slots"""
+        day = {
+            "date": date.strftime('%Y-%m-%d'),
+            "sessions": [],
+            "daily_summary": {
+                "building": 0, "studying": 0, "applying": 0, "knowledge": 0,
+                "pseudo_productive": 0, "context_switches": 0, "total_productive": 0
+            },
+            "minute_slots": {}
+        }
+        slot_bits = {}
+        switches = SwitchAnalyzer()
+        clock = 8 * 3600 + rng.randint(0, 3600)
+
+        for _ in range(self.sessions_per_day):
+            app, category = rng.choice(SYNTHETIC_APPS)
+            duration = round(rng.uniform(1, 25), 1)
+            if clock + duration * 60 >= 24 * 3600:
+                break
+            start_time = time.strftime('%H:%M:%S', time.gmtime(clock))
+            clock += int(duration * 60) + rng.randint(0, 300)
+            is_pseudo = rng.random() < 0.15
+
+            session = {
+                'start_time': start_time,
+                'end_time': time.strftime('%H:%M:%S', time.gmtime(clock)),
+                'application': app,
+                'window_title': rng.choice(titles),
+                'category': category,
+                'is_pseudo_productive': is_pseudo,
+                'duration_minutes': duration
+            }
+            switches.add_session(session)
+            day["sessions"].append(session)
+
+            summary = day["daily_summary"]
+            summary["context_switches"] += 1
+            slot_key = 'pseudo_productive' if is_pseudo else category.lower()
+            if is_pseudo:
+                summary["pseudo_productive"] += duration
+            else:
+                summary[slot_key] += duration
+                summary["total_productive"] += duration
+
+            slot_range = session_minute_range(start_time, duration)
+            if slot_range:
+                slot_bits[slot_key] = mark_slots(slot_bits.get(slot_key, 0), *slot_range)
+
+        day["minute_slots"] = {key: encode_slots(bits) for key, bits in slot_bits.items()}
+        day["fragmentation"] = switches.to_dict()
+        return day
+
+    def write(self, data_dir):
+        """Write the history ending on self.today into data_dir; returns number of days"""
+        rng = random.Random(self.seed)
+        titles = self._titles(rng)
+        today = self.today
+        days = self.years * 365
+
+        os.makedirs(data_dir, exist_ok=True)
+        for offset in range(days, 0, -1):
+            date = today - timedelta(days=offset - 1)
+            with open(os.path.join(data_dir, f"{date.strftime('%Y-%m-%d')}.json"), 'w') as f:
+                json.dump(self._build_day(rng, date, titles), f)
+        return days
+
+
+def time_call(func, repeats, setup=None):
+    """Time func over several runs; returns min/median/mean in milliseconds"""
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'repeats': repeats,
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.mean(samples), 3)
+    }
+
+
+def run_benchmarks(data_dir, repeats=5, categorize_ops=20000, today=BENCHMARK_TODAY):
+    """Run every benchmark against an existing data directory, as of the history's last day"""
+    logger = DataLogger(data_dir=data_dir)
+    calculator = StatsCalculator(logger, clock=VirtualClock(today))
+    trends = TrendAnalyzer(calculator)
+    engine = CategoryEngine()
+    now = today
+    monday = now - timedelta(days=now.weekday())
+
+    def cold():
+        calculator.cache.clear()
+        trends.cache.clear()
+
+    results = {
+        'storage.week_read': time_call(lambda: logger.get_weekly_data(monday), repeats),
+        'storage.month_read': time_call(lambda: logger.get_monthly_data(now.year, now.month), repeats),
+        'storage.year_range_read': time_call(lambda: logger.get_range_data(now - timedelta(days=364), now), repeats),
+        'stats.weekly': time_call(lambda: calculator.calculate_weekly_stats(monday), repeats, setup=cold),
+        'stats.monthly': time_call(lambda: calculator.calculate_monthly_stats(now.year, now.month), repeats, setup=cold),
+        'stats.yearly': time_call(lambda: calculator.calculate_yearly_stats(now.year), repeats, setup=cold),
+        'stats.yearly_cached': time_call(lambda: calculator.calculate_yearly_stats(now.year), repeats),
+        'trends.productivity_insights': time_call(trends.get_productivity_insights, repeats, setup=cold),
+        'trends.forecasts': time_call(trends.get_forecasts, repeats),
+    }
+
+    rng = random.Random(0)
+    samples = [(app, f"{rng.choice(TITLE_WORDS)} - {rng.choice(TITLE_WORDS)}") for app, _ in SYNTHETIC_APPS]
+
+    def categorize():
+        for i in range(categorize_ops):
+            app, title = samples[i % len(samples)]
+            engine.categorize_activity(app, title)
+            engine.is_pseudo_productive(app, title)
+
+    categorize_timing = time_call(categorize, repeats)
+    categorize_timing['ops'] = categorize_ops
+    categorize_timing['ops_per_sec'] = round(categorize_ops / (categorize_timing['median_ms'] / 1000)) if categorize_timing['median_ms'] else None
+    results['category_engine.throughput'] = categorize_timing
+
+    return results
+
+
+def git_revision():
+    """Current commit hash, if run inside a git checkout"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage, stats and trends over synthetic history")
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--sessions-per-day", type=int, default=40)
+    parser.add_argument("--titles", type=int, default=500, help="distinct window titles")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--data-dir", help="reuse/keep the synthetic data here instead of a temp dir")
+    args = parser.parse_args()
+
+    history = SyntheticHistory(args.years, args.sessions_per_day, args.titles, args.seed)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="foco_bench_")
+
+    try:
+        print(f"📦 Generating {args.years}y of synthetic history in {data_dir}...")
+        start = time.perf_counter()
+        days = history.write(data_dir)
+        generate_seconds = time.perf_counter() - start
+
+        print("⏱️ Running benchmarks...")
+        results = run_benchmarks(data_dir, args.repeats)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'years': args.years,
+            'days': days,
+            'sessions_per_day': args.sessions_per_day,
+            'title_cardinality': args.titles,
+            'seed': args.seed,
+            'as_of': BENCHMARK_TODAY.strftime('%Y-%m-%d'),
+            'generate_seconds': round(generate_seconds, 3)
+        },
+        'results': results
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, timing in results.items():
+        print(f"   {name:<32} median {timing['median_ms']:>10.2f} ms")
+    print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
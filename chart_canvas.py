@@ -0,0 +1,177 @@
+"""
+Chart Canvas - Retained-mode charts on a single Tk Canvas
+Bar charts, a day timeline and heatmaps that reuse their canvas items,
+so a redraw only moves and recolors what changed
+"""
+import tkinter as tk
+
+from activity_heatmap import session_minute_range
+
+TRACK_COLOR = '#444'
+TEXT_COLOR = '#ddd'
+HEAT_LOW = (0x33, 0x33, 0x33)
+HEAT_HIGH = (0x4C, 0xAF, 0x50)
+
+
+# ---------------- Layout (pure, no Tk needed) ----------------
+def bar_layout(values, width, row_height, label_width, value_width, gap=4, scale_to=None):
+    """Track and fill rectangles for horizontal bars.
+    scale_to: value of a full track (e.g. a total, so bars show shares); default the largest value"""
+    peak = max(values, default=0) if scale_to is None else scale_to
+    track_width = max(1, width - label_width - value_width)
+    rects = []
+    for i, value in enumerate(values):
+        y0 = i * (row_height + gap)
+        fill = track_width * min(1.0, value / peak) if peak > 0 else 0
+        rects.append({
+            'track': (label_width, y0, label_width + track_width, y0 + row_height),
+            'fill': (label_width, y0, label_width + fill, y0 + row_height),
+            'label_at': (0, y0 + row_height / 2),
+            'value_at': (width - value_width, y0 + row_height / 2)
+        })
+    return rects
+
+
+def timeline_segments(sessions, get_color, pseudo_color='#757575'):
+    """(start_minute, end_minute, color) for each session that maps onto the day"""
+    segments = []
+    for session in sessions:
+        minute_range = session_minute_range(session.get('start_time'), session.get('duration_minutes', 0))
+        if not minute_range:
+            continue
+        color = pseudo_color if session.get('is_pseudo_productive') else get_color(session.get('category', ''))
+        segments.append((minute_range[0], minute_range[1], color))
+    return segments
+
+
+def heat_color(value, peak, low=HEAT_LOW, high=HEAT_HIGH):
+    """Blend from low to high by value/peak as a #rrggbb string"""
+    t = min(1.0, value / peak) if peak > 0 else 0.0
+    return '#%02x%02x%02x' % tuple(round(a + (b - a) * t) for a, b in zip(low, high))
+
+
+class ChartCanvas:
+    """One Canvas per chart; items are created once and then only reconfigured"""
+
+    def __init__(self, parent, height=120, bg='#2b2b2b', canvas=None):
+        # canvas: an existing Canvas (or stand-in) to draw on instead of creating one
+        self.canvas = canvas or tk.Canvas(parent, height=height, bg=bg, highlightthickness=0)
+        self._items = {}  # (group, index) -> canvas item id
+        self._drawn = {}  # item id -> (coords, options) last applied
+        self._group_sizes = {}  # group -> items currently visible
+        self._last_draw = None  # Replayed when the canvas is resized
+        self.stats = {'draws': 0, 'created': 0, 'updated': 0, 'hidden': 0}
+        self.canvas.bind('<Configure>', self._on_resize)
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def width(self):
+        """Drawable width; falls back to the requested width before first layout"""
+        w = self.canvas.winfo_width()
+        return w if w > 1 else int(self.canvas.cget('width'))
+
+    def _on_resize(self, _event):
+        if self._last_draw:
+            method, args, kwargs = self._last_draw
+            method(*args, **kwargs)
+
+    # ---------------- Item reuse ----------------
+    def _item(self, kind, group, index, coords, **options):
+        """Create an item on first use, otherwise update only what changed"""
+        coords = tuple(round(c, 1) for c in coords)
+        key = (group, index)
+        item = self._items.get(key)
+        if item is None:
+            create = self.canvas.create_rectangle if kind == 'rect' else self.canvas.create_text
+            item = create(*coords, **options)
+            self._items[key] = item
+            self._drawn[item] = (coords, options)
+            self.stats['created'] += 1
+            return item
+
+        old_coords, old_options = self._drawn[item]
+        if coords != old_coords:
+            self.canvas.coords(item, *coords)
+            self.stats['updated'] += 1
+        changed = {k: v for k, v in options.items() if old_options.get(k) != v}
+        if changed:
+            self.canvas.itemconfigure(item, **changed)
+            self.stats['updated'] += 1
+        self._drawn[item] = (coords, {**old_options, **options})
+        return item
+
+    def _rect(self, group, index, coords, color):
+        return self._item('rect', group, index, coords, fill=color, outline='', state='normal')
+
+    def _text(self, group, index, xy, text, anchor='w'):
+        return self._item('text', group, index, xy, text=text, anchor=anchor,
+                          fill=TEXT_COLOR, font=("Segoe UI", 9), state='normal')
+
+    def _finish_group(self, group, count):
+        """Hide items left over from a larger previous draw"""
+        for index in range(count, self._group_sizes.get(group, 0)):
+            item = self._items[(group, index)]
+            coords, options = self._drawn[item]
+            if options.get('state') != 'hidden':
+                self.canvas.itemconfigure(item, state='hidden')
+                self._drawn[item] = (coords, {**options, 'state': 'hidden'})
+                self.stats['hidden'] += 1
+        self._group_sizes[group] = max(count, self._group_sizes.get(group, 0))
+
+    def _resize_to(self, height):
+        if int(self.canvas.cget('height')) != int(height):
+            self.canvas.config(height=height)
+
+    # ---------------- Charts ----------------
+    def draw_bars(self, rows, row_height=18, label_width=110, value_width=50, scale_to=None):
+        """rows: (label, value, color, value_text) tuples, drawn top to bottom"""
+        self._last_draw = (self.draw_bars, (rows,), {'row_height': row_height, 'label_width': label_width,
+                                                     'value_width': value_width, 'scale_to': scale_to})
+        self.stats['draws'] += 1
+        layout = bar_layout([row[1] for row in rows], self.width(), row_height, label_width, value_width,
+                            scale_to=scale_to)
+        for i, ((label, _, color, value_text), rect) in enumerate(zip(rows, layout)):
+            self._rect('track', i, rect['track'], TRACK_COLOR)
+            self._rect('bar', i, rect['fill'], color)
+            self._text('label', i, rect['label_at'], label)
+            self._text('value', i, rect['value_at'], value_text)
+        for group in ('track', 'bar', 'label', 'value'):
+            self._finish_group(group, len(rows))
+        self._resize_to(len(rows) * (row_height + 4))
+
+    def draw_timeline(self, segments, height=28, axis_height=14):
+        """Sessions across a 24h axis: (start_minute, end_minute, color) segments"""
+        self._last_draw = (self.draw_timeline, (segments,), {'height': height, 'axis_height': axis_height})
+        self.stats['draws'] += 1
+        width = self.width()
+        scale = width / 1440
+        self._rect('timeline_track', 0, (0, 0, width, height), TRACK_COLOR)
+        for i, (start, end, color) in enumerate(segments):
+            # Keep very short sessions visible as at least a 1px sliver
+            self._rect('segment', i, (start * scale, 0, max(end * scale, start * scale + 1), height), color)
+        self._finish_group('segment', len(segments))
+        for i, hour in enumerate(range(0, 25, 3)):
+            anchor = 'nw' if hour == 0 else ('ne' if hour == 24 else 'n')
+            self._text('hour', i, (hour * 60 * scale, height + 1), f"{hour:02d}", anchor=anchor)
+        self._resize_to(height + axis_height)
+
+    def draw_heatmap(self, grid, row_labels, label_width=36, cell_height=14, gap=1):
+        """Rows of values (e.g. weekday x hour) shaded relative to the busiest cell"""
+        self._last_draw = (self.draw_heatmap, (grid, row_labels), {'label_width': label_width,
+                                                                   'cell_height': cell_height, 'gap': gap})
+        self.stats['draws'] += 1
+        peak = max((v for row in grid for v in row), default=0)
+        columns = max((len(row) for row in grid), default=0)
+        cell_width = (self.width() - label_width) / columns if columns else 0
+        index = 0
+        for r, row in enumerate(grid):
+            y0 = r * (cell_height + gap)
+            self._text('row_label', r, (0, y0 + cell_height / 2), row_labels[r] if r < len(row_labels) else '')
+            for c, value in enumerate(row):
+                x0 = label_width + c * cell_width
+                self._rect('cell', index, (x0, y0, x0 + cell_width - gap, y0 + cell_height), heat_color(value, peak))
+                index += 1
+        self._finish_group('row_label', len(grid))
+        self._finish_group('cell', index)
+        self._resize_to(len(grid) * (cell_height + gap))
@@ -0,0 +1,43 @@
+"""
+Clock - Injectable time source
+Monotonic time for elapsed-time math, wall time for timestamps, and a
+virtual clock so tests can simulate hours in milliseconds
+"""
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Real time; elapsed math uses the monotonic clock so sleep/resume and NTP jumps don't distort it"""
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Time that only moves when advanced; sleep() advances instead of blocking"""
+
+    def __init__(self, start=None):
+        self.start = start or datetime(2025, 1, 6, 9, 0)
+        self.elapsed = 0.0
+
+    def monotonic(self):
+        return self.elapsed
+
+    def now(self):
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def advance(self, seconds):
+        self.elapsed += seconds
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+
+SYSTEM_CLOCK = SystemClock()
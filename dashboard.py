@@ -5,28 +5,135 @@ Focus | Activities | Statistics
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime, timedelta
-from stats_calculator import StatsCalculator
-from trend_analyzer import TrendAnalyzer
-from focus_manager import FocusManager, FocusMode
+from refresh_scheduler import RefreshScheduler
+from frame_timing import FrameTimer
+from chart_canvas import ChartCanvas, timeline_segments
+from category_engine import CategoryEngine
+from notifications import get_notification_queue
+import time
+
+CATEGORY_ROWS = [
+    ('Building', 'building', '#4CAF50'),
+    ('Studying', 'studying', '#2196F3'),
+    ('Applying', 'applying', '#FF9800'),
+    ('Knowledge', 'knowledge', '#9C27B0'),
+]
+WEEKDAY_LABELS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+QUARTER_LABELS = ['Q1', 'Q2', 'Q3', 'Q4']
+ACTIVITY_PAGE_SIZE = 18  # Tree rows; also the number of sessions loaded per refresh
+ACTIVITY_RANGES = {'Today': 1, 'Yesterday': 1, 'Last 7 Days': 7, 'Last 30 Days': 30, 'Last 90 Days': 90}
+ACTIVITY_FIELDS = ('start_time', 'end_time', 'label', 'category', 'duration_minutes')  # Tree column order
+NOTICE_POLL_MS = 500
+NOTICE_DISPLAY_MS = 5000
+
+
+def diff_rows(current, desired):
+    """Compare two ordered {iid: values} maps; returns (inserts, updates, deletes)"""
+    deletes = [iid for iid in current if iid not in desired]
+    inserts = [iid for iid in desired if iid not in current]
+    updates = [iid for iid in desired if iid in current and current[iid] != desired[iid]]
+    return inserts, updates, deletes
+
+def trend_insights(trend_analyzer, view):
+    """Insight lines for a Statistics range from the rolling, forecast and anomaly engines"""
+    lines = []
+    if view == 'This Week':
+        momentum = trend_analyzer.get_rolling_momentum()
+        lines.append(f"7-day average {momentum['recent_daily_hours']:.1f}h/day vs 28-day "
+                     f"{momentum['baseline_daily_hours']:.1f}h ({momentum['direction']}, {momentum['change_percentage']:+.0f}%)")
+    period = {'This Week': 'week', 'This Month': 'month', 'This Year': 'year'}.get(view)
+    if period:
+        forecast = trend_analyzer.get_forecasts()[period]
+        lines.append(f"On pace for {forecast['predicted_total']:.1f}h this {period} "
+                     f"({forecast['lower']:.1f}–{forecast['upper']:.1f}h)")
+    if view in ('Today', 'This Month'):
+        lines.extend(trend_analyzer.get_productivity_insights())  # Includes recent anomalies
+    return lines
 
 class ProductivityDashboard:
     def __init__(self, root, data_logger, activity_monitor):
         self.root = root
         self.data_logger = data_logger
         self.activity_monitor = activity_monitor
-        self.stats_calculator = StatsCalculator(data_logger)
-        self.trend_analyzer = TrendAnalyzer(self.stats_calculator)
-        self.focus_manager = FocusManager(data_logger)
+        self.category_engine = getattr(activity_monitor, 'category_engine', None) or CategoryEngine()
+        self.frame_timer = FrameTimer()
+        self.startup_timer = None  # Set by the launcher; shown in diagnostics
+        self._services = {}  # Backing services, created the first time a tab needs them
+        self._diagnostics_window = None
+        self.notifications = get_notification_queue()  # Block notices posted by the enforcement thread
+        self._notice_window = None
+        self._notice_after = None
 
         # State
         self.current_view = "Today"  # For statistics range selection
         self.view_date = datetime.now()
         self._manual_jail_active = False
+        self._manual_jail_request = 0  # Bumped per start/disable so a stale answer is ignored
+        self._manual_jail_result = None  # (request, ok, error) handed over by the enforcement worker
         self.cached_stats = {}
         self.last_activity_text = ""
+        self._rendered_view = None
 
+        self.refresh_scheduler = RefreshScheduler(self.root, frame_timer=self.frame_timer)
         self._build_ui()
-        self._start_refresh_loop()
+        self.refresh_scheduler.start()
+        self.root.bind('<Control-Shift-D>', self._toggle_diagnostics)
+        self.root.after(NOTICE_POLL_MS, self.frame_timer.wrap('after:notice_poll', self._poll_notifications))
+
+    # ---------------- Lazy services ----------------
+    def _service(self, name, factory):
+        """Create a service on first use, timing its construction (imports included)"""
+        service = self._services.get(name)
+        if service is None:
+            service = self._services[name] = self.frame_timer.wrap(f"startup:{name}", factory)()
+        return service
+
+    @property
+    def focus_manager(self):
+        def build():
+            from focus_manager import FocusManager
+            return FocusManager(self.data_logger)
+        return self._service('focus_manager', build)
+
+    @property
+    def stats_calculator(self):
+        def build():
+            from stats_calculator import StatsCalculator
+            return StatsCalculator(self.data_logger)
+        return self._service('stats_calculator', build)
+
+    @property
+    def trend_analyzer(self):
+        def build():
+            from trend_analyzer import TrendAnalyzer
+            return TrendAnalyzer(self.stats_calculator)
+        return self._service('trend_analyzer', build)
+
+    @property
+    def heatmap_calculator(self):
+        def build():
+            from activity_heatmap import HeatmapCalculator
+            return HeatmapCalculator(self.data_logger)
+        return self._service('heatmap_calculator', build)
+
+    @property
+    def leaderboard(self):
+        def build():
+            from leaderboard import ActivityLeaderboard
+            return ActivityLeaderboard(self.data_logger)
+        return self._service('leaderboard', build)
+
+    @property
+    def stats_worker(self):
+        def build():
+            from stats_worker import StatsWorker
+            return StatsWorker(self._compute_stats)
+        return self._service('stats_worker', build)
+
+    def start_background_services(self):
+        """Build services that must run before their tab is opened (called after first paint)"""
+        # TrendAnalyzer registers the rolling, forecast and anomaly engines on day close
+        return self.trend_analyzer
 
     # ---------------- UI Construction ----------------
     def _build_ui(self):
@@ -44,9 +151,24 @@ class ProductivityDashboard:
         self.notebook.add(self.activities_tab, text="Activities")
         self.notebook.add(self.stats_tab, text="Statistics")
 
-        self._build_focus_tab()
-        self._build_activities_tab()
-        self._build_stats_tab()
+        # Only the Focus tab is built up front; the others on first view
+        self._built_tabs = set()
+        self._ensure_tab_built(0)
+        self.notebook.bind('<<NotebookTabChanged>>', self.frame_timer.wrap('event:tab_changed', self._on_tab_changed))
+
+    def _ensure_tab_built(self, index):
+        if index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        name, build = [('focus', self._build_focus_tab),
+                       ('activities', self._build_activities_tab),
+                       ('stats', self._build_stats_tab)][index]
+        self.frame_timer.wrap(f"startup:{name}_tab", build)()
+
+    def _on_tab_changed(self, _=None):
+        self._ensure_tab_built(self.notebook.index(self.notebook.select()))
+        # A newly shown tab catches up straight away instead of on its next tick
+        self.refresh_scheduler.expedite()
 
     # ---------------- Focus Tab ----------------
     def _build_focus_tab(self):
@@ -96,7 +218,14 @@ class ProductivityDashboard:
         ttk.Button(jail_frame, text="🔒 8h", command=lambda: self._start_manual_jail(8)).pack(side="left", padx=4)
         ttk.Button(jail_frame, text="🚨 Disable", command=self._disable_all_jail).pack(side="left", padx=16)
 
+        s = self.refresh_scheduler
+        s.add_panel('focus_timer', self._update_focus, 1000,
+                    visible=lambda: self._tab_visible(0))
+        s.add_panel('current_activity', self._update_activity, 2000,
+                    token=lambda: self._current_activity_text(), visible=lambda: self._tab_visible(0))
+
     def _start_focus(self):
+        from focus_manager import FocusMode
         mode = self.mode_var.get()
         if mode == 'deep':
             self.focus_manager.start_focus_session(FocusMode.DEEP_WORK)
@@ -114,31 +243,58 @@ class ProductivityDashboard:
         if not self._manual_jail_active:
             self.jail_status_label.config(text="Productivity jail inactive")
 
+    @property
+    def enforcement(self):
+        def build():
+            from enforcement_service import get_enforcement_service
+            return get_enforcement_service()
+        return self._service('enforcement', build)
+
     def _start_manual_jail(self, hours):
         try:
-            from productivity_enforcer import ProductivityEnforcer
             import tkinter.messagebox as m
             if not m.askyesno("Start Jail", f"Start {hours}h distraction block?"):
                 return
-            self.manual_jail = ProductivityEnforcer()
-            if self.manual_jail.start_enforcement(hours):
-                self._manual_jail_active = True
-                self.jail_status_label.config(text=f"🔒 Manual jail active ({hours}h)")
+            # Shares the one enforcement service with Deep Work; overlapping jails merge
+            self._manual_jail_request += 1
+            request = self._manual_jail_request
+            self.enforcement.start('manual', hours,
+                                   on_result=lambda ok, error: self._on_manual_jail_result(request, ok, error))
+            self.jail_status_label.config(text=f"⏳ Starting manual jail ({hours}h)...")
+            self._await_manual_jail(request, hours)
         except Exception as e:
             import tkinter.messagebox as m
             m.showerror("Error", f"Failed to start jail: {e}")
 
+    def _on_manual_jail_result(self, request, ok, error):
+        # Runs on the enforcement thread; _await_manual_jail picks it up on the Tk thread
+        self._manual_jail_result = (request, ok, error)
+
+    def _await_manual_jail(self, request, hours):
+        """Show the manual jail as active only once the enforcer has confirmed it"""
+        if request != self._manual_jail_request:
+            return  # Superseded by another start or a disable
+        result = self._manual_jail_result
+        if result is None or result[0] != request:
+            self.root.after(100, lambda: self._await_manual_jail(request, hours))
+            return
+        _, ok, error = result
+        self._manual_jail_active = ok
+        if ok:
+            self.jail_status_label.config(text=f"🔒 Manual jail active ({hours}h)")
+        else:
+            self.jail_status_label.config(text="Productivity jail inactive")
+            import tkinter.messagebox as m
+            m.showerror("Error", f"Failed to start jail: {error}")
+
     def _disable_all_jail(self):
         try:
-            from productivity_enforcer import ProductivityEnforcer
             import tkinter.messagebox as m
             if not m.askyesno("Disable", "Disable all blocking?"):
                 return
-            if hasattr(self.focus_manager, 'jail_enforcer'):
-                self.focus_manager._stop_jail_mode()
-            if hasattr(self, 'manual_jail'):
-                self.manual_jail.stop_enforcement()
-            ProductivityEnforcer().stop_enforcement()
+            self.focus_manager._stop_jail_mode()
+            self.enforcement.force_stop()  # Every owner, plus any block a crashed run left behind
+            self._manual_jail_request += 1
             self._manual_jail_active = False
             self.jail_status_label.config(text="Productivity jail inactive")
         except Exception as e:
@@ -159,37 +315,76 @@ class ProductivityDashboard:
         ttk.Button(btns, text="Delete", command=self._delete_activity).pack(side="left", padx=4)
         ttk.Button(btns, text="Save", command=self._save_activities).pack(side="left", padx=4)
 
+        ttk.Label(header, text="Range:").pack(side="left", padx=(16, 4))
+        self.activity_range_var = tk.StringVar(value='Today')
+        range_combo = ttk.Combobox(header, textvariable=self.activity_range_var, values=list(ACTIVITY_RANGES),
+                                   state='readonly', width=12)
+        range_combo.pack(side="left")
+        range_combo.bind('<<ComboboxSelected>>', self._on_activity_range_change)
+
+        # Virtual list: a fixed set of tree rows is re-pointed at whichever
+        # page of sessions the scrollbar is over, so only that page is loaded
+        body = ttk.Frame(f)
+        body.pack(fill='both', expand=True, pady=8)
         cols = ("start", "end", "label", "category", "duration")
-        self.activities_tree = ttk.Treeview(f, columns=cols, show='headings', height=18)
+        self.activities_tree = ttk.Treeview(body, columns=cols, show='headings', height=ACTIVITY_PAGE_SIZE)
         for c in cols:
             self.activities_tree.heading(c, text=c.title())
             self.activities_tree.column(c, width=130 if c != 'label' else 220)
-        self.activities_tree.pack(fill='both', expand=True, pady=8)
+        self.activities_scroll = ttk.Scrollbar(body, orient='vertical', command=self._on_activity_scroll)
+        self.activities_scroll.pack(side='right', fill='y')
+        self.activities_tree.pack(side='left', fill='both', expand=True)
         self.activities_tree.bind('<Double-1>', self._edit_cell)
+        self.activities_tree.bind('<MouseWheel>', lambda e: self._scroll_activities_by(-3 if e.delta > 0 else 3))
+        self.activities_tree.bind('<Button-4>', lambda e: self._scroll_activities_by(-3))
+        self.activities_tree.bind('<Button-5>', lambda e: self._scroll_activities_by(3))
         # Track active edit to avoid refresh collisions
         self._editing_activity = None  # track editing state
 
+        # Rows currently shown, keyed by tree slot; refreshes diff against this
+        self._activity_rows = {}
+        self._activity_edits = {}  # session key -> {column index: edited value}
+        self._activity_deleted = set()  # session keys hidden with Delete
+        self._activity_offset = 0
+        self._activity_total = 0
+        self._activity_follow = True  # Stick to the newest sessions until the user scrolls up
+        self._activity_view_key = None
+        self.activity_refresh_stats = {'refreshes': 0, 'inserted': 0, 'updated': 0, 'deleted': 0, 'last_touched': 0,
+                                       'skipped': 0, 'last_page_ms': 0}
+
         ttk.Label(f, text="Double-click a cell to edit. Auto-logged items appear here.", font=("Segoe UI", 9)).pack(anchor='w')
 
+        self.refresh_scheduler.add_panel(
+            'activities', self._refresh_activities, 2000,
+            token=lambda: (self.data_logger.get_session_cursor(), self.activity_range_var.get()),
+            visible=lambda: self._tab_visible(1), context=lambda: self.activity_range_var.get())
+
     def _add_activity(self):
         now = datetime.now().strftime('%H:%M')
         self.activities_tree.insert('', 'end', values=(now, '', 'New Item', 'Uncategorized', ''))
 
     def _delete_activity(self):
+        hidden = False
         for sel in self.activities_tree.selection():
-            self.activities_tree.delete(sel)
+            row = self._activity_rows.get(sel)
+            if row:
+                self._activity_deleted.add(row['key'])
+                self._activity_edits.pop(row['key'], None)
+                hidden = True
+            else:
+                self.activities_tree.delete(sel)
+        if hidden:
+            self._refresh_activities(force=True)
 
     def _save_activities(self):
-        rows = []
-        for iid in self.activities_tree.get_children():
-            vals = self.activities_tree.item(iid)['values']
-            rows.append({
-                'start_time': vals[0], 'end_time': vals[1], 'label': vals[2],
-                'category': vals[3], 'duration_minutes': vals[4]
-            })
+        # Edits on every page, not just the visible one; logged sessions are keyed "date#index"
+        edits = {key: {ACTIVITY_FIELDS[col]: value for col, value in cols.items()}
+                 for key, cols in self._activity_edits.items()}
+        added = [dict(zip(ACTIVITY_FIELDS, self.activities_tree.item(iid)['values']))
+                 for iid in self.activities_tree.get_children() if iid not in self._activity_rows]
         if hasattr(self.data_logger, 'save_activity_overrides'):
             try:
-                self.data_logger.save_activity_overrides(rows)
+                self.data_logger.save_activity_overrides(edits, deleted=self._activity_deleted, added=added)
             except Exception as e:
                 import tkinter.messagebox as m
                 m.showerror("Save Failed", str(e))
@@ -215,31 +410,115 @@ class ProductivityDashboard:
             vals = list(self.activities_tree.item(row_id)['values'])
             vals[col_index] = new_val
             self.activities_tree.item(row_id, values=vals)
+            row = self._activity_rows.get(row_id)
+            if row:
+                prefix = f"{row['key'][5:10]} "
+                if col_index == 0 and row['show_date'] and new_val.startswith(prefix):
+                    new_val = new_val[len(prefix):]  # The MM-DD prefix is display-only
+                # Keep the edit per session so paging away and back doesn't revert it
+                self._activity_edits.setdefault(row['key'], {})[col_index] = new_val
+                self._activity_rows[row_id] = self._activity_values(row['key'], row['base'], row['show_date'])
             entry.destroy()
             self._editing_activity = None
         entry.bind('<Return>', finish)
         entry.bind('<FocusOut>', finish)
 
-    def _refresh_activities(self):
+    def _activity_values(self, key, activity, show_date=False):
+        values = [
+            activity.get('start_time', ''),
+            activity.get('end_time', ''),
+            activity.get('label', activity.get('application', '')),
+            activity.get('category', ''),
+            activity.get('duration_minutes', '')
+        ]
+        for col_index, value in self._activity_edits.get(key, {}).items():
+            values[col_index] = value
+        if show_date:
+            values[0] = f"{key[5:10]} {values[0]}"  # MM-DD prefix when the range spans days
+        return {'key': key, 'base': activity, 'show_date': show_date, 'values': tuple(values)}
+
+    def _activity_range(self):
+        today = datetime.now()
+        today = datetime(today.year, today.month, today.day)
+        name = self.activity_range_var.get()
+        if name == 'Yesterday':
+            return today - timedelta(days=1), today - timedelta(days=1)
+        return today - timedelta(days=ACTIVITY_RANGES.get(name, 1) - 1), today
+
+    def _on_activity_range_change(self, _=None):
+        self._activity_follow = True
+        self._refresh_activities(force=True)
+
+    def _on_activity_scroll(self, *args):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')
+        if args[0] == 'moveto':
+            self._scroll_activities_to(int(float(args[1]) * self._activity_total))
+        elif args[0] == 'scroll':
+            step = ACTIVITY_PAGE_SIZE if args[2] == 'pages' else 1
+            self._scroll_activities_to(self._activity_offset + int(args[1]) * step)
+
+    def _scroll_activities_by(self, rows):
+        self._scroll_activities_to(self._activity_offset + rows)
+        return "break"
+
+    def _scroll_activities_to(self, offset):
+        max_offset = max(0, self._activity_total - ACTIVITY_PAGE_SIZE)
+        self._activity_offset = max(0, min(offset, max_offset))
+        self._activity_follow = self._activity_offset >= max_offset
+        self._refresh_activities()
+
+    def _refresh_activities(self, force=False):
         # Avoid refreshing while editing to prevent item-not-found errors
         if getattr(self, '_editing_activity', None) is not None:
             return
-        if hasattr(self.data_logger, 'get_recent_activities'):
-            try:
-                acts = self.data_logger.get_recent_activities(limit=50)
-            except Exception:
-                acts = []
+        stats = self.activity_refresh_stats
+        start, end = self._activity_range()
+        view_key = (start, end, self._activity_offset, self._activity_follow, self.data_logger.get_session_cursor())
+        if not force and view_key == self._activity_view_key:
+            stats['skipped'] += 1
+            return
+
+        began = time.perf_counter()
+        try:
+            self._activity_total = self.data_logger.get_range_session_count(start, end)
+            max_offset = max(0, self._activity_total - ACTIVITY_PAGE_SIZE)
+            self._activity_offset = max_offset if self._activity_follow else min(self._activity_offset, max_offset)
+            page = self.data_logger.get_sessions_page(start, end, self._activity_offset, ACTIVITY_PAGE_SIZE)
+        except Exception:
+            return
+
+        show_date = start != end
+        desired = {}
+        for key, activity in page:
+            if key not in self._activity_deleted:
+                desired[f"row{len(desired)}"] = self._activity_values(key, activity, show_date)
+
+        inserts, updates, deletes = diff_rows(
+            {iid: row['values'] for iid, row in self._activity_rows.items()},
+            {iid: row['values'] for iid, row in desired.items()})
+        if deletes:
+            self.activities_tree.delete(*deletes)
+        for iid in updates:
+            self.activities_tree.item(iid, values=desired[iid]['values'])
+        for iid in inserts:
+            # Slots keep their position ahead of any manually added rows
+            self.activities_tree.insert('', int(iid[3:]), iid=iid, values=desired[iid]['values'])
+        self._activity_rows = desired
+
+        if self._activity_total:
+            self.activities_scroll.set(self._activity_offset / self._activity_total,
+                                       min(1.0, (self._activity_offset + ACTIVITY_PAGE_SIZE) / self._activity_total))
         else:
-            acts = []
-        self.activities_tree.delete(*self.activities_tree.get_children())
-        for a in acts:
-            self.activities_tree.insert('', 'end', values=(
-                a.get('start_time', ''),
-                a.get('end_time', ''),
-                a.get('label', a.get('application', '')),
-                a.get('category', ''),
-                a.get('duration_minutes', '')
-            ))
+            self.activities_scroll.set(0, 1)
+        self._activity_view_key = (start, end, self._activity_offset, self._activity_follow,
+                                   self.data_logger.get_session_cursor())
+
+        stats['refreshes'] += 1
+        stats['inserted'] += len(inserts)
+        stats['updated'] += len(updates)
+        stats['deleted'] += len(deletes)
+        stats['last_touched'] = len(inserts) + len(updates) + len(deletes)
+        stats['last_page_ms'] = round((time.perf_counter() - began) * 1000, 2)
 
     # ---------------- Statistics Tab ----------------
     def _build_stats_tab(self):
@@ -256,106 +535,236 @@ class ProductivityDashboard:
         for label in ['Today', 'This Week', 'This Month', 'This Year']:
             ttk.Radiobutton(rng, text=label, value=label, variable=self.range_var, command=self._update_stats).pack(side='left', padx=4)
 
+        self.cache_stats_label = ttk.Label(f, text="", font=("Segoe UI", 8), foreground="#888")
+        self.cache_stats_label.pack(side='bottom', anchor='w')
+
         self.stats_container = ttk.Frame(f)
         self.stats_container.pack(fill='both', expand=True, pady=10)
 
+        # Range views are built once on first use and then updated in place
+        self._stats_panels = {}
+        self._stats_charts = []
+        self._visible_stats_widget = None
+        self._stats_loading_label = ttk.Label(self.stats_container, text="", foreground="#888")
+        self._stats_error_label = ttk.Label(self.stats_container, text="")
+        self.stats_panel_metrics = {
+            'renders': 0, 'widgets_created': 0, 'widget_updates': 0,
+            'last_render_updates': 0, 'last_frame_ms': 0, 'max_frame_ms': 0
+        }
+
+        # Create the stats services here on the Tk thread, before the worker can touch them
+        for service in ('stats_calculator', 'trend_analyzer', 'heatmap_calculator', 'leaderboard', 'stats_worker'):
+            getattr(self, service)
+        self.refresh_scheduler.add_panel(
+            'stats', self._update_stats, 2000,
+            token=lambda: (self.data_logger.data_version, self.range_var.get()),
+            visible=lambda: self._tab_visible(2), context=lambda: self.range_var.get())
+        self._poll_stats_results()
+
+    def _compute_stats(self, view):
+        """Runs on the stats worker thread: all I/O and aggregation for a range"""
+        now = datetime.now()
+        if view == 'Today':
+            stats = self.data_logger.get_today_summary()
+            stats['fragmentation'] = self.stats_calculator.calculate_daily_fragmentation()
+            sessions = list(self.data_logger.today_data.get('sessions', []))
+            stats['timeline'] = timeline_segments(sessions, self.category_engine.get_category_color)
+        elif view == 'This Week':
+            monday = now - timedelta(days=now.weekday())
+            stats = self.stats_calculator.calculate_weekly_stats(monday)
+        elif view == 'This Month':
+            stats = self.stats_calculator.calculate_monthly_stats(now.year, now.month)
+            stats['heatmap'] = self.heatmap_calculator.get_weekday_hour_heatmap(datetime(now.year, now.month, 1), now)
+            stats['top_apps'] = self.leaderboard.get_current_top(k=5)['applications']
+        else:
+            stats = self.stats_calculator.calculate_yearly_stats(now.year)
+        stats['insights'] = trend_insights(self.trend_analyzer, view)
+        return stats
+
     def _update_stats(self):
-        for w in self.stats_container.winfo_children():
-            w.destroy()
         view = self.range_var.get()
+        if view != self._rendered_view:
+            self._show_stats_loading(view)
+        elif self.stats_worker.is_pending():
+            # Same view still computing on older data; don't pile up requests, but stay dirty
+            return False
+        self.stats_worker.submit(view)
+
+    def _show_stats_loading(self, view):
+        self._show_stats_widget(self._stats_loading_label)
+        self._set_text(self._stats_loading_label, f"Loading {view.lower()}…")
+        self._rendered_view = None
+
+    def _poll_stats_results(self):
+        result = self.stats_worker.poll()
+        if result and result['view'] == self.range_var.get():
+            self._render_stats_result(result)
+        self.root.after(100, self.frame_timer.wrap('after:stats_poll', self._poll_stats_results))
+
+    def _render_stats_result(self, result):
+        started = time.perf_counter()
+        updates_before = self.stats_panel_metrics['widget_updates'] + self._chart_updates()
+        view, stats = result['view'], result['stats']
         try:
+            if result['error']:
+                raise RuntimeError(result['error'])
             if view == 'Today':
-                stats = self.data_logger.get_today_summary()
                 self._render_daily_stats(stats)
             elif view == 'This Week':
-                monday = datetime.now() - timedelta(days=datetime.now().weekday())
-                stats = self.stats_calculator.calculate_weekly_stats(monday)
                 self._render_weekly_stats(stats)
             elif view == 'This Month':
-                now = datetime.now()
-                stats = self.stats_calculator.calculate_monthly_stats(now.year, now.month)
                 self._render_monthly_stats(stats)
             else:
-                now = datetime.now()
-                stats = self.stats_calculator.calculate_yearly_stats(now.year)
                 self._render_yearly_stats(stats)
+            panel = self._stats_panel(view)
+            self._set_text(panel['insights'], "\n".join(stats.get('insights', [])))
+            self._show_stats_widget(panel['frame'])
         except Exception as e:
-            ttk.Label(self.stats_container, text=f"Stats error: {e}").pack(anchor='w')
+            self._set_text(self._stats_error_label, f"Stats error: {e}")
+            self._show_stats_widget(self._stats_error_label)
+        self._rendered_view = view
+
+        m = self.stats_panel_metrics
+        m['renders'] += 1
+        m['last_render_updates'] = m['widget_updates'] + self._chart_updates() - updates_before
+        m['last_frame_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        m['max_frame_ms'] = max(m['max_frame_ms'], m['last_frame_ms'])
+        self.frame_timer.record('render:stats', m['last_frame_ms'], view)
+        self._update_cache_stats()
+
+    def _update_cache_stats(self):
+        cs = self.stats_calculator.get_cache_stats()
+        pm = self.stats_panel_metrics
+        txt = (f"Stats cache: {cs['hits']} hits / {cs['misses']} misses ({cs['hit_rate']:.0%}), {cs['entries']}/{cs['max_entries']} entries"
+               f"  |  Panel: {pm['widgets_created']} widgets built, {pm['last_render_updates']} updates last render")
+        if txt != self.cache_stats_label.cget('text'):
+            self.cache_stats_label.config(text=txt)
+
+    def get_stats_panel_metrics(self):
+        """Render timings and widget churn for the Statistics tab"""
+        def count(widget):
+            return 1 + sum(count(child) for child in widget.winfo_children())
+        metrics = dict(self.stats_panel_metrics)
+        metrics['widget_count'] = count(self.stats_container) - 1
+        metrics['canvas_items'] = sum(len(chart.canvas.find_all()) for chart in self._stats_charts)
+        return metrics
+
+    # --- Retained panels ---
+    def _stats_widget(self, cls, parent, **kwargs):
+        self.stats_panel_metrics['widgets_created'] += 1
+        return cls(parent, **kwargs)
+
+    def _show_stats_widget(self, widget):
+        if self._visible_stats_widget is widget:
+            return
+        if self._visible_stats_widget is not None:
+            self._visible_stats_widget.pack_forget()
+        if isinstance(widget, ttk.Label):
+            widget.pack(anchor='w')
+        else:
+            widget.pack(fill='both', expand=True)
+        self._visible_stats_widget = widget
+
+    def _stats_panel(self, view):
+        """Build a range view's widgets once; later renders only update them"""
+        panel = self._stats_panels.get(view)
+        if panel:
+            return panel
+
+        frame = self._stats_widget(ttk.Frame, self.stats_container)
+        panel = {'frame': frame}
+        panel['header'] = self._stats_widget(ttk.Label, frame, font=("Segoe UI", 11, 'bold'))
+        panel['header'].pack(anchor='w', pady=(0, 6))
+
+        if view == 'Today':
+            panel['detail'] = self._stats_widget(ttk.Label, frame, font=("Segoe UI", 9))
+            panel['detail'].pack(anchor='w', pady=(0, 6))
+            panel['chart'] = self._stats_chart(frame)
+            self._stats_widget(ttk.Label, frame, text="Timeline", font=("Segoe UI", 9)).pack(anchor='w', pady=(8, 2))
+            panel['timeline'] = self._stats_chart(frame)
+        elif view == 'This Month':
+            panel['chart'] = self._stats_chart(frame)
+            self._stats_widget(ttk.Label, frame, text="When you work (weekday × hour)",
+                               font=("Segoe UI", 9)).pack(anchor='w', pady=(8, 2))
+            panel['heatmap'] = self._stats_chart(frame)
+            panel['top_apps'] = self._stats_widget(ttk.Label, frame, font=("Segoe UI", 9), justify='left')
+            panel['top_apps'].pack(anchor='w', pady=(8, 0))
+        else:
+            panel['chart'] = self._stats_chart(frame)
+        panel['insights'] = self._stats_widget(ttk.Label, frame, font=("Segoe UI", 9), justify='left')
+        panel['insights'].pack(anchor='w', pady=(8, 0))
+
+        self._stats_panels[view] = panel
+        return panel
+
+    def _stats_chart(self, parent):
+        chart = ChartCanvas(parent)
+        chart.pack(fill='x', pady=2)
+        self._stats_charts.append(chart)
+        self.stats_panel_metrics['widgets_created'] += 1
+        return chart
+
+    def _chart_updates(self):
+        return sum(c.stats['created'] + c.stats['updated'] + c.stats['hidden'] for c in self._stats_charts)
+
+    def _set_text(self, widget, text):
+        if str(widget.cget('text')) != text:
+            widget.config(text=text)
+            self.stats_panel_metrics['widget_updates'] += 1
 
     # --- Render helpers ---
+    def _render_category_rows(self, panel, totals):
+        # Each category's bar is its share of the productive total
+        panel['chart'].draw_bars([
+            (label, totals.get(key, 0), color, f"{totals.get(key, 0)/60:.1f}h")
+            for label, key, color in CATEGORY_ROWS
+        ], scale_to=totals.get('total_productive', 0))
+
     def _render_daily_stats(self, stats):
+        panel = self._stats_panel('Today')
         total_hours = stats['total_productive'] / 60 if stats.get('total_productive') else 0
-        header = ttk.Label(self.stats_container, text=f"Real Work: {total_hours:.1f}h | Switches: {stats.get('context_switches',0)}", font=("Segoe UI", 11, 'bold'))
-        header.pack(anchor='w', pady=(0,6))
-        rows = [
-            ('Building', stats.get('building',0), '#4CAF50'),
-            ('Studying', stats.get('studying',0), '#2196F3'),
-            ('Applying', stats.get('applying',0), '#FF9800'),
-            ('Knowledge', stats.get('knowledge',0), '#9C27B0'),
-        ]
-        for label, minutes, color in rows:
-            self._category_row(label, minutes, stats.get('total_productive',1), color)
+        self._set_text(panel['header'], f"Real Work: {total_hours:.1f}h | Switches: {stats.get('context_switches',0)}")
+        frag = stats.get('fragmentation')
+        detail = ""
+        if frag:
+            detail = f"Median focus block: {frag['median_block_minutes']:.0f}m | Fragmentation: {frag['fragmentation_index']:.2f} | Ping-pong: {frag['ping_pong_count']}"
+        self._set_text(panel['detail'], detail)
+        self._render_category_rows(panel, stats)
+        panel['timeline'].draw_timeline(stats.get('timeline', []))
 
     def _render_weekly_stats(self, stats):
-        ttk.Label(self.stats_container, text=f"Week Total: {stats['totals']['total_productive']/60:.1f}h", font=("Segoe UI",11,'bold')).pack(anchor='w')
-        max_hours = max((d['total'] for d in stats['daily_summaries']), default=1)/60
-        for name, day in zip(['Mon','Tue','Wed','Thu','Fri','Sat','Sun'], stats['daily_summaries']):
-            self._day_bar(name, day['total']/60, max_hours)
+        panel = self._stats_panel('This Week')
+        self._set_text(panel['header'], f"Week Total: {stats['totals']['total_productive']/60:.1f}h")
+        panel['chart'].draw_bars([
+            (label, day['total'], '#4CAF50', f"{day['total']/60:.1f}h")
+            for label, day in zip(WEEKDAY_LABELS, stats['daily_summaries'])
+        ])
 
     def _render_monthly_stats(self, stats):
-        ttk.Label(self.stats_container, text=f"Month Total: {stats['totals']['total_productive']/60:.1f}h", font=("Segoe UI",11,'bold')).pack(anchor='w')
-        rows = [
-            ('Building', stats['totals']['building'], '#4CAF50'),
-            ('Studying', stats['totals']['studying'], '#2196F3'),
-            ('Applying', stats['totals']['applying'], '#FF9800'),
-            ('Knowledge', stats['totals']['knowledge'], '#9C27B0'),
-        ]
-        total = stats['totals']['total_productive'] or 1
-        for label, minutes, color in rows:
-            self._category_row(label, minutes, total, color)
+        panel = self._stats_panel('This Month')
+        self._set_text(panel['header'], f"Month Total: {stats['totals']['total_productive']/60:.1f}h")
+        self._render_category_rows(panel, stats['totals'])
+        panel['heatmap'].draw_heatmap(stats.get('heatmap', []), WEEKDAY_LABELS)
+        # "~" marks totals that may include up to `error` minutes from apps no longer tracked
+        top = "  ·  ".join(f"{app['name']} {'~' if app['error'] else ''}{app['minutes']/60:.1f}h"
+                           for app in stats.get('top_apps', []))
+        self._set_text(panel['top_apps'], f"Top apps: {top}" if top else "")
 
     def _render_yearly_stats(self, stats):
-        ttk.Label(self.stats_container, text=f"Year Total: {stats['totals']['total_productive']/60:.0f}h", font=("Segoe UI",11,'bold')).pack(anchor='w')
-        max_h = max(stats['quarterly_summaries'], default=1)
-        for q_label, hours in zip(['Q1','Q2','Q3','Q4'], stats['quarterly_summaries']):
-            self._quarter_bar(q_label, hours, max_h)
-
-    # --- Visual helpers ---
-    def _category_row(self, label, minutes, total_minutes, color):
-        row = ttk.Frame(self.stats_container)
-        row.pack(fill='x', pady=2)
-        ttk.Label(row, text=f"{label}: {minutes/60:.1f}h", width=18).pack(side='left')
-        bar_bg = tk.Frame(row, bg='#444', height=18)
-        bar_bg.pack(side='left', fill='x', expand=True, padx=6)
-        if minutes > 0 and total_minutes > 0:
-            tk.Frame(bar_bg, bg=color, height=18, width=int((minutes/total_minutes)*bar_bg.winfo_reqwidth())).place(relwidth=(minutes/total_minutes))
-
-    def _day_bar(self, day, hours, max_hours):
-        row = ttk.Frame(self.stats_container)
-        row.pack(fill='x', pady=1)
-        ttk.Label(row, text=f"{day}", width=4).pack(side='left')
-        bar_bg = tk.Frame(row, bg='#444', height=18)
-        bar_bg.pack(side='left', fill='x', expand=True, padx=4)
-        if hours>0 and max_hours>0:
-            tk.Frame(bar_bg, bg='#4CAF50', height=18).place(relwidth=hours/max_hours)
-        ttk.Label(row, text=f"{hours:.1f}h", width=6).pack(side='right')
-
-    def _quarter_bar(self, quarter, hours, max_hours):
-        row = ttk.Frame(self.stats_container)
-        row.pack(fill='x', pady=2)
-        ttk.Label(row, text=quarter, width=4).pack(side='left')
-        bar_bg = tk.Frame(row, bg='#444', height=22)
-        bar_bg.pack(side='left', fill='x', expand=True, padx=6)
-        if hours>0 and max_hours>0:
-            tk.Frame(bar_bg, bg='#4CAF50', height=22).place(relwidth=hours/max_hours)
-        ttk.Label(row, text=f"{hours:.0f}h", width=6).pack(side='right')
+        panel = self._stats_panel('This Year')
+        self._set_text(panel['header'], f"Year Total: {stats['totals']['total_productive']/60:.0f}h")
+        panel['chart'].draw_bars([
+            (label, hours, '#4CAF50', f"{hours:.0f}h")
+            for label, hours in zip(QUARTER_LABELS, stats['quarterly_summaries'])
+        ])
 
     # ---------------- Refresh Logic ----------------
-    def _start_refresh_loop(self):
-        self._update_focus()
-        self._update_activity()
-        self._update_stats()
-        self.root.after(2000, self._start_refresh_loop)
+    def _tab_visible(self, index):
+        return self.notebook.index(self.notebook.select()) == index
+
+    def get_refresh_stats(self):
+        """Per-panel refresh counts and durations"""
+        return self.refresh_scheduler.get_stats()
 
     def _update_focus(self):
         info = self.focus_manager.get_session_info()
@@ -367,31 +776,102 @@ class ProductivityDashboard:
             # Progress
             pct = info['progress_percentage']
             self.focus_progress['value'] = pct
+            if info['state'] == 'Completed' and str(self.start_btn['state']) == 'disabled':
+                # Finished on its own deadline; re-enable the controls
+                self.start_btn.config(state='normal')
+                self.stop_btn.config(state='disabled')
             # Jail indicator
             if info['mode'] == 'Deep Work' and self.focus_manager.session_data.get('jail_active'):
                 self.jail_status_label.config(text='🔒 Auto jail active (Deep Work)')
+            elif info['mode'] == 'Deep Work' and self.focus_manager.session_data.get('jail_error'):
+                self.jail_status_label.config(text=f"⚠️ Auto jail failed: {self.focus_manager.session_data['jail_error']}")
             elif not self._manual_jail_active:
                 self.jail_status_label.config(text='Productivity jail inactive')
         else:
             self.focus_progress['value'] = 0
 
-    def _update_activity(self):
+    def _current_activity_text(self):
         current = self.activity_monitor.get_current_activity()
         if current:
             app = current.get('application') or current.get('window_title','App')
             category = current.get('category','')
-            txt = f"Current Activity: {app}  |  {category}"
-        else:
-            txt = "Current Activity: —"
+            return f"Current Activity: {app}  |  {category}"
+        return "Current Activity: —"
+
+    def _update_activity(self):
+        txt = self._current_activity_text()
         if txt != self.last_activity_text:
             self.current_activity_label.config(text=txt)
             self.last_activity_text = txt
-        # Refresh activities tree occasionally
-        if self.notebook.index(self.notebook.select()) == 1:  # Activities tab visible
-            self._refresh_activities()
+
+    # ---------------- Block notices ----------------
+    def _poll_notifications(self):
+        """Show notices queued by the enforcer; the dashboard is their only UI owner"""
+        notices = self.notifications.drain()
+        if notices:
+            self._show_notice(notices)
+        self.root.after(NOTICE_POLL_MS, self.frame_timer.wrap('after:notice_poll', self._poll_notifications))
+
+    def _show_notice(self, notices):
+        """Non-modal toast, reused while open and hidden after a few seconds"""
+        if self._notice_window is None:
+            win = tk.Toplevel(self.root)
+            win.attributes('-topmost', True)
+            win.protocol("WM_DELETE_WINDOW", self._hide_notice)
+            self._notice_label = ttk.Label(win, justify='left', padding=12, wraplength=320)
+            self._notice_label.pack(fill='both', expand=True)
+            self._notice_window = win
+        latest = notices[-1]
+        more = f"\n\n(+{len(notices) - 1} more)" if len(notices) > 1 else ""
+        self._notice_window.title(latest['title'])
+        self._notice_label.config(text=f"{latest['time']}  {latest['message']}{more}")
+        if self._notice_after:
+            self.root.after_cancel(self._notice_after)
+        self._notice_after = self.root.after(NOTICE_DISPLAY_MS, self._hide_notice)
+
+    def _hide_notice(self):
+        if self._notice_after:
+            self.root.after_cancel(self._notice_after)
+            self._notice_after = None
+        if self._notice_window is not None:
+            self._notice_window.destroy()
+            self._notice_window = None
+
+    # ---------------- Diagnostics ----------------
+    def _toggle_diagnostics(self, _=None):
+        """Hidden frame-timing view (Ctrl+Shift+D)"""
+        if self._diagnostics_window is not None:
+            self.root.after_cancel(self._diagnostics_after)
+            self._diagnostics_window.destroy()
+            self._diagnostics_window = None
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Diagnostics")
+        win.protocol("WM_DELETE_WINDOW", self._toggle_diagnostics)
+        self._diagnostics_text = tk.Text(win, width=72, height=24, font=("Consolas", 9))
+        self._diagnostics_text.pack(fill='both', expand=True)
+        self._diagnostics_window = win
+        self._update_diagnostics()
+
+    def _update_diagnostics(self):
+        if self._diagnostics_window is None:
+            return
+        report = self.frame_timer.format_report()
+        if self.startup_timer:
+            report = self.startup_timer.format_report() + "\n\n" + report
+        refresh = self.refresh_scheduler.get_stats()
+        report += "\n\nPanels (runs / skipped clean / skipped hidden):\n" + "\n".join(
+            f"  {name:<18}{s['runs']:>6}{s['skipped_clean']:>8}{s['skipped_hidden']:>8}" for name, s in refresh.items())
+        n = self.notifications.get_stats()
+        report += (f"\n\nBlock notices: {n['posted']} posted, {n['delivered']} shown, "
+                   f"{n['deduplicated']} deduplicated, {n['rate_limited']} rate limited")
+        self._diagnostics_text.delete('1.0', 'end')
+        self._diagnostics_text.insert('1.0', report)
+        self._diagnostics_after = self.root.after(1000, self._update_diagnostics)
 
     # Public alias for external triggers if needed
     def refresh_now(self):
-        self._update_stats()
+        if 2 in self._built_tabs:
+            self._update_stats()
 
 # End of refactored dashboard
\ No newline at end of file
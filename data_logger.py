@@ -4,14 +4,28 @@ Handles saving/loading productivity data and historical summaries
 """
 import json
 import os
+import threading
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from activity_heatmap import decode_slots, encode_slots, mark_slots, session_minute_range
+from switch_analyzer import SwitchAnalyzer, day_fragmentation
 
 class DataLogger:
-    def __init__(self):
-        self.data_dir = "productivity_data"
+    def __init__(self, data_dir="productivity_data"):
+        self.data_dir = data_dir
         self.ensure_data_dir()
         self.current_session = None
+        self.session_listeners = []
+        self.day_closed_listeners = []
+        self.data_version = 0  # Bumped on every write so cached stats know to refresh
+        # Serializes today_data writes, saves and rollover: the activity monitor, the
+        # focus deadline scheduler and the Tk thread all log into it. Listeners run
+        # outside the lock so they can call back into the logger.
+        self._lock = threading.RLock()
+        self._switch_analyzer = None
+        self._session_counts = {}  # date -> (mtime, session count) for closed days
+        self._page_days = OrderedDict()  # Small LRU of closed days' sessions for paging
+        self._focus_index = None  # date -> focus aggregates, loaded on first use
         self.today_data = self.load_today_data()
     
     def ensure_data_dir(self):
@@ -21,8 +35,11 @@ class DataLogger:
     
     def get_today_filename(self):
         """Get filename for today's data"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        return os.path.join(self.data_dir, f"{today}.json")
+        return self.get_day_filename(datetime.now())
+    
+    def get_day_filename(self, date):
+        """Get filename for a given day's data"""
+        return os.path.join(self.data_dir, f"{date.strftime('%Y-%m-%d')}.json")
     
     def load_today_data(self):
         """Load today's productivity data"""
@@ -35,63 +52,126 @@ class DataLogger:
                 pass
         
         # Return empty structure for new day
-        return {
-            "date": datetime.now().strftime('%Y-%m-%d'),
-            "sessions": [],
-            "daily_summary": {
-                "building": 0,
-                "studying": 0,
-                "applying": 0,
-                "knowledge": 0,
-                "pseudo_productive": 0,
-                "context_switches": 0,
-                "total_productive": 0
-            }
-        }
+        return self.get_empty_day_data(datetime.now())
     
     def save_today_data(self):
         """Save today's data to file"""
-        filename = self.get_today_filename()
-        try:
-            with open(filename, 'w') as f:
-                json.dump(self.today_data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving data: {e}")
+        with self._lock:
+            # The day being recorded, which is still yesterday until the rollover runs
+            filename = self.get_day_filename(datetime.strptime(self.today_data["date"], '%Y-%m-%d'))
+            try:
+                with open(filename, 'w') as f:
+                    json.dump(self.today_data, f, indent=2)
+            except Exception as e:
+                print(f"Error saving data: {e}")
+            finally:
+                self.data_version += 1
+    
+    def roll_over_if_needed(self):
+        """Close out yesterday's data once the date changes"""
+        with self._lock:
+            if self.today_data.get("date") == datetime.now().strftime('%Y-%m-%d'):
+                return False
+            
+            closed_day = self.today_data
+            self.today_data = self.load_today_data()
+            self._switch_analyzer = None
+            self.data_version += 1
+        
+        for listener in self.day_closed_listeners:
+            try:
+                listener(closed_day)
+            except Exception as e:
+                print(f"Error in day-closed listener: {e}")
+        return True
+    
+    def add_day_closed_listener(self, callback):
+        """Register a callback invoked with a day's data once the day is over"""
+        self.day_closed_listeners.append(callback)
     
     def start_session(self, session_data):
         """Start a new tracking session"""
-        self.current_session = session_data.copy()
-        self.today_data["daily_summary"]["context_switches"] += 1
+        self.roll_over_if_needed()
+        with self._lock:
+            self.current_session = session_data.copy()
+            self.today_data["daily_summary"]["context_switches"] += 1
     
     def end_session(self, session_data):
         """End current session and log the data"""
-        if not self.current_session:
-            return
-        
-        # Merge session data
-        complete_session = self.current_session.copy()
-        complete_session.update(session_data)
+        with self._lock:
+            if not self.current_session:
+                return
+            
+            # Merge session data
+            complete_session = self.current_session.copy()
+            complete_session.update(session_data)
+            
+            # Update fragmentation before appending so legacy days replay only prior sessions
+            self._update_fragmentation(complete_session)
+            
+            # Add to sessions list
+            self.today_data["sessions"].append(complete_session)
+            
+            # Update daily summary
+            category = complete_session.get('category', 'knowledge').lower()
+            duration = complete_session.get('duration_minutes', 0)
+            
+            if complete_session.get('is_pseudo_productive', False):
+                self.today_data["daily_summary"]["pseudo_productive"] += duration
+            else:
+                self.today_data["daily_summary"][category] += duration
+                self.today_data["daily_summary"]["total_productive"] += duration
+            
+            self._record_minute_slots(complete_session)
+            
+            # Save to file
+            self.save_today_data()
+            self.current_session = None
         
-        # Add to sessions list
-        self.today_data["sessions"].append(complete_session)
+        for listener in self.session_listeners:
+            try:
+                listener(complete_session)
+            except Exception as e:
+                print(f"Error in session listener: {e}")
         
-        # Update daily summary
-        category = complete_session.get('category', 'knowledge').lower()
-        duration = complete_session.get('duration_minutes', 0)
+        # Only now close the day, so a session running past midnight stays on the day it started
+        self.roll_over_if_needed()
+    
+    def add_session_listener(self, callback):
+        """Register a callback invoked with each session as it ends"""
+        self.session_listeners.append(callback)
+    
+    def _update_fragmentation(self, session):
+        """Stream a session into today's switch/fragmentation analytics"""
+        if self._switch_analyzer is None:
+            self._switch_analyzer = SwitchAnalyzer(day_fragmentation(self.today_data))
+        self._switch_analyzer.add_session(session)
+        self.today_data["fragmentation"] = self._switch_analyzer.to_dict()
+    
+    def _record_minute_slots(self, session):
+        """Mark the minutes covered by a session in today's per-category bitmap"""
+        slot_range = session_minute_range(session.get('start_time'), session.get('duration_minutes', 0))
+        if slot_range is None:
+            return
         
-        if complete_session.get('is_pseudo_productive', False):
-            self.today_data["daily_summary"]["pseudo_productive"] += duration
+        if session.get('is_pseudo_productive', False):
+            slot_key = 'pseudo_productive'
         else:
-            self.today_data["daily_summary"][category] += duration
-            self.today_data["daily_summary"]["total_productive"] += duration
+            slot_key = session.get('category', 'knowledge').lower()
         
-        # Save to file
-        self.save_today_data()
-        self.current_session = None
+        slots = self.today_data.setdefault("minute_slots", {})
+        bits = mark_slots(decode_slots(slots.get(slot_key)), *slot_range)
+        slots[slot_key] = encode_slots(bits)
     
     def get_today_summary(self):
         """Get today's productivity summary"""
-        return self.today_data["daily_summary"].copy()
+        with self._lock:
+            return self.today_data["daily_summary"].copy()
+    
+    def get_today_sessions(self):
+        """The in-memory day's date and a snapshot of its session list"""
+        with self._lock:
+            return self.today_data.get("date"), list(self.today_data.get("sessions", []))
     
     def get_current_session_info(self):
         """Get information about the current session"""
@@ -104,22 +184,7 @@ class DataLogger:
             today = datetime.now()
             start_date = today - timedelta(days=today.weekday())
         
-        weekly_data = []
-        for i in range(7):
-            date = start_date + timedelta(days=i)
-            filename = os.path.join(self.data_dir, f"{date.strftime('%Y-%m-%d')}.json")
-            
-            if os.path.exists(filename):
-                try:
-                    with open(filename, 'r') as f:
-                        day_data = json.load(f)
-                        weekly_data.append(day_data)
-                except:
-                    weekly_data.append(self.get_empty_day_data(date))
-            else:
-                weekly_data.append(self.get_empty_day_data(date))
-        
-        return weekly_data
+        return self.get_range_data(start_date, start_date + timedelta(days=6))
     
     def get_monthly_data(self, year=None, month=None):
         """Get data for the current month"""
@@ -135,25 +200,32 @@ class DataLogger:
         else:
             last_day = datetime(year, month + 1, 1) - timedelta(days=1)
         
-        monthly_data = []
-        current_date = first_day
+        return self.get_range_data(first_day, last_day)
+    
+    def load_day_data(self, date):
+        """Load a single day's data, or an empty structure if missing/corrupt"""
+        filename = self.get_day_filename(date)
         
-        while current_date <= last_day:
-            filename = os.path.join(self.data_dir, f"{current_date.strftime('%Y-%m-%d')}.json")
-            
-            if os.path.exists(filename):
-                try:
-                    with open(filename, 'r') as f:
-                        day_data = json.load(f)
-                        monthly_data.append(day_data)
-                except:
-                    monthly_data.append(self.get_empty_day_data(current_date))
-            else:
-                monthly_data.append(self.get_empty_day_data(current_date))
-            
-            current_date += timedelta(days=1)
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    return json.load(f)
+            except:
+                pass
+        
+        return self.get_empty_day_data(date)
+    
+    def iter_range_data(self, start_date, end_date):
+        """Yield day data for each date in [start_date, end_date], one file at a time"""
+        current_date = datetime(start_date.year, start_date.month, start_date.day)
         
-        return monthly_data
+        while current_date.date() <= end_date.date():
+            yield self.load_day_data(current_date)
+            current_date += timedelta(days=1)
+    
+    def get_range_data(self, start_date, end_date):
+        """Get data for every day in [start_date, end_date]"""
+        return list(self.iter_range_data(start_date, end_date))
     
     def get_empty_day_data(self, date):
         """Get empty data structure for a day"""
@@ -168,7 +240,9 @@ class DataLogger:
                 "pseudo_productive": 0,
                 "context_switches": 0,
                 "total_productive": 0
-            }
+            },
+            "minute_slots": {},
+            "focus_sessions": []
         }
     
     def get_available_dates(self):
@@ -180,6 +254,16 @@ class DataLogger:
                     dates.append(filename[:-5])  # Remove .json extension
         return sorted(dates)
 
+    def format_activity(self, s):
+        """Flatten a session into an Activities row dict"""
+        return {
+            'start_time': s.get('start_time') or s.get('timestamp') or '',
+            'end_time': s.get('end_time', ''),
+            'label': s.get('activity') or s.get('application') or s.get('window_title') or 'Session',
+            'category': s.get('category', 'unknown'),
+            'duration_minutes': s.get('duration_minutes') or s.get('duration', 0)
+        }
+
     def get_recent_activities(self, limit=50):
         """Return flattened recent session activities for Activities tab.
         Each session entry transformed to a simple dict: start_time, end_time, label, category, duration_minutes."""
@@ -187,25 +271,194 @@ class DataLogger:
         try:
             sessions = self.today_data.get('sessions', [])
             for s in sessions[-limit:]:
-                start = s.get('start_time') or s.get('timestamp') or ''
-                end = s.get('end_time', '')
-                duration = s.get('duration_minutes') or s.get('duration', 0)
-                activities.append({
-                    'start_time': start,
-                    'end_time': end,
-                    'label': s.get('activity') or s.get('application') or s.get('window_title') or 'Session',
-                    'category': s.get('category', 'unknown'),
-                    'duration_minutes': duration
-                })
+                activities.append(self.format_activity(s))
         except Exception:
             pass
         return activities[-limit:]
 
-    def save_activity_overrides(self, rows):
-        """Persist manual edits (lightweight override file)."""
+    def get_session_cursor(self):
+        """Cheap token that changes whenever a session is logged or the day rolls over"""
+        return (self.today_data.get('date'), len(self.today_data.get('sessions', [])))
+
+    def _closed_day_sessions(self, date):
+        """Sessions for a past day, with the file's mtime; cached for a few days"""
+        date_str = date.strftime('%Y-%m-%d')
+        try:
+            mtime = os.path.getmtime(self.get_day_filename(date))
+        except OSError:
+            return None, []
+
+        cached = self._page_days.get(date_str)
+        if cached and cached[0] == mtime:
+            self._page_days.move_to_end(date_str)
+            return mtime, cached[1]
+
+        sessions = self.load_day_data(date).get('sessions', [])
+        self._page_days[date_str] = (mtime, sessions)
+        while len(self._page_days) > 4:
+            self._page_days.popitem(last=False)
+        return mtime, sessions
+
+    def get_day_session_count(self, date):
+        """Number of sessions logged on a day (counts for past days are cached)"""
+        date_str = date.strftime('%Y-%m-%d')
+        if date_str == self.today_data.get('date'):
+            return len(self.today_data.get('sessions', []))
+
+        cached = self._session_counts.get(date_str)
         try:
-            override_path = os.path.join(self.data_dir, 'activity_overrides.json')
-            with open(override_path, 'w', encoding='utf-8') as f:
-                json.dump(rows, f, indent=2)
+            mtime = os.path.getmtime(self.get_day_filename(date))
+        except OSError:
+            return 0
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        mtime, sessions = self._closed_day_sessions(date)
+        self._session_counts[date_str] = (mtime, len(sessions))
+        return len(sessions)
+
+    def get_range_session_count(self, start_date, end_date):
+        """Total sessions across [start_date, end_date]"""
+        total = 0
+        current = datetime(start_date.year, start_date.month, start_date.day)
+        while current.date() <= end_date.date():
+            total += self.get_day_session_count(current)
+            current += timedelta(days=1)
+        return total
+
+    def get_sessions_page(self, start_date, end_date, offset, limit):
+        """Rows [offset, offset+limit) of a date range; only days the page touches are loaded"""
+        rows = []
+        current = datetime(start_date.year, start_date.month, start_date.day)
+
+        while current.date() <= end_date.date() and len(rows) < limit:
+            count = self.get_day_session_count(current)
+            if offset >= count:
+                offset -= count
+            else:
+                date_str = current.strftime('%Y-%m-%d')
+                if date_str == self.today_data.get('date'):
+                    sessions = self.today_data.get('sessions', [])
+                else:
+                    sessions = self._closed_day_sessions(current)[1]
+                end = min(count, offset + limit - len(rows))
+                rows.extend((f"{date_str}#{i}", self.format_activity(sessions[i])) for i in range(offset, end))
+                offset = 0
+            current += timedelta(days=1)
+
+        return rows
+
+    def get_overrides_filename(self):
+        return os.path.join(self.data_dir, 'activity_overrides.json')
+
+    def load_activity_overrides(self):
+        """Manual Activities edits: field edits and hidden sessions keyed "date#index", plus added rows"""
+        overrides = {'edits': {}, 'deleted': [], 'added': []}
+        try:
+            with open(self.get_overrides_filename(), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return overrides
+        if isinstance(saved, list):
+            overrides['legacy_rows'] = saved  # Older saves: a keyless copy of the visible rows
+        else:
+            overrides.update(saved)
+        return overrides
+
+    def save_activity_overrides(self, edits, deleted=(), added=()):
+        """Merge manual edits into the override file; sessions not mentioned keep their saved edits"""
+        with self._lock:
+            overrides = self.load_activity_overrides()
+            for key, fields in edits.items():
+                overrides['edits'].setdefault(key, {}).update(fields)
+            for key in sorted(deleted):
+                overrides['edits'].pop(key, None)
+                if key not in overrides['deleted']:
+                    overrides['deleted'].append(key)
+            for row in added:
+                if row not in overrides['added']:
+                    overrides['added'].append(row)
+            try:
+                with open(self.get_overrides_filename(), 'w', encoding='utf-8') as f:
+                    json.dump(overrides, f, indent=2)
+            except Exception as e:
+                print(f"Error saving overrides: {e}")
+            finally:
+                self.data_version += 1
+
+    # ---------------- Focus sessions ----------------
+    def get_focus_index_filename(self):
+        return os.path.join(self.data_dir, "focus_index.json")
+
+    @staticmethod
+    def _add_focus_aggregate(index, date_str, session):
+        """Fold one finished focus session into its day's aggregate"""
+        agg = index.setdefault(date_str, {
+            'sessions': 0, 'completed': 0, 'deep_work': 0, 'quick_focus': 0,
+            'active_minutes': 0.0, 'completion_sum': 0
+        })
+        completion = session.get('completion_percentage', 0) or 0
+        agg['sessions'] += 1
+        agg['completed'] += 1 if completion >= 100 else 0
+        agg['deep_work' if session.get('mode') == 'Deep Work' else 'quick_focus'] += 1
+        agg['active_minutes'] = round(agg['active_minutes'] + (session.get('active_minutes', 0) or 0), 1)
+        agg['completion_sum'] += completion
+
+    def _load_focus_index(self):
+        """Per-day focus aggregates; rebuilt from the day files if the index is missing"""
+        if self._focus_index is not None:
+            return self._focus_index
+
+        filename = self.get_focus_index_filename()
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    self._focus_index = json.load(f)
+                return self._focus_index
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Error loading focus index, rebuilding: {e}")
+
+        index = {}
+        for date_str in self.get_available_dates():
+            if date_str == self.today_data.get('date'):
+                day_data = self.today_data
+            else:
+                day_data = self.load_day_data(datetime.strptime(date_str, '%Y-%m-%d'))
+            for session in day_data.get('focus_sessions', []):
+                self._add_focus_aggregate(index, date_str, session)
+        self._focus_index = index
+        self._save_focus_index()
+        return index
+
+    def _save_focus_index(self):
+        try:
+            with open(self.get_focus_index_filename(), 'w') as f:
+                json.dump(self._focus_index, f)
         except Exception as e:
-            print(f"Error saving overrides: {e}")
\ No newline at end of file
+            print(f"Error saving focus index: {e}")
+
+    def log_focus_session(self, session):
+        """Store a finished focus session in today's file and update its day aggregate"""
+        self.roll_over_if_needed()
+        with self._lock:
+            index = self._load_focus_index()  # Load before appending so a rebuild can't count it twice
+            self.today_data.setdefault('focus_sessions', []).append(session)
+            self.save_today_data()
+            self._add_focus_aggregate(index, self.today_data['date'], session)
+            self._save_focus_index()
+
+    def get_focus_stats(self, date=None):
+        """Focus totals for a day (default today), read straight from the index"""
+        date_str = (date or datetime.now()).strftime('%Y-%m-%d')
+        agg = self._load_focus_index().get(date_str)
+        if not agg:
+            return {'sessions_completed': 0, 'total_sessions': 0, 'total_focus_time': 0,
+                    'deep_work_sessions': 0, 'quick_focus_sessions': 0, 'average_completion': 0}
+        return {
+            'sessions_completed': agg['completed'],
+            'total_sessions': agg['sessions'],
+            'total_focus_time': agg['active_minutes'],
+            'deep_work_sessions': agg['deep_work'],
+            'quick_focus_sessions': agg['quick_focus'],
+            'average_completion': round(agg['completion_sum'] / agg['sessions'])
+        }
@@ -0,0 +1,119 @@
+"""
+Deadline Scheduler - Heap-based timers on the injectable clock
+Fires callbacks at their due time instead of waiting for someone to poll,
+and reports how late each one actually ran
+"""
+import heapq
+import itertools
+import threading
+
+from clock import SYSTEM_CLOCK
+
+
+class DeadlineScheduler:
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self._heap = []  # (due, timer_id)
+        self._timers = {}  # timer_id -> (callback, name); cancelled ids are simply dropped
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.stats = {'fired': 0, 'cancelled': 0, 'errors': 0, 'total_lag_ms': 0.0, 'max_lag_ms': 0.0}
+
+    # ---------------- Timers ----------------
+    def schedule_at(self, due, callback, name=None):
+        """Run callback once the clock's monotonic time reaches due; returns a timer id"""
+        with self._cond:
+            timer_id = next(self._ids)
+            self._timers[timer_id] = (callback, name)
+            heapq.heappush(self._heap, (due, timer_id))
+            self._cond.notify()
+        return timer_id
+
+    def schedule_in(self, delay, callback, name=None):
+        return self.schedule_at(self.clock.monotonic() + delay, callback, name)
+
+    def cancel(self, timer_id):
+        """Cancel a pending timer; its heap entry is discarded when it surfaces"""
+        with self._cond:
+            if self._timers.pop(timer_id, None) is None:
+                return False
+            self.stats['cancelled'] += 1
+            self._cond.notify()
+            return True
+
+    def _next_due(self):
+        """Due time of the earliest live timer (drops cancelled entries); caller holds the lock"""
+        while self._heap and self._heap[0][1] not in self._timers:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def next_due(self):
+        with self._cond:
+            return self._next_due()
+
+    def pending(self):
+        with self._cond:
+            return len(self._timers)
+
+    def run_pending(self, now=None):
+        """Fire every timer due by now, earliest first; returns how many fired"""
+        now = self.clock.monotonic() if now is None else now
+        fired = 0
+        while True:
+            with self._cond:
+                due = self._next_due()
+                if due is None or due > now:
+                    break
+                _, timer_id = heapq.heappop(self._heap)
+                callback, name = self._timers.pop(timer_id)
+
+            lag_ms = max(0.0, (self.clock.monotonic() - due) * 1000)
+            self.stats['fired'] += 1
+            self.stats['total_lag_ms'] += lag_ms
+            self.stats['max_lag_ms'] = max(self.stats['max_lag_ms'], lag_ms)
+            fired += 1
+            try:
+                callback()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ Timer {name or timer_id} failed: {e}")
+        return fired
+
+    # ---------------- Background thread ----------------
+    def start(self):
+        """Fire timers from a background thread (real clocks only)"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="DeadlineScheduler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                due = self._next_due()
+                delay = None if due is None else due - self.clock.monotonic()
+                if delay is None or delay > 0:
+                    # Sleeps until the next deadline, or until a timer is added/cancelled
+                    self._cond.wait(timeout=delay)
+                    continue
+            self.run_pending()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def get_stats(self):
+        """Fired/cancelled counts and how late timers ran"""
+        stats = dict(self.stats)
+        stats['pending'] = self.pending()
+        stats['mean_lag_ms'] = round(stats['total_lag_ms'] / stats['fired'], 2) if stats['fired'] else 0
+        stats['max_lag_ms'] = round(stats['max_lag_ms'], 2)
+        del stats['total_lag_ms']
+        return stats
@@ -0,0 +1,219 @@
+"""
+Enforcement Service - One long-lived productivity jail for the whole app
+Focus sessions and the dashboard send start/extend/stop commands to a
+single worker thread; overlapping jail requests merge into one enforcement
+"""
+import queue
+import threading
+from datetime import timedelta
+
+from clock import SYSTEM_CLOCK
+
+SCAN_INTERVAL_SECONDS = 5
+
+
+def _default_enforcer():
+    from productivity_enforcer import ProductivityEnforcer
+    return ProductivityEnforcer()
+
+
+class EnforcementService:
+    def __init__(self, enforcer_factory=None, clock=None, scan_interval=SCAN_INTERVAL_SECONDS, threaded=True):
+        self.enforcer_factory = enforcer_factory or _default_enforcer
+        self.clock = clock or SYSTEM_CLOCK
+        self.scan_interval = scan_interval
+        self.threaded = threaded  # False: the caller drives run_once() (tests)
+        self.commands = queue.Queue()
+        self._lock = threading.Lock()  # Guards jail state
+        self._thread_lock = threading.Lock()
+        self._thread = None
+
+        self.enforcer = None  # Created on the first start request
+        self.owners = {}  # owner -> monotonic time its jail ends
+        self.active = False
+        self._active_end = None
+        self._next_scan = None
+        self.last_error = None
+        self._force_stop = False
+        self.stats = {'commands': 0, 'activations': 0, 'deactivations': 0, 'extensions': 0,
+                      'expired': 0, 'scans': 0, 'forced_stops': 0}
+
+    # ---------------- Commands (any thread) ----------------
+    def start(self, owner, duration_hours, on_result=None):
+        """Jail for duration_hours on behalf of owner; restarting an owner replaces its end time.
+        on_result(ok, error) is called from the worker once the enforcer has (or hasn't) started"""
+        self._send(('start', owner, duration_hours * 3600, on_result))
+
+    def extend(self, owner, extra_hours):
+        self._send(('extend', owner, extra_hours * 3600, None))
+
+    def stop(self, owner=None):
+        """Release owner's hold (None releases every owner); the jail lifts when no owner is left"""
+        self._send(('stop', owner, 0, None))
+
+    def force_stop(self):
+        """Release every owner and always tell the enforcer to stop, clearing a leftover block"""
+        self._send(('force_stop', None, 0, None))
+
+    def _send(self, command):
+        self.commands.put(command)
+        if self.threaded:
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        """Start the single worker thread on first use (and again only if it died)"""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="EnforcementService", daemon=True)
+                self._thread.start()
+
+    def shutdown(self):
+        self.commands.put(None)
+
+    # ---------------- Worker ----------------
+    def _run(self):
+        while True:
+            try:
+                command = self.commands.get(timeout=self._next_wakeup())
+            except queue.Empty:
+                command = False
+            if command is None:
+                return
+            self.run_once(command or None)
+
+    def _next_wakeup(self):
+        """Seconds until the next scan or expiry; None (block) while idle"""
+        with self._lock:
+            if not self.owners and not self.active:
+                return None
+            now = self.clock.monotonic()
+            deadlines = list(self.owners.values()) + ([self._next_scan] if self._next_scan is not None else [])
+            return max(0.0, min(deadlines) - now)
+
+    def run_once(self, command=None, now=None):
+        """Apply a command plus anything queued behind it, then expire, reconcile and scan"""
+        now = self.clock.monotonic() if now is None else now
+        results = []
+        with self._lock:
+            pending = [command] if command else []
+            while True:
+                try:
+                    queued = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is None:
+                    self.commands.put(None)  # Leave shutdown for the worker loop
+                    break
+                pending.append(queued)
+            for queued in pending:
+                self._apply(queued, now)
+
+            self._reconcile(now)
+            for action, owner, _, on_result in pending:
+                if on_result:
+                    ok = self.active and owner in self.owners
+                    results.append((on_result, ok, None if ok else self.last_error))
+            scan_due = self.active and now >= self._next_scan
+            if scan_due:
+                self._next_scan = now + self.scan_interval
+        # Callbacks and the scan run outside the lock so status reads from the UI never wait on them
+        for on_result, ok, error in results:
+            try:
+                on_result(ok, error)
+            except Exception as e:
+                print(f"❌ Enforcement callback error: {e}")
+        if scan_due:
+            self._scan()
+
+    def _apply(self, command, now):
+        action, owner, seconds, _ = command
+        self.stats['commands'] += 1
+        if action == 'start':
+            self.owners[owner] = now + seconds
+        elif action == 'extend' and owner in self.owners:
+            self.owners[owner] += seconds
+        elif action == 'stop':
+            if owner is None:
+                self.owners.clear()
+            else:
+                self.owners.pop(owner, None)
+        elif action == 'force_stop':
+            self.owners.clear()
+            self._force_stop = True
+
+    def _reconcile(self, now):
+        """Bring the enforcer in line with the merged end time of all owners"""
+        for owner, end in list(self.owners.items()):
+            if end <= now:
+                del self.owners[owner]
+                self.stats['expired'] += 1
+
+        end = max(self.owners.values(), default=None)
+        try:
+            if self._force_stop:
+                # Stop even when we never started it: a crash may have left the hosts block behind
+                self._force_stop = False
+                if self.enforcer is None:
+                    self.enforcer = self.enforcer_factory()
+                self.enforcer.stop_enforcement()
+                self.active, self._active_end, self._next_scan = False, None, None
+                self.stats['forced_stops'] += 1
+            if end is not None and not self.active:
+                if self.enforcer is None:
+                    self.enforcer = self.enforcer_factory()
+                if not self.enforcer.start_enforcement((end - now) / 3600):
+                    self.last_error = "Enforcement failed to start (administrator rights needed?)"
+                    self.owners.clear()
+                    return
+                self.active, self._active_end, self._next_scan = True, end, now
+                self.last_error = None
+                self.stats['activations'] += 1
+            elif end is not None and end != self._active_end:
+                # Another owner joined or extended: keep one jail, move its end
+                self.enforcer.save_enforcement_state(self.clock.now() + timedelta(seconds=end - now))
+                self._active_end = end
+                self.stats['extensions'] += 1
+            elif end is None and self.active:
+                self.enforcer.stop_enforcement()
+                self.active, self._active_end, self._next_scan = False, None, None
+                self.stats['deactivations'] += 1
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Enforcement error: {e}")
+
+    def _scan(self):
+        try:
+            self.enforcer.scan()
+            self.stats['scans'] += 1
+        except Exception as e:
+            print(f"❌ Error in enforcement scan: {e}")
+
+    # ---------------- Status ----------------
+    def is_active(self, owner=None):
+        with self._lock:
+            return self.active and (owner is None or owner in self.owners)
+
+    def get_status(self):
+        """Active flag, minutes left per owner, last error and counters"""
+        with self._lock:
+            now = self.clock.monotonic()
+            return {
+                'active': self.active,
+                'owners': {owner: round((end - now) / 60, 1) for owner, end in self.owners.items()},
+                'last_error': self.last_error,
+                'stats': dict(self.stats),
+                'scan': self.enforcer.get_scan_stats() if self.enforcer else None
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_enforcement_service():
+    """The process-wide service shared by FocusManager and the dashboard"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = EnforcementService()
+        return _service
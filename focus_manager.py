@@ -2,10 +2,11 @@
 Focus Manager - Focus sessions and timers
 Manages 90min Deep Work and 25min Quick Focus modes
 """
-import time
+import functools
 import threading
-from datetime import datetime, timedelta
 from enum import Enum
+from clock import SYSTEM_CLOCK, SystemClock
+from deadline_scheduler import DeadlineScheduler
 
 class FocusMode(Enum):
     DEEP_WORK = "Deep Work"
@@ -17,14 +18,29 @@ class FocusState(Enum):
     PAUSED = "Paused"
     COMPLETED = "Completed"
 
+def _synchronized(method):
+    """Serialize session changes between callers and the deadline timer thread"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class FocusManager:
-    def __init__(self, data_logger):
+    def __init__(self, data_logger, clock=None, scheduler=None, warning_minutes=(5,), enforcement=None):
         self.data_logger = data_logger
+        self.clock = clock or SYSTEM_CLOCK
+        self._enforcement = enforcement  # Shared EnforcementService; the app-wide one by default
+        self._jail_requested = False  # Held with the service; jail_active waits for its confirmation
+        self._lock = threading.RLock()
         self.current_mode = None
         self.state = FocusState.INACTIVE
-        self.start_time = None
+        self.start_time = None  # Wall time, for display and logs
         self.pause_time = None
         self.total_paused_time = 0
+        # Elapsed time is measured on the monotonic clock
+        self._start_mono = None
+        self._pause_mono = None
         self.session_data = {}
         
         # Focus durations in minutes
@@ -32,7 +48,57 @@ class FocusManager:
             FocusMode.DEEP_WORK: 90,
             FocusMode.QUICK_FOCUS: 25
         }
+        
+        # Completion and "N minutes left" warnings fire from deadline timers, not polling
+        self.warning_minutes = warning_minutes
+        self.completion_listeners = []  # callback(session_data), called on the timer thread
+        self.warning_listeners = []  # callback(minutes_left), called on the timer thread
+        self._timer_ids = []
+        if scheduler is None:
+            scheduler = DeadlineScheduler(self.clock)
+            if isinstance(self.clock, SystemClock):
+                scheduler.start()
+        self.scheduler = scheduler
+    
+    def add_completion_listener(self, callback):
+        self.completion_listeners.append(callback)
+    
+    def add_warning_listener(self, callback):
+        self.warning_listeners.append(callback)
+    
+    # ---------------- Deadlines ----------------
+    def _schedule_deadlines(self):
+        """(Re)arm completion and warning timers from the remaining time"""
+        self._cancel_deadlines()
+        remaining = self.get_remaining_time()
+        self._timer_ids.append(self.scheduler.schedule_in(remaining, self._on_deadline, 'focus_complete'))
+        for minutes in self.warning_minutes:
+            if remaining > minutes * 60:
+                self._timer_ids.append(self.scheduler.schedule_in(
+                    remaining - minutes * 60, lambda m=minutes: self._on_warning(m), f'focus_warning_{minutes}m'))
     
+    def _cancel_deadlines(self):
+        for timer_id in self._timer_ids:
+            self.scheduler.cancel(timer_id)
+        self._timer_ids = []
+    
+    def _on_deadline(self):
+        with self._lock:
+            if self.state != FocusState.RUNNING:
+                return
+            if self.get_remaining_time() > 0:
+                self._schedule_deadlines()  # Fired a hair early; re-arm for the remainder
+                return
+            result = self.update()
+        for listener in self.completion_listeners:
+            listener(result)
+    
+    def _on_warning(self, minutes):
+        if self.state == FocusState.RUNNING:
+            for listener in self.warning_listeners:
+                listener(minutes)
+    
+    @_synchronized
     def start_focus_session(self, mode):
         """Start a new focus session with automatic jail mode for Deep Work"""
         if self.state == FocusState.RUNNING:
@@ -40,8 +106,10 @@ class FocusManager:
         
         self.current_mode = mode
         self.state = FocusState.RUNNING
-        self.start_time = datetime.now()
+        self.start_time = self.clock.now()
+        self._start_mono = self.clock.monotonic()
         self.pause_time = None
+        self._pause_mono = None
         self.total_paused_time = 0
         
         self.session_data = {
@@ -49,6 +117,7 @@ class FocusManager:
             'start_time': self.start_time.strftime('%H:%M:%S'),
             'duration_minutes': self.durations[mode],
             'jail_active': False,
+            'jail_error': None,
             'activities': []
         }
         
@@ -56,37 +125,42 @@ class FocusManager:
         if mode == FocusMode.DEEP_WORK:
             self._start_jail_mode()
         
+        self._schedule_deadlines()
         return True
     
+    @_synchronized
     def pause_session(self):
         """Pause the current session"""
         if self.state == FocusState.RUNNING:
             self.state = FocusState.PAUSED
-            self.pause_time = datetime.now()
+            self.pause_time = self.clock.now()
+            self._pause_mono = self.clock.monotonic()
+            self._cancel_deadlines()
             return True
         return False
     
+    @_synchronized
     def resume_session(self):
         """Resume a paused session"""
         if self.state == FocusState.PAUSED and self.pause_time:
             self.state = FocusState.RUNNING
-            self.total_paused_time += (datetime.now() - self.pause_time).total_seconds()
+            self.total_paused_time += self.clock.monotonic() - self._pause_mono
             self.pause_time = None
+            self._pause_mono = None
+            self._schedule_deadlines()  # Deadlines move out by the time spent paused
             return True
         return False
     
+    @_synchronized
     def update(self):
         """Update the timer and return current state"""
         if self.state == FocusState.RUNNING:
-            current_time = datetime.now()
-            
             # Calculate time considering pauses
-            elapsed = (current_time - self.start_time).total_seconds() - self.total_paused_time
+            elapsed = self.clock.monotonic() - self._start_mono - self.total_paused_time
             remaining = max(0, (self.durations[self.current_mode] * 60) - elapsed)
             
             if remaining <= 0:
                 self._stop_jail_mode()  # Auto-stop jail mode when session completes
-                self.state = FocusState.COMPLETED
                 return self.end_current_session()
             
             # Update session data
@@ -101,19 +175,23 @@ class FocusManager:
         
         return None
     
+    @_synchronized
     def end_current_session(self):
         """End the current focus session"""
         if self.state in [FocusState.RUNNING, FocusState.PAUSED]:
-            # Always stop jail mode if active when session ends early
-            if self.session_data.get('jail_active'):
+            self._cancel_deadlines()
+            # Always stop jail mode if active (or still starting) when session ends early
+            if self._jail_requested:
                 self._stop_jail_mode()
-            end_time = datetime.now()
+            end_time = self.clock.now()
+            end_mono = self.clock.monotonic()
             
-            if self.pause_time:  # If paused, add final pause time
-                self.total_paused_time += (end_time - self.pause_time).total_seconds()
+            if self._pause_mono is not None:  # If paused, add final pause time
+                self.total_paused_time += end_mono - self._pause_mono
+                self._pause_mono = None
             
             # Calculate actual work time (excluding pauses)
-            total_time = (end_time - self.start_time).total_seconds()
+            total_time = end_mono - self._start_mono
             active_time = total_time - self.total_paused_time
             
             self.session_data.update({
@@ -136,7 +214,7 @@ class FocusManager:
         if self.state != FocusState.RUNNING or not self.start_time:
             return 0
         
-        elapsed = (datetime.now() - self.start_time).total_seconds() - self.total_paused_time
+        elapsed = self.clock.monotonic() - self._start_mono - self.total_paused_time
         target_seconds = self.durations[self.current_mode] * 60
         remaining = max(0, target_seconds - elapsed)
         
@@ -148,9 +226,9 @@ class FocusManager:
             return 0
         
         if self.state == FocusState.PAUSED:
-            return (self.pause_time - self.start_time).total_seconds() - self.total_paused_time
+            return self._pause_mono - self._start_mono - self.total_paused_time
         elif self.state == FocusState.RUNNING:
-            return (datetime.now() - self.start_time).total_seconds() - self.total_paused_time
+            return self.clock.monotonic() - self._start_mono - self.total_paused_time
         
         return 0
     
@@ -185,56 +263,61 @@ class FocusManager:
     def log_focus_session(self):
         """Log completed focus session to data logger"""
         if self.session_data:
-            # Create a focus session entry
-            focus_session = {
-                'type': 'focus_session',
-                'timestamp': datetime.now().isoformat(),
-                'data': self.session_data.copy()
-            }
-            
-            # For now, we'll add it to today's data
-            # In a full implementation, this would be integrated with the data logger
+            # Live timer fields from update() aren't worth persisting
+            transient = ('activities', 'elapsed', 'remaining', 'elapsed_formatted', 'remaining_formatted')
+            focus_session = {k: v for k, v in self.session_data.items() if k not in transient}
+            focus_session['timestamp'] = self.clock.now().isoformat()
+            try:
+                self.data_logger.log_focus_session(focus_session)
+            except Exception as e:
+                print(f"⚠️ Failed to save focus session: {e}")
             print(f"Focus session completed: {self.session_data['mode']} - "
                   f"{self.session_data.get('active_minutes', 0):.1f}m active")
     
-    def get_daily_focus_stats(self):
-        """Get today's focus session statistics"""
-        # This would integrate with the data logger to get actual stats
-        # For now, returning placeholder data
-        return {
-            'sessions_completed': 0,
-            'total_focus_time': 0,
-            'deep_work_sessions': 0,
-            'quick_focus_sessions': 0,
-            'average_completion': 0
-        }
+    def get_daily_focus_stats(self, date=None):
+        """Get focus session statistics for a day (default today)"""
+        return self.data_logger.get_focus_stats(date)
+    
+    @property
+    def enforcement(self):
+        if self._enforcement is None:
+            from enforcement_service import get_enforcement_service
+            self._enforcement = get_enforcement_service()
+        return self._enforcement
     
     def _start_jail_mode(self):
-        """Start productivity jail mode"""
+        """Start productivity jail mode (merged with any other active jail)"""
         try:
-            from productivity_enforcer import ProductivityEnforcer
-            
-            self.jail_enforcer = ProductivityEnforcer()
             duration_hours = self.durations[self.current_mode] / 60
-            
-            if self.jail_enforcer.start_enforcement(duration_hours):
-                self.session_data['jail_active'] = True
-                print(f"🔒 Jail mode active for {duration_hours:.1f} hours")
-                # Start enforcement monitoring loop in background
-                try:
-                    monitor_thread = threading.Thread(target=self.jail_enforcer.monitor_loop, daemon=True)
-                    monitor_thread.start()
-                except Exception as mt_err:
-                    print(f"⚠️ Failed to start jail monitor thread: {mt_err}")
-            
+            session = self.session_data
+            self._jail_requested = True
+            self.enforcement.start('focus', duration_hours,
+                                   on_result=lambda ok, error: self._on_jail_result(session, ok, error))
+            print(f"🔒 Jail mode requested for {duration_hours:.1f} hours")
         except Exception as e:
+            self._jail_requested = False
             print(f"⚠️ Jail mode failed to start: {e}")
     
+    @_synchronized
+    def _on_jail_result(self, session, ok, error):
+        """Called from the enforcement worker once it knows whether the jail started"""
+        if session is not self.session_data or not self._jail_requested:
+            return  # Session ended (or jail stopped) before the answer came back
+        session['jail_active'] = ok
+        session['jail_error'] = error
+        if ok:
+            print("🔒 Jail mode active")
+        else:
+            self._jail_requested = False
+            print(f"⚠️ Jail mode failed to start: {error}")
+    
+    @_synchronized
     def _stop_jail_mode(self):
         """Stop productivity jail mode"""
-        if self.session_data.get('jail_active') and hasattr(self, 'jail_enforcer'):
+        if self._jail_requested:
             try:
-                self.jail_enforcer.stop_enforcement()
+                self.enforcement.stop('focus')
+                self._jail_requested = False
                 self.session_data['jail_active'] = False
                 print("🔓 Jail mode deactivated")
             except Exception as e:
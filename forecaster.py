@@ -0,0 +1,196 @@
+"""
+Forecaster - Weekday-aware productivity projections
+Fits a per-weekday profile plus linear trend by least squares over stored
+daily totals and projects end-of-week/month/year totals with intervals
+"""
+import calendar
+import math
+import threading
+from datetime import datetime, timedelta
+
+from clock import SYSTEM_CLOCK
+
+NUM_PARAMS = 8  # Seven weekday intercepts plus one trend slope
+TREND_SCALE_DAYS = 30.0  # Trend slope is per ~month to keep the system well conditioned
+MINUTES_PER_DAY = 1440
+Z_95 = 1.96
+
+
+def solve_linear_system(matrix, vector):
+    """Solve A x = b by Gaussian elimination with partial pivoting"""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            raise ValueError("singular system")
+        a[col], a[pivot] = a[pivot], a[col]
+
+        for row in range(col + 1, n):
+            factor = a[row][col] / a[col][col]
+            if factor:
+                for k in range(col, n + 1):
+                    a[row][k] -= factor * a[col][k]
+
+    x = [0.0] * n
+    for row in range(n - 1, -1, -1):
+        x[row] = (a[row][n] - sum(a[row][k] * x[k] for k in range(row + 1, n))) / a[row][row]
+    return x
+
+
+class ProductivityForecaster:
+    def __init__(self, data_logger, lookback_days=366, ridge=1e-3, clock=None):
+        self.data_logger = data_logger
+        self.clock = clock or SYSTEM_CLOCK
+        self.lookback_days = lookback_days
+        self.ridge = ridge  # Keeps weekday terms solvable when a weekday has no history yet
+        self._lock = threading.Lock()
+
+        self._series = {}  # date -> total productive minutes for closed days
+        self._series_through = None  # Last closed date loaded into the series
+        self._model = None
+        self._model_date = None  # Last closed date the model was fitted on
+
+    # ---------------- History ----------------
+    def _refresh_series(self, yesterday):
+        """Load only the closed days not yet in the series"""
+        earliest = yesterday - timedelta(days=self.lookback_days - 1)
+        start = earliest if self._series_through is None else max(earliest, self._series_through + timedelta(days=1))
+
+        if start <= yesterday:
+            for day_data in self.data_logger.iter_range_data(start, yesterday):
+                date = datetime.strptime(day_data['date'], '%Y-%m-%d')
+                self._series[date] = day_data['daily_summary'].get('total_productive', 0)
+            self._series_through = yesterday
+
+        for date in [d for d in self._series if d < earliest]:
+            del self._series[date]
+
+    # ---------------- Model ----------------
+    def _fit(self, yesterday):
+        """Least-squares fit of weekday intercepts plus trend over the series"""
+        points = sorted(self._series.items())
+        origin = yesterday
+
+        # Days before tracking started aren't real zero days
+        first_tracked = next((i for i, (_, value) in enumerate(points) if value), len(points))
+        points = points[first_tracked:]
+
+        if len(points) < NUM_PARAMS * 2:
+            # Too little history for a weekday profile: flat mean model
+            values = [v for _, v in points]
+            mean = sum(values) / len(values) if values else 0
+            variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1) if len(values) > 1 else mean ** 2
+            return {'coefficients': [mean] * 7 + [0.0], 'sigma': math.sqrt(variance), 'slope_se': 0.0,
+                    'origin': origin, 'span_days': len(values), 'samples': len(values), 'kind': 'mean'}
+
+        xtx = [[0.0] * NUM_PARAMS for _ in range(NUM_PARAMS)]
+        xty = [0.0] * NUM_PARAMS
+        for date, value in points:
+            weekday = date.weekday()
+            t = (date - origin).days / TREND_SCALE_DAYS
+            # Sparse design row: a single weekday indicator plus the trend term
+            for i, xi in ((weekday, 1.0), (7, t)):
+                xty[i] += xi * value
+                for j, xj in ((weekday, 1.0), (7, t)):
+                    xtx[i][j] += xi * xj
+
+        for i in range(NUM_PARAMS):
+            xtx[i][i] += self.ridge
+        coefficients = solve_linear_system(xtx, xty)
+
+        sse = 0.0
+        t_by_weekday = [[] for _ in range(7)]
+        for date, value in points:
+            t = (date - origin).days / TREND_SCALE_DAYS
+            sse += (value - coefficients[date.weekday()] - coefficients[7] * t) ** 2
+            t_by_weekday[date.weekday()].append(t)
+        sigma = math.sqrt(sse / (len(points) - NUM_PARAMS))
+
+        # Slope standard error: the trend is fitted within each weekday, so spread is measured per weekday
+        spread = sum((t - sum(ts) / len(ts)) ** 2 for ts in t_by_weekday for t in ts)
+        slope_se = sigma / math.sqrt(spread) if spread > 0 else 0.0
+
+        return {'coefficients': coefficients, 'sigma': sigma, 'slope_se': slope_se, 'origin': origin,
+                'span_days': (origin - points[0][0]).days + 1, 'samples': len(points), 'kind': 'weekday_trend'}
+
+    def get_model(self):
+        """Fitted model, refit only when a new day has closed"""
+        today = self.clock.now()
+        yesterday = datetime(today.year, today.month, today.day) - timedelta(days=1)
+
+        with self._lock:
+            if self._model is None or self._model_date != yesterday:
+                self._refresh_series(yesterday)
+                self._model = self._fit(yesterday)
+                self._model_date = yesterday
+            return self._model
+
+    def _trend_time(self, model, date):
+        """Scaled trend time for a date; the trend is held flat once the horizon
+        exceeds the history it was fitted on, instead of running on for a year"""
+        return min((date - model['origin']).days, model['span_days']) / TREND_SCALE_DAYS
+
+    def predict_day(self, model, date):
+        """Expected productive minutes for a date (between zero and a full day)"""
+        coefficients = model['coefficients']
+        t = self._trend_time(model, date)
+        return min(MINUTES_PER_DAY, max(0.0, coefficients[date.weekday()] + coefficients[7] * t))
+
+    # ---------------- Projections ----------------
+    def project(self, period_start, period_end):
+        """Project the total for [period_start, period_end] from actuals plus forecast"""
+        model = self.get_model()
+        now = self.clock.now()
+        today = datetime(now.year, now.month, now.day)
+
+        with self._lock:
+            closed_total = sum(v for d, v in self._series.items() if period_start <= d < today)
+        today_actual = self.data_logger.get_today_summary().get('total_productive', 0)
+        current_total = closed_total + today_actual
+
+        # Today counts as whichever is larger: what's done or what's expected
+        predicted = max(0.0, self.predict_day(model, today) - today_actual)
+        trend_exposure = self._trend_time(model, today)
+        future_days = 0
+        date = today + timedelta(days=1)
+        while date <= period_end:
+            predicted += self.predict_day(model, date)
+            trend_exposure += self._trend_time(model, date)
+            future_days += 1
+            date += timedelta(days=1)
+
+        # Daily noise adds up like a random walk; a slope error shifts every future day the same way
+        margin = Z_95 * math.sqrt(model['sigma'] ** 2 * (future_days + 1)
+                                  + (model['slope_se'] * trend_exposure) ** 2)
+        predicted_total = current_total + predicted
+        ceiling = current_total + max(0.0, MINUTES_PER_DAY - today_actual) + future_days * MINUTES_PER_DAY
+        days_elapsed = (today - period_start).days + 1
+
+        return {
+            'current_total': round(current_total / 60, 1),
+            'predicted_total': round(predicted_total / 60, 1),
+            'lower': round(max(current_total, predicted_total - margin) / 60, 1),
+            'upper': round(min(ceiling, predicted_total + margin) / 60, 1),
+            'daily_average': round(current_total / days_elapsed / 60, 1),
+            'days_remaining': future_days,
+            'model': model['kind']
+        }
+
+    def forecast_week(self):
+        """Projected total for the current Monday-Sunday week"""
+        now = self.clock.now()
+        monday = datetime(now.year, now.month, now.day) - timedelta(days=now.weekday())
+        return self.project(monday, monday + timedelta(days=6))
+
+    def forecast_month(self):
+        """Projected total for the current month"""
+        now = self.clock.now()
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        return self.project(datetime(now.year, now.month, 1), datetime(now.year, now.month, days_in_month))
+
+    def forecast_year(self):
+        """Projected total for the current year"""
+        now = self.clock.now()
+        return self.project(datetime(now.year, 1, 1), datetime(now.year, 12, 31))
@@ -0,0 +1,135 @@
+"""
+Frame Timing - Event-loop stall instrumentation for the dashboard
+Times Tk callbacks and panel updates into fixed-size histograms and keeps
+a log of slow frames naming the panel and range that caused them
+"""
+import math
+import time
+from collections import deque
+from datetime import datetime
+
+BUCKET_BASE_MS = 0.1
+BUCKET_GROWTH = 1.25  # Each bucket is 25% wider, so percentiles are within ~25%
+BUCKET_COUNT = 64  # Covers 0.1 ms .. ~160 s
+
+
+class FrameHistogram:
+    """Log-bucketed timing histogram; constant memory however many samples"""
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @staticmethod
+    def bucket_for(ms):
+        if ms <= BUCKET_BASE_MS:
+            return 0
+        return min(BUCKET_COUNT - 1, int(math.log(ms / BUCKET_BASE_MS, BUCKET_GROWTH)) + 1)
+
+    @staticmethod
+    def bucket_upper(index):
+        return BUCKET_BASE_MS * BUCKET_GROWTH ** index
+
+    def add(self, ms):
+        self.buckets[self.bucket_for(ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (capped at the max seen)"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(self.bucket_upper(index), self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'p50_ms': round(self.percentile(50), 2),
+            'p95_ms': round(self.percentile(95), 2),
+            'max_ms': round(self.max_ms, 2),
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0
+        }
+
+
+class FrameTimer:
+    def __init__(self, slow_ms=50, slow_log_size=50):
+        self.slow_ms = slow_ms
+        self.histograms = {}
+        self.slow_frames = deque(maxlen=slow_log_size)
+
+    def record(self, name, ms, context=None):
+        """Add a timing; anything over the threshold also lands in the slow-frame log"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = FrameHistogram()
+        histogram.add(ms)
+
+        if ms >= self.slow_ms:
+            self.slow_frames.append({
+                'time': datetime.now().strftime('%H:%M:%S'),
+                'name': name,
+                'context': context,
+                'ms': round(ms, 1)
+            })
+            where = f" ({context})" if context else ""
+            print(f"🐢 Slow frame: {name}{where} took {ms:.0f}ms")
+
+    def wrap(self, name, func, context=None):
+        """Callable that runs func and records how long it held the event loop"""
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, (time.perf_counter() - started) * 1000,
+                            context() if callable(context) else context)
+        return timed
+
+    def get_summary(self):
+        """Per-name p50/p95/max, slowest p95 first"""
+        summary = {name: h.summary() for name, h in self.histograms.items()}
+        return dict(sorted(summary.items(), key=lambda item: -item[1]['p95_ms']))
+
+    def format_report(self):
+        """Plain-text table for the diagnostics window"""
+        lines = [f"{'callback':<28}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+        for name, s in self.get_summary().items():
+            lines.append(f"{name:<28}{s['count']:>7}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['max_ms']:>9.1f}")
+        lines.append("")
+        lines.append(f"Slow frames (>= {self.slow_ms}ms), newest first:")
+        for frame in reversed(self.slow_frames):
+            where = f" [{frame['context']}]" if frame['context'] else ""
+            lines.append(f"  {frame['time']}  {frame['name']}{where}  {frame['ms']:.0f}ms")
+        return "\n".join(lines)
+
+
+class StartupTimer:
+    """Wall-clock phases from launch to first paint"""
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self._last = self.started
+        self.phases = []
+
+    def mark(self, phase):
+        """Close the current phase; its duration runs from the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, round((now - self._last) * 1000, 1)))
+        self._last = now
+
+    def total_ms(self):
+        return round((self._last - self.started) * 1000, 1)
+
+    def format_report(self):
+        lines = [f"Startup: {self.total_ms():.0f}ms to first paint"]
+        lines.extend(f"  {phase:<20}{ms:>8.1f}ms" for phase, ms in self.phases)
+        return "\n".join(lines)
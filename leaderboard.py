@@ -0,0 +1,171 @@
+"""
+Leaderboard - Top applications and window titles by time spent
+Streams the session store day by day and keeps only bounded running totals
+(weighted Space-Saving: every reported total carries its worst-case overcount)
+"""
+import heapq
+import re
+import threading
+from datetime import datetime, timedelta
+
+# Browser/editor suffixes that make the same page look like different titles
+TITLE_SUFFIXES = [
+    " - google chrome", " - mozilla firefox", " - microsoft edge",
+    " - brave", " - opera", " - visual studio code", " - notepad++", " - notepad"
+]
+_NOTIFICATION_PREFIX = re.compile(r'^\(\d+\+?\)\s*')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_title(title):
+    """Normalize a window title so the same page/document groups together"""
+    if not title:
+        return "(untitled)"
+
+    normalized = _WHITESPACE.sub(' ', title).strip().lower()
+    normalized = _NOTIFICATION_PREFIX.sub('', normalized)
+
+    for suffix in TITLE_SUFFIXES:
+        if normalized.endswith(suffix):
+            normalized = normalized[:-len(suffix)]
+            break
+
+    # Leading unsaved-file markers from editors
+    normalized = normalized.lstrip('● *').strip()
+    return normalized or "(untitled)"
+
+
+class SpaceSavingCounter:
+    """Weighted Space-Saving summary holding at most capacity keys.
+    A key's reported minutes are never below its true total and at most
+    `error` above it; every error is <= total_minutes / capacity."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}  # key -> reported minutes
+        self.errors = {}  # key -> minutes that may belong to keys it replaced
+        self.total = 0.0
+        self._heap = []  # Lazy (count, key) min-heap; stale entries are skipped
+
+    def add(self, key, weight):
+        self.total += weight
+        if key in self.counts:
+            self.counts[key] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0.0
+        else:
+            # Evict the smallest counter; the newcomer inherits its count as possible error
+            floor, evicted = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[key] = floor + weight
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > self.capacity * 4:
+            self._heap = [(count, k) for k, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    def max_error(self):
+        """Bound on any key's overcount"""
+        return self.total / self.capacity
+
+    def top(self, k):
+        """The k largest counters as (key, minutes, error)"""
+        top = heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+        return [(key, minutes, self.errors[key]) for key, minutes in top]
+
+
+class ActivityLeaderboard:
+    def __init__(self, data_logger, max_tracked=5000):
+        self.data_logger = data_logger
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+
+        # Running totals for the current month, kept up to date as sessions end
+        self._period_key = None
+        self._period_apps = SpaceSavingCounter(max_tracked)
+        self._period_titles = SpaceSavingCounter(max_tracked)
+        self._seed_covered = {}  # id -> session already counted by the seed; its listener event is skipped
+
+        data_logger.add_session_listener(self._on_session_ended)
+
+    def _add_session(self, apps, titles, session):
+        """Add one session's minutes to the running totals"""
+        minutes = session.get('duration_minutes', 0) or 0
+        if minutes <= 0:
+            return
+
+        app = (session.get('application') or 'Unknown').lower()
+        title = normalize_title(session.get('window_title'))
+        apps.add(app, minutes)
+        titles.add(title, minutes)
+
+    def _accumulate_range(self, start_date, end_date):
+        """Stream sessions for a date range into bounded app/title totals"""
+        apps = SpaceSavingCounter(self.max_tracked)
+        titles = SpaceSavingCounter(self.max_tracked)
+
+        for day_data in self.data_logger.iter_range_data(start_date, end_date):
+            for session in day_data.get('sessions', []):
+                self._add_session(apps, titles, session)
+
+        return apps, titles
+
+    def _top_k(self, totals, k):
+        """The k largest entries; error is how many of the minutes may belong to other keys"""
+        return [{'name': name, 'minutes': round(minutes, 1), 'error': round(error, 1)}
+                for name, minutes, error in totals.top(k)]
+
+    def get_top(self, start_date, end_date, k=10):
+        """Top-k applications and normalized titles for an arbitrary date range"""
+        apps, titles = self._accumulate_range(start_date, end_date)
+        return {
+            'applications': self._top_k(apps, k),
+            'titles': self._top_k(titles, k)
+        }
+
+    def get_current_top(self, k=10):
+        """Top-k applications and titles for the current month"""
+        now = datetime.now()
+        period_key = now.strftime('%Y-%m')
+
+        with self._lock:
+            if self._period_key != period_key:
+                # First call or the month rolled over: seed once from storage
+                self._seed_period(now)
+                self._period_key = period_key
+
+            return {
+                'period': period_key,
+                'applications': self._top_k(self._period_apps, k),
+                'titles': self._top_k(self._period_titles, k)
+            }
+
+    def _seed_period(self, now):
+        """Past days of the month from storage, today from the logger's memory.
+        A session can end while the seed runs; its listener event is then still
+        on the way, so the seed remembers which sessions it already counted."""
+        apps, titles = self._accumulate_range(datetime(now.year, now.month, 1), now - timedelta(days=1))
+        date_str, sessions = self.data_logger.get_today_sessions()
+        if date_str == now.strftime('%Y-%m-%d'):
+            for session in sessions:
+                self._add_session(apps, titles, session)
+        # Otherwise the logger hasn't rolled over and these are yesterday's, already read from disk
+        self._seed_covered = {id(session): session for session in sessions}
+        self._period_apps, self._period_titles = apps, titles
+
+    def _on_session_ended(self, session):
+        """Fold a newly ended session into the current month's totals"""
+        with self._lock:
+            if self._period_key != datetime.now().strftime('%Y-%m'):
+                return  # Not seeded yet (or stale); the next read reseeds
+            if self._seed_covered.pop(id(session), None) is session:
+                return  # Ended while the seed ran and was counted by it
+            self._add_session(self._period_apps, self._period_titles, session)
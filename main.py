@@ -2,29 +2,46 @@
 Simple ADHD Productivity Tracker
 Main entry point for the application
 """
+import time
+_LAUNCHED = time.perf_counter()
+
 import tkinter as tk
+from frame_timing import StartupTimer
 from dashboard import ProductivityDashboard
 from activity_monitor import ActivityMonitor
 from data_logger import DataLogger
 import threading
-import time
 
 class ProductivityTracker:
     def __init__(self):
+        self.startup = StartupTimer(_LAUNCHED)
+        self.startup.mark("imports")
         self.root = tk.Tk()
         self.root.title("ADHD Productivity Tracker")
         self.root.geometry("800x600")
+        self.startup.mark("window")
         
         # Initialize components
         self.data_logger = DataLogger()
+        self.startup.mark("data_logger")
         self.activity_monitor = ActivityMonitor(self.data_logger)
+        self.startup.mark("activity_monitor")
         self.dashboard = ProductivityDashboard(self.root, self.data_logger, self.activity_monitor)
+        self.dashboard.startup_timer = self.startup
+        self.startup.mark("dashboard")
+        self.root.after_idle(self._first_paint)
         
         # Start monitoring in background thread
         self.monitoring = True
         self.monitor_thread = threading.Thread(target=self.start_monitoring, daemon=True)
         self.monitor_thread.start()
     
+    def _first_paint(self):
+        """Runs once the initial window has been laid out and drawn"""
+        self.startup.mark("first_paint")
+        print(f"🚀 {self.startup.format_report()}")
+        self.dashboard.start_background_services()
+    
     def start_monitoring(self):
         """Run activity monitoring in background"""
         while self.monitoring:
@@ -0,0 +1,83 @@
+"""
+Notifications - Non-blocking block notices
+The enforcement thread posts notices without waiting; the dashboard is the
+single UI owner that drains and shows them. Repeats are de-duplicated per
+site and the total rate is capped
+"""
+import threading
+from collections import deque
+
+from clock import SYSTEM_CLOCK
+
+DEDUPE_SECONDS = 300  # The same site is announced at most once per 5 minutes
+RATE_LIMIT = (3, 60)  # At most 3 notices per 60 seconds overall
+MAX_PENDING = 20
+
+
+class NotificationQueue:
+    def __init__(self, clock=None, dedupe_seconds=DEDUPE_SECONDS, rate_limit=RATE_LIMIT, max_pending=MAX_PENDING):
+        self.clock = clock or SYSTEM_CLOCK
+        self.dedupe_seconds = dedupe_seconds
+        self.rate_count, self.rate_seconds = rate_limit
+        self._lock = threading.Lock()
+        self._pending = deque(maxlen=max_pending)  # Oldest notices fall off if nobody drains
+        self._last_posted = {}  # key -> monotonic time it was last accepted
+        self._recent = deque()  # Monotonic times of accepted notices inside the rate window
+        self.stats = {'posted': 0, 'delivered': 0, 'deduplicated': 0, 'rate_limited': 0}
+
+    def post(self, key, title, message):
+        """Queue a notice unless key was announced recently or the rate cap is hit; never blocks on the UI"""
+        now = self.clock.monotonic()
+        with self._lock:
+            last = self._last_posted.get(key)
+            if last is not None and now - last < self.dedupe_seconds:
+                self.stats['deduplicated'] += 1
+                return False
+
+            while self._recent and now - self._recent[0] >= self.rate_seconds:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_count:
+                self.stats['rate_limited'] += 1
+                return False
+
+            self._last_posted[key] = now
+            self._recent.append(now)
+            self._pending.append({'key': key, 'title': title, 'message': message,
+                                  'time': self.clock.now().strftime('%H:%M:%S')})
+            self.stats['posted'] += 1
+            return True
+
+    def drain(self):
+        """Take every pending notice, oldest first (called by the UI owner)"""
+        with self._lock:
+            notices = list(self._pending)
+            self._pending.clear()
+            self.stats['delivered'] += len(notices)
+            return notices
+
+    def forget(self, key=None):
+        """Allow key (or every key) to be announced again right away"""
+        with self._lock:
+            if key is None:
+                self._last_posted.clear()
+            else:
+                self._last_posted.pop(key, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+            return stats
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_notification_queue():
+    """The process-wide queue shared by the enforcer and the dashboard"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = NotificationQueue()
+        return _queue
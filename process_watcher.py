@@ -0,0 +1,169 @@
+"""
+Process Watcher - Process-creation events for the enforcer
+Reports new processes within one short poll of their launch so blocked apps
+can be killed right away instead of on the next 5-second scan
+"""
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+
+from clock import SYSTEM_CLOCK
+
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class PollingProcessWatcher(ABC):
+    """Diffs the live PID set every poll interval and reports PIDs it hasn't seen.
+    Subclasses supply list_pids() and process_name(pid)."""
+
+    def __init__(self, poll_interval=POLL_INTERVAL_SECONDS, clock=None):
+        self.poll_interval = poll_interval
+        self.clock = clock or SYSTEM_CLOCK
+        self.on_process = None
+        self._known = set()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.stats = {'polls': 0, 'new_processes': 0, 'errors': 0}
+
+    @abstractmethod
+    def list_pids(self):
+        """PIDs of every live process"""
+
+    @abstractmethod
+    def process_name(self, pid):
+        """Executable name of pid, or None if it is gone or inaccessible"""
+
+    def prime(self, on_process):
+        """Take the current PIDs as already seen, so poll() reports only later launches to on_process"""
+        self.on_process = on_process
+        self._known = set(self.list_pids())  # Already-running processes are the timed scan's job
+
+    def start(self, on_process):
+        """Call on_process(pid, name, detected_at) for every process launched from now on"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.prime(on_process)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ Process watcher error: {e}")
+
+    def poll(self):
+        """Report PIDs that appeared since the last poll; returns how many"""
+        pids = set(self.list_pids())
+        detected_at = self.clock.monotonic()
+        new = pids - self._known
+        self._known = pids  # Exited PIDs drop out, so a reused PID is reported again
+        self.stats['polls'] += 1
+
+        for pid in new:
+            name = self.process_name(pid)
+            if name:  # None: it already exited or we may not inspect it
+                self.stats['new_processes'] += 1
+                self.on_process(pid, name, detected_at)
+        return len(new)
+
+
+class ProcProcessWatcher(PollingProcessWatcher):
+    """Linux: PIDs are the numeric entries under /proc"""
+
+    def __init__(self, proc_dir="/proc", **kwargs):
+        super().__init__(**kwargs)
+        self.proc_dir = proc_dir
+
+    def list_pids(self):
+        return [int(entry) for entry in os.listdir(self.proc_dir) if entry.isdigit()]
+
+    def process_name(self, pid):
+        try:
+            with open(os.path.join(self.proc_dir, str(pid), "comm"), 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+
+class WindowsProcessWatcher(PollingProcessWatcher):
+    """Windows: EnumProcesses is a single cheap call, so the PID set can be polled every 50ms"""
+
+    def __init__(self, **kwargs):
+        import win32process
+        import psutil
+        self._enum_processes = win32process.EnumProcesses
+        self._psutil = psutil
+        super().__init__(**kwargs)
+
+    def list_pids(self):
+        return self._enum_processes()
+
+    def process_name(self, pid):
+        try:
+            return self._psutil.Process(pid).name()
+        except (self._psutil.NoSuchProcess, self._psutil.AccessDenied):
+            return None
+
+
+class FakeProcessWatcher:
+    """Test double: processes "start" when emit() is called"""
+
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.on_process = None
+        self.stats = {'polls': 0, 'new_processes': 0, 'errors': 0}
+
+    def start(self, on_process):
+        self.on_process = on_process
+
+    def stop(self):
+        self.on_process = None
+
+    def is_running(self):
+        return self.on_process is not None
+
+    def emit(self, pid, name):
+        self.stats['new_processes'] += 1
+        if self.on_process:
+            self.on_process(pid, name, self.clock.monotonic())
+
+
+def create_process_watcher(**kwargs):
+    """Best watcher for this platform, or None (the timed scan still runs)"""
+    try:
+        if sys.platform == "win32":
+            return WindowsProcessWatcher(**kwargs)
+        if os.path.isdir("/proc"):
+            return ProcProcessWatcher(**kwargs)
+    except ImportError:
+        print("⚠️ pywin32/psutil not available for the process watcher")
+    return None
+
+
+def terminate_pid(pid):
+    """Terminate a process by PID; False if it is already gone or protected"""
+    try:
+        import psutil
+        try:
+            psutil.Process(pid).terminate()
+            return True
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+    except ImportError:
+        import signal
+        try:
+            os.kill(pid, signal.SIGTERM)
+            return True
+        except OSError:
+            return False
@@ -3,16 +3,71 @@ Productivity Enforcer - Website and Application Blocker
 Blocks distracting websites and applications during work sessions
 """
 import os
+import re
 import sys
 import subprocess
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-import winreg
+try:
+    import winreg  # Windows only
+except ImportError:
+    winreg = None
 import ctypes
 from ctypes import wintypes
+import queue
+import threading
 import time
 
+from frame_timing import FrameHistogram
+from notifications import get_notification_queue
+
+NOTICE_POLL_SECONDS = 0.5
+
+
+class NoticeDialogThread:
+    """Standalone mode's notices: one long-lived thread owns the only Tk
+    interpreter and shows queued notices one at a time"""
+
+    def __init__(self):
+        self.notices = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="BlockNotices", daemon=True)
+        self._thread.start()
+
+    def show(self, title, message):
+        self.notices.put((title, message))
+
+    def _run(self):
+        try:
+            import tkinter as tk
+            from tkinter import messagebox
+            
+            root = tk.Tk()
+            root.withdraw()  # Hide main window
+        except Exception:
+            root = None  # No display: notices were already printed when they were queued
+        while True:
+            title, message = self.notices.get()
+            if root is None:
+                continue
+            try:
+                messagebox.showwarning(title, message, parent=root)
+            except Exception as e:
+                print(f"⚠️ Could not show notice: {e}")
+
+
+_dialogs = None
+_dialogs_lock = threading.Lock()
+
+
+def show_notice_dialog(title, message):
+    """Hand a notice to the single dialog thread, starting it on first use"""
+    global _dialogs
+    with _dialogs_lock:
+        if _dialogs is None:
+            _dialogs = NoticeDialogThread()
+    _dialogs.show(title, message)
+
 class ProductivityEnforcer:
     def __init__(self):
         self.hosts_file = r"C:\Windows\System32\drivers\etc\hosts"
@@ -20,6 +75,29 @@ class ProductivityEnforcer:
         self.blocked_processes = []
         self.enforcement_active = False
         
+        # Incremental process scanning: (pid, create_time) -> verdict for processes already judged
+        self._process_verdicts = {}
+        self.scan_stats = {
+            'scans': 0, 'last_scan_ms': 0, 'last_processes': 0, 'last_new': 0,
+            'last_killed': 0, 'total_killed': 0
+        }
+        
+        # Process-creation watcher: kills blocked apps at launch, the timed scan is the fallback
+        self.process_watcher = None
+        self._terminate_pid = None
+        self.kill_latency = FrameHistogram()  # Detection-to-kill, in ms
+        self.watcher_stats = {'blocked': 0, 'kill_failed': 0}
+        
+        # Block notices go to the dashboard's queue; this thread never waits on a dialog
+        self.notifications = get_notification_queue()
+        
+        # Browser titles: hwnd -> (title hash, verdict), so unchanged windows aren't re-matched
+        self._title_verdicts = {}
+        self.browser_stats = {
+            'scans': 0, 'last_scan_ms': 0, 'last_windows': 0, 'last_evaluated': 0,
+            'last_skipped': 0, 'last_blocked': 0
+        }
+        
         # Ensure data directory exists
         Path("productivity_data").mkdir(exist_ok=True)
         
@@ -110,6 +188,15 @@ class ProductivityEnforcer:
             "chrome.exe", "firefox.exe", "edge.exe",  # Browsers (with site filtering)
             "explorer.exe", "taskmgr.exe"
         ]
+        
+        # Lowercased once so each process check is a set lookup
+        self.blocked_app_names = frozenset(app.lower() for app in self.blocked_apps)
+        
+        # One regex pass per title instead of a substring check per site (longest first)
+        self.blocked_site_pattern = re.compile("|".join(
+            re.escape(site.lower()) for site in sorted(self.blocked_sites, key=len, reverse=True)))
+        self.allowed_youtube_pattern = re.compile("|".join(
+            re.escape(allowed.lower()) for allowed in self.allowed_youtube))
     
     def backup_hosts_file(self):
         """Backup original hosts file"""
@@ -165,9 +252,8 @@ class ProductivityEnforcer:
         title_lower = title.lower()
         
         # Check for allowed creators/channels
-        for allowed in self.allowed_youtube:
-            if allowed.lower() in title_lower:
-                return True
+        if self.allowed_youtube_pattern.search(title_lower):
+            return True
         
         # Block common entertainment keywords
         blocked_keywords = [
@@ -188,20 +274,100 @@ class ProductivityEnforcer:
         try:
             import psutil
             
-            for proc in psutil.process_iter(['pid', 'name', 'exe']):
-                try:
-                    proc_name = proc.info['name'].lower()
-                    
-                    if proc_name in [app.lower() for app in self.blocked_apps]:
-                        print(f"🚫 Blocking {proc_name} (PID: {proc.info['pid']})")
-                        proc.terminate()  # Terminate the process
-                        
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
+            return self.evaluate_processes(
+                psutil.process_iter(['create_time']),
+                errors=(psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess))
                     
         except ImportError:
             print("⚠️ psutil not available for process monitoring")
     
+    def evaluate_processes(self, processes, errors=()):
+        """Judge only processes not seen before and terminate blocked ones.
+        processes: psutil.Process-like objects with pid, info['create_time'], name() and terminate()"""
+        started = time.perf_counter()
+        seen = {}
+        new = killed = 0
+        
+        for proc in processes:
+            try:
+                # create_time tells a reused PID apart from the process we judged before
+                key = (proc.pid, proc.info.get('create_time'))
+                verdict = self._process_verdicts.get(key)
+                if verdict is None:
+                    new += 1
+                    verdict = 'blocked' if proc.name().lower() in self.blocked_app_names else 'allowed'
+                
+                if verdict == 'blocked':
+                    # Blocked processes stay unjudged, so one that survives terminate() is retried
+                    print(f"🚫 Blocking {proc.name().lower()} (PID: {proc.pid})")
+                    proc.terminate()  # Terminate the process
+                    killed += 1
+                else:
+                    seen[key] = verdict
+                    
+            except errors:
+                pass
+        
+        # Only keep verdicts for processes that still exist
+        self._process_verdicts = seen
+        
+        stats = self.scan_stats
+        stats['scans'] += 1
+        stats['last_scan_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        stats['last_processes'] = len(seen) + killed
+        stats['last_new'] = new
+        stats['last_killed'] = killed
+        stats['total_killed'] += killed
+        return dict(stats)
+    
+    def get_scan_stats(self):
+        """Cost and new-process count of the last scan, plus running totals"""
+        stats = dict(self.scan_stats)
+        stats['tracked_processes'] = len(self._process_verdicts)
+        stats['watcher'] = self.get_watcher_stats()
+        stats['browser'] = dict(self.browser_stats)
+        return stats
+    
+    def start_process_watcher(self, watcher=None, terminate=None):
+        """Kill blocked apps as soon as they launch; False if no watcher works on this platform"""
+        from process_watcher import create_process_watcher, terminate_pid
+        
+        self.stop_process_watcher()
+        self.process_watcher = watcher or create_process_watcher()
+        self._terminate_pid = terminate or terminate_pid
+        if self.process_watcher is None:
+            return False
+        self.process_watcher.start(self.handle_new_process)
+        return True
+    
+    def stop_process_watcher(self):
+        if self.process_watcher:
+            self.process_watcher.stop()
+            self.process_watcher = None
+    
+    def handle_new_process(self, pid, name, detected_at):
+        """Watcher callback: terminate a blocked app and record how long that took"""
+        watcher = self.process_watcher
+        if watcher is None or name.lower() not in self.blocked_app_names:
+            return False
+        
+        if not self._terminate_pid(pid):
+            self.watcher_stats['kill_failed'] += 1
+            return False
+        
+        latency_ms = (watcher.clock.monotonic() - detected_at) * 1000
+        self.kill_latency.add(latency_ms)
+        self.watcher_stats['blocked'] += 1
+        print(f"🚫 Blocked {name} at launch (PID: {pid}, {latency_ms:.1f}ms after detection)")
+        return True
+    
+    def get_watcher_stats(self):
+        """Launch-time kills and their detection-to-kill latency"""
+        stats = dict(self.watcher_stats)
+        stats['running'] = bool(self.process_watcher and self.process_watcher.is_running())
+        stats['latency'] = self.kill_latency.summary()
+        return stats
+    
     def check_browser_content(self):
         """Monitor browser windows for blocked content"""
         try:
@@ -211,44 +377,90 @@ class ProductivityEnforcer:
                 if win32gui.IsWindowVisible(hwnd):
                     window_text = win32gui.GetWindowText(hwnd)
                     if window_text:
-                        windows.append(window_text)
+                        windows.append((hwnd, window_text))
             
             windows = []
             win32gui.EnumWindows(enum_windows_callback, windows)
             
-            for window_title in windows:
-                title_lower = window_title.lower()
-                
-                # Check for blocked sites in browser titles
-                for site in self.blocked_sites:
-                    if site in title_lower:
-                        # Special handling for YouTube
-                        if "youtube" in title_lower:
-                            if not self.check_youtube_content(window_title):
-                                print(f"🚫 Blocked YouTube content: {window_title[:50]}...")
-                                self.show_block_message("YouTube content blocked", 
-                                                       "Only educational content allowed!")
-                        else:
-                            print(f"🚫 Blocked site detected: {site}")
-                            self.show_block_message("Website blocked", f"{site} is not allowed during work time")
+            return self.evaluate_windows(windows)
                             
         except ImportError:
             print("⚠️ win32gui not available for browser monitoring")
     
-    def show_block_message(self, title, message):
-        """Show blocking notification"""
-        try:
-            import tkinter as tk
-            from tkinter import messagebox
-            
-            root = tk.Tk()
-            root.withdraw()  # Hide main window
-            messagebox.showwarning(title, f"{message}\n\nFocus on your work! 💪")
-            root.destroy()
+    def judge_title(self, window_title):
+        """Block verdict for a window title: (log line, notice title, notice message) or None"""
+        title_lower = window_title.lower()
+        
+        # Check for blocked sites in browser titles
+        match = self.blocked_site_pattern.search(title_lower)
+        if not match:
+            return None
+        
+        # Special handling for YouTube
+        if "youtube" in title_lower:
+            if self.check_youtube_content(window_title):
+                return None
+            return (f"🚫 Blocked YouTube content: {window_title[:50]}...",
+                    "YouTube content blocked", "Only educational content allowed!")
+        
+        site = match.group()
+        return (f"🚫 Blocked site detected: {site}",
+                "Website blocked", f"{site} is not allowed during work time")
+    
+    def evaluate_windows(self, windows):
+        """Match only new or retitled windows and act on every blocked one.
+        windows: (hwnd, title) pairs for the visible windows"""
+        started = time.perf_counter()
+        cache = {}
+        evaluated = skipped = blocked = 0
+        
+        for hwnd, window_title in windows:
+            title_hash = hash(window_title)
+            cached = self._title_verdicts.get(hwnd)
+            if cached and cached[0] == title_hash:
+                skipped += 1
+                verdict = cached[1]
+            else:
+                evaluated += 1
+                verdict = self.judge_title(window_title)
+            cache[hwnd] = (title_hash, verdict)
             
-        except Exception:
+            if verdict:
+                blocked += 1
+                log_line, title, message = verdict
+                print(log_line)
+                self.show_block_message(title, message)
+        
+        # Closed windows drop out of the cache
+        self._title_verdicts = cache
+        
+        stats = self.browser_stats
+        stats['scans'] += 1
+        stats['last_scan_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        stats['last_windows'] = len(cache)
+        stats['last_evaluated'] = evaluated
+        stats['last_skipped'] = skipped
+        stats['last_blocked'] = blocked
+        return dict(stats)
+    
+    def scan(self):
+        """One enforcement pass: blocked processes, then browser content"""
+        self.monitor_processes()
+        self.check_browser_content()
+    
+    def show_block_message(self, title, message):
+        """Queue a blocking notification (de-duplicated per site, rate limited)"""
+        # The message names the site, so it doubles as the de-duplication key
+        if self.notifications.post(message, title, f"{message}\n\nFocus on your work! 💪"):
             print(f"🚫 {title}: {message}")
     
+    def show_pending_notices(self, display=show_notice_dialog):
+        """Drain and show queued notices; the CLI has no dashboard to do it"""
+        notices = self.notifications.drain()
+        for notice in notices:
+            display(notice['title'], notice['message'])
+        return len(notices)
+    
     def start_enforcement(self, duration_hours=8):
         """Start productivity enforcement"""
         print("🔒 Starting Productivity Enforcement Mode")
@@ -262,6 +474,7 @@ class ProductivityEnforcer:
         
         self.enforcement_active = True
         end_time = datetime.now() + timedelta(hours=duration_hours)
+        self.start_process_watcher()
         
         print(f"✅ Enforcement active until: {end_time.strftime('%I:%M %p')}")
         print("\n📋 What's blocked:")
@@ -286,6 +499,8 @@ class ProductivityEnforcer:
         """Stop productivity enforcement"""
         print("🔓 Stopping Productivity Enforcement Mode")
         
+        self.stop_process_watcher()
+        
         if self.modify_hosts_file(block=False):
             self.enforcement_active = False
             self.clear_enforcement_state()
@@ -345,10 +560,13 @@ class ProductivityEnforcer:
                     break
                 
                 # Monitor processes and browser content
-                self.monitor_processes()
-                self.check_browser_content()
+                self.scan()
                 
-                time.sleep(5)  # Check every 5 seconds
+                # Fallback sweep every 5s; the process watcher catches launches in between,
+                # and their notices are shown within half a second
+                for _ in range(int(5 / NOTICE_POLL_SECONDS)):
+                    self.show_pending_notices()
+                    time.sleep(NOTICE_POLL_SECONDS)
                 
         except KeyboardInterrupt:
             print("\n🛑 Monitoring stopped by user")
@@ -380,6 +598,7 @@ def main():
         choice = input("Continue monitoring? (y/n): ").lower().strip()
         if choice in ['y', 'yes']:
             enforcer.enforcement_active = True
+            enforcer.start_process_watcher()
             enforcer.monitor_loop()
             return
     
@@ -0,0 +1,115 @@
+"""
+Refresh Scheduler - Per-panel redraw scheduling for the dashboard
+Each panel declares its cadence, the data it depends on and when it is
+visible; it is only redrawn when due, visible and its inputs changed
+"""
+import time
+
+_UNSET = object()
+
+
+class RefreshScheduler:
+    def __init__(self, root=None, tick_ms=250, clock=time.monotonic, frame_timer=None):
+        self.root = root
+        self.frame_timer = frame_timer  # Optional FrameTimer that also receives every panel timing
+        self.tick_ms = tick_ms
+        self.clock = clock
+        self.panels = {}
+        self._running = False
+
+    def add_panel(self, name, refresh, interval_ms, token=None, visible=None, context=None):
+        """Register a panel.
+        refresh: callable redrawing the panel; returning False means it couldn't take
+                 the new inputs yet (e.g. a compute is still running), so it stays dirty
+        token: callable returning a hashable snapshot of the panel's inputs;
+               the panel is skipped while it is unchanged (None = always redraw when due)
+        visible: callable returning whether the panel is on screen
+        context: callable describing what the panel is showing (e.g. its range), for slow-frame logs"""
+        self.panels[name] = {
+            'refresh': refresh,
+            'interval': interval_ms / 1000,
+            'token': token,
+            'visible': visible,
+            'context': context,
+            'last_token': _UNSET,
+            'next_due': 0.0,
+            'dirty': True,
+            'stats': {'runs': 0, 'skipped_clean': 0, 'skipped_hidden': 0, 'errors': 0,
+                      'total_ms': 0.0, 'last_ms': 0.0, 'max_ms': 0.0}
+        }
+
+    def mark_dirty(self, name=None):
+        """Force a panel (or every panel) to redraw at its next due time"""
+        for panel_name, panel in self.panels.items():
+            if name is None or panel_name == name:
+                panel['dirty'] = True
+                panel['next_due'] = 0.0
+
+    def expedite(self):
+        """Make every panel due now (e.g. after a tab switch) and run those that need it"""
+        for panel in self.panels.values():
+            panel['next_due'] = 0.0
+        return self.run_due()
+
+    def run_due(self, now=None):
+        """Refresh every due, visible panel whose inputs changed; returns the names run"""
+        now = self.clock() if now is None else now
+        ran = []
+        for name, panel in self.panels.items():
+            if now < panel['next_due']:
+                continue
+            stats = panel['stats']
+            panel['next_due'] = now + panel['interval']
+
+            if panel['visible'] and not panel['visible']():
+                stats['skipped_hidden'] += 1
+                continue  # Inputs stay unseen, so it redraws once it's shown
+
+            token = panel['token']() if panel['token'] else _UNSET
+            if panel['token'] and not panel['dirty'] and token == panel['last_token']:
+                stats['skipped_clean'] += 1
+                continue
+
+            started = time.perf_counter()
+            try:
+                if panel['refresh']() is not False:
+                    panel['last_token'] = token
+                    panel['dirty'] = False
+            except Exception as e:
+                stats['errors'] += 1
+                print(f"Refresh error in {name}: {e}")
+            elapsed = (time.perf_counter() - started) * 1000
+            stats['runs'] += 1
+            stats['last_ms'] = round(elapsed, 2)
+            stats['max_ms'] = round(max(stats['max_ms'], elapsed), 2)
+            stats['total_ms'] = round(stats['total_ms'] + elapsed, 2)
+            if self.frame_timer:
+                self.frame_timer.record(f"panel:{name}", elapsed, panel['context']() if panel['context'] else None)
+            ran.append(name)
+        return ran
+
+    def start(self):
+        """Drive run_due from the Tk event loop"""
+        self._running = True
+        self._tick()
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        if not self._running:
+            return
+        if self.frame_timer:
+            self.frame_timer.wrap('after:refresh_tick', self.run_due)()
+        else:
+            self.run_due()
+        self.root.after(self.tick_ms, self._tick)
+
+    def get_stats(self):
+        """Per-panel run/skip counts and durations"""
+        result = {}
+        for name, panel in self.panels.items():
+            stats = dict(panel['stats'])
+            stats['avg_ms'] = round(stats['total_ms'] / stats['runs'], 2) if stats['runs'] else 0
+            result[name] = stats
+        return result
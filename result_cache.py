@@ -0,0 +1,62 @@
+"""
+Result Cache - Version-stamped memoization for computed stats
+Results are reused until the data version they were computed against changes;
+callers always get their own copy, so editing one can't corrupt the cache
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (data_version, result), in LRU order
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, version, compute):
+        """Return a copy of the cached result for key at version, computing it on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                self.stale += 1
+            self.misses += 1
+
+        # Compute outside the lock so slow queries don't serialize lookups
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return copy.deepcopy(result)
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Get hit/miss counters for display and diagnostics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 2) if lookups else 0
+            }
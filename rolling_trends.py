@@ -0,0 +1,155 @@
+"""
+Rolling Trends - Incremental moving sums and EWMAs over daily summaries
+Each closed day updates every window in O(1); state persists across restarts
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from clock import SYSTEM_CLOCK
+
+WINDOWS = (7, 28, 90)
+SERIES = ['building', 'studying', 'applying', 'knowledge', 'pseudo_productive', 'total_productive']
+RING_SIZE = max(WINDOWS)
+
+
+class RollingTrendEngine:
+    def __init__(self, data_dir="productivity_data", clock=None):
+        self.state_file = os.path.join(data_dir, "rolling_trends.json")
+        self.clock = clock or SYSTEM_CLOCK
+        self._lock = threading.Lock()
+        self._reset()
+        self.load_state()
+
+    def _reset(self):
+        """Start from an empty history"""
+        self.last_date = None
+        self.days_ingested = 0
+        self.head = 0  # Next ring slot to write; also the oldest stored day
+        self.ring = {series: [0.0] * RING_SIZE for series in SERIES}
+        self.sums = {w: {series: 0.0 for series in SERIES} for w in WINDOWS}
+        self.ewma = {w: {series: None for series in SERIES} for w in WINDOWS}
+
+    def load_state(self):
+        """Load persisted engine state, if any"""
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            self.last_date = state['last_date']
+            self.days_ingested = state['days_ingested']
+            self.head = state['head']
+            self.ring = state['ring']
+            self.sums = {int(w): values for w, values in state['sums'].items()}
+            self.ewma = {int(w): values for w, values in state['ewma'].items()}
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            print(f"Error loading rolling trends, rebuilding: {e}")
+            self._reset()
+
+    def save_state(self):
+        """Persist engine state"""
+        state = {
+            'last_date': self.last_date,
+            'days_ingested': self.days_ingested,
+            'head': self.head,
+            'ring': self.ring,
+            'sums': self.sums,
+            'ewma': self.ewma
+        }
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            print(f"Error saving rolling trends: {e}")
+
+    def _push(self, summary):
+        """Add one day's values; O(1) per window and series"""
+        for series in SERIES:
+            value = float(summary.get(series, 0) or 0)
+            ring = self.ring[series]
+
+            for w in WINDOWS:
+                # The value leaving window w is the one stored w days ago
+                self.sums[w][series] += value - ring[(self.head - w) % RING_SIZE]
+                alpha = 2 / (w + 1)
+                previous = self.ewma[w][series]
+                self.ewma[w][series] = value if previous is None else alpha * value + (1 - alpha) * previous
+
+            ring[self.head] = value
+
+        self.head = (self.head + 1) % RING_SIZE
+        self.days_ingested += 1
+
+    def ingest_day(self, date_str, summary, persist=True):
+        """Fold a closed day's summary into every window (zero-filling gaps)"""
+        with self._lock:
+            date = datetime.strptime(date_str, '%Y-%m-%d')
+            if self.last_date is not None:
+                last = datetime.strptime(self.last_date, '%Y-%m-%d')
+                if date <= last:
+                    return False  # Already ingested
+
+                # Days with no data file still count as zero days; beyond
+                # the ring size every window is all zeros anyway
+                gap = (date - last).days - 1
+                for _ in range(min(gap, RING_SIZE)):
+                    self._push({})
+                if gap > RING_SIZE:
+                    self._decay_ewma(gap - RING_SIZE)
+
+            self._push(summary)
+            self.last_date = date_str
+            if persist:
+                self.save_state()
+            return True
+
+    def _decay_ewma(self, zero_days):
+        """Apply zero_days of zero values to every EWMA in closed form"""
+        for w in WINDOWS:
+            factor = (1 - 2 / (w + 1)) ** zero_days
+            for series in SERIES:
+                if self.ewma[w][series] is not None:
+                    self.ewma[w][series] *= factor
+        self.days_ingested += zero_days
+
+    def catch_up(self, data_logger, until=None):
+        """Ingest closed days missing since the last run, up to until (yesterday by default;
+        bounded to the largest window)"""
+        yesterday = until or self.clock.now() - timedelta(days=1)
+        yesterday = datetime(yesterday.year, yesterday.month, yesterday.day)
+
+        with self._lock:
+            last_date = self.last_date
+        if last_date is None:
+            start = yesterday - timedelta(days=RING_SIZE - 1)
+        else:
+            start = max(datetime.strptime(last_date, '%Y-%m-%d') + timedelta(days=1),
+                        yesterday - timedelta(days=RING_SIZE - 1))
+        if start > yesterday:
+            return 0
+
+        ingested = 0
+        for day_data in data_logger.iter_range_data(start, yesterday):
+            ingested += self.ingest_day(day_data['date'], day_data['daily_summary'], persist=False)
+        if ingested:
+            with self._lock:
+                self.save_state()
+        return ingested
+
+    def get_snapshot(self):
+        """Moving sums, averages and EWMAs per window and series (hours for averages)"""
+        with self._lock:
+            snapshot = {'as_of': self.last_date, 'windows': {}}
+            for w in WINDOWS:
+                days = min(self.days_ingested, w)
+                snapshot['windows'][w] = {
+                    series: {
+                        'sum_minutes': round(max(0.0, self.sums[w][series]), 1),
+                        'daily_average_hours': round(max(0.0, self.sums[w][series]) / days / 60, 2) if days else 0,
+                        'ewma_hours': round((self.ewma[w][series] or 0) / 60, 2)
+                    }
+                    for series in SERIES
+                }
+            return snapshot
@@ -2,12 +2,25 @@
 Stats Calculator - Historical summaries and analytics
 Generates daily/weekly/monthly/yearly summaries and insights
 """
-from datetime import datetime, timedelta
+from datetime import timedelta
 from collections import defaultdict
+from clock import SYSTEM_CLOCK
+from result_cache import ResultCache
+from switch_analyzer import combine_fragmentation, day_fragmentation
 
 class StatsCalculator:
-    def __init__(self, data_logger):
+    def __init__(self, data_logger, cache_size=64, clock=None):
         self.data_logger = data_logger
+        self.clock = clock or SYSTEM_CLOCK  # Decides what "this week/month/year" means
+        self.cache = ResultCache(cache_size)
+    
+    def _memoize(self, key, compute):
+        """Reuse a result until the data logger's version changes"""
+        return self.cache.get_or_compute(key, self.data_logger.data_version, compute)
+    
+    def get_cache_stats(self):
+        """Get memoization hit/miss counters"""
+        return self.cache.get_stats()
     
     def calculate_daily_stats(self, date_str=None):
         """Calculate stats for a specific day"""
@@ -21,8 +34,19 @@ class StatsCalculator:
     
     def calculate_weekly_stats(self, start_date=None):
         """Calculate stats for a week"""
-        weekly_data = self.data_logger.get_weekly_data(start_date)
+        if start_date is None:
+            today = self.clock.now()
+            start_date = today - timedelta(days=today.weekday())
         
+        key = ('weekly', start_date.strftime('%Y-%m-%d'))
+        return self._memoize(key, lambda: self._compute_weekly_stats(start_date))
+    
+    def _compute_weekly_stats(self, start_date):
+        """Compute weekly stats from storage"""
+        return self.summarize_week(self.data_logger.get_weekly_data(start_date))
+    
+    def summarize_week(self, weekly_data):
+        """Summarize seven already-loaded days into weekly stats"""
         weekly_totals = {
             'building': 0,
             'studying': 0,
@@ -63,13 +87,25 @@ class StatsCalculator:
             'best_day': best_day,
             'average_daily': round(avg_daily / 60, 1),  # Convert to hours
             'top_category': top_category.title(),
-            'consistency': self.calculate_consistency(daily_summaries)
+            'consistency': self.calculate_consistency(daily_summaries),
+            'fragmentation': combine_fragmentation(day_fragmentation(day) for day in weekly_data)
         }
     
     def calculate_monthly_stats(self, year=None, month=None):
         """Calculate stats for a month"""
-        monthly_data = self.data_logger.get_monthly_data(year, month)
+        if year is None or month is None:
+            now = self.clock.now()
+            year = now.year
+            month = now.month
         
+        return self._memoize(('monthly', year, month), lambda: self._compute_monthly_stats(year, month))
+    
+    def _compute_monthly_stats(self, year, month):
+        """Compute monthly stats from storage"""
+        return self.summarize_month(self.data_logger.get_monthly_data(year, month))
+    
+    def summarize_month(self, monthly_data):
+        """Summarize a month of already-loaded days into monthly stats"""
         monthly_totals = {
             'building': 0,
             'studying': 0,
@@ -112,14 +148,19 @@ class StatsCalculator:
             'weekly_summaries': weekly_summaries,
             'best_week': round(best_week / 60, 1),  # Convert to hours
             'top_category': top_category.title(),
-            'days_with_work': len([d for d in monthly_data if d['daily_summary']['total_productive'] > 120])  # >2h
+            'days_with_work': len([d for d in monthly_data if d['daily_summary']['total_productive'] > 120]),  # >2h
+            'fragmentation': combine_fragmentation(day_fragmentation(day) for day in monthly_data)
         }
     
     def calculate_yearly_stats(self, year=None):
         """Calculate stats for a year"""
         if year is None:
-            year = datetime.now().year
+            year = self.clock.now().year
         
+        return self._memoize(('yearly', year), lambda: self._compute_yearly_stats(year))
+    
+    def _compute_yearly_stats(self, year):
+        """Compute yearly stats from storage"""
         yearly_totals = {
             'building': 0,
             'studying': 0,
@@ -162,6 +203,10 @@ class StatsCalculator:
             'best_quarter': round(best_quarter / 60, 1)
         }
     
+    def calculate_daily_fragmentation(self):
+        """Get today's stored switch/fragmentation analytics"""
+        return day_fragmentation(self.data_logger.today_data)
+    
     def calculate_consistency(self, daily_summaries):
         """Calculate consistency score (0-1) based on daily work"""
         if not daily_summaries:
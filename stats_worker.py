@@ -0,0 +1,86 @@
+"""
+Stats Worker - Background computation for dashboard statistics
+Runs stats queries off the Tk thread; the UI submits requests and polls results
+"""
+import queue
+import threading
+import time
+
+
+class StatsWorker:
+    def __init__(self, compute):
+        self.compute = compute  # compute(view) -> stats dict, called on the worker thread
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.latest_request = 0
+        self._last_finished = 0
+        self.dropped_requests = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="StatsWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, view):
+        """Queue a stats request; returns its sequence number"""
+        self.latest_request += 1
+        self.requests.put((self.latest_request, view))
+        return self.latest_request
+
+    def poll(self):
+        """Newest finished result for the latest request, or None (never blocks)"""
+        newest = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if result['request_id'] == self.latest_request:
+                newest = result
+        return newest
+
+    def is_pending(self):
+        """True while the latest request hasn't produced a result yet"""
+        return self._last_finished < self.latest_request
+
+    def _run(self):
+        while self._running:
+            request = self.requests.get()
+            if request is None:
+                break
+
+            # Only the newest queued request matters; older ones are stale
+            while True:
+                try:
+                    newer = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if newer is None:
+                    self._running = False
+                    break
+                self.dropped_requests += 1
+                request = newer
+
+            request_id, view = request
+            if request_id < self.latest_request:
+                self.dropped_requests += 1
+                self._last_finished = request_id
+                continue
+
+            start = time.perf_counter()
+            try:
+                stats, error = self.compute(view), None
+            except Exception as e:
+                stats, error = None, str(e)
+            self._last_finished = request_id
+
+            self.results.put({
+                'request_id': request_id,
+                'view': view,
+                'stats': stats,
+                'error': error,
+                'compute_ms': round((time.perf_counter() - start) * 1000, 2)
+            })
+
+    def stop(self):
+        """Stop the worker thread"""
+        self._running = False
+        self.requests.put(None)
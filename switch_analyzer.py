@@ -0,0 +1,128 @@
+"""
+Switch Analyzer - Context-switch and focus fragmentation analytics
+Consumes a day's sessions one at a time and keeps a small persisted state
+"""
+import statistics
+from datetime import datetime
+
+
+def _session_hour(session):
+    """Hour of day a session started in, or None if unknown"""
+    try:
+        return datetime.strptime(session.get('start_time', ''), '%H:%M:%S').hour
+    except ValueError:
+        return None
+
+
+class SwitchAnalyzer:
+    """Streaming per-day switch/fragmentation analyzer
+
+    A focus block is a run of consecutive productive sessions in the same
+    category; a category change or a pseudo-productive session ends it.
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.switches_by_hour = list(state.get('switches_by_hour', [0] * 24))
+        self.ping_pong_count = state.get('ping_pong_count', 0)
+        self.blocks = list(state.get('blocks', []))  # Closed block lengths in minutes
+        self.open_block = dict(state['open_block']) if state.get('open_block') else None
+        self.last_apps = list(state.get('last_apps', []))  # Up to the last two applications
+
+    @classmethod
+    def from_sessions(cls, sessions):
+        """Build an analyzer by replaying sessions (legacy days without stored results)"""
+        analyzer = cls()
+        for session in sessions:
+            analyzer.add_session(session)
+        return analyzer
+
+    def add_session(self, session):
+        """Fold one ended session into the running state"""
+        app = (session.get('application') or 'Unknown').lower()
+
+        # Switches and A->B->A ping-pong are tracked on application changes
+        if self.last_apps and self.last_apps[-1] != app:
+            hour = _session_hour(session)
+            if hour is not None:
+                self.switches_by_hour[hour] += 1
+            if len(self.last_apps) == 2 and self.last_apps[0] == app:
+                self.ping_pong_count += 1
+        if not self.last_apps or self.last_apps[-1] != app:
+            self.last_apps = (self.last_apps + [app])[-2:]
+
+        minutes = session.get('duration_minutes', 0) or 0
+        if session.get('is_pseudo_productive', False):
+            self._close_block()
+            return
+
+        category = session.get('category', 'knowledge').lower()
+        if self.open_block and self.open_block['category'] == category:
+            self.open_block['minutes'] = round(self.open_block['minutes'] + minutes, 1)
+        else:
+            self._close_block()
+            self.open_block = {'category': category, 'minutes': minutes}
+
+    def _close_block(self):
+        """Move the open focus block into the closed list"""
+        if self.open_block and self.open_block['minutes'] > 0:
+            self.blocks.append(self.open_block['minutes'])
+        self.open_block = None
+
+    def all_blocks(self):
+        """Closed blocks plus the block still in progress"""
+        if self.open_block and self.open_block['minutes'] > 0:
+            return self.blocks + [self.open_block['minutes']]
+        return list(self.blocks)
+
+    def to_dict(self):
+        """Serializable state plus derived metrics, stored in the day file"""
+        blocks = self.all_blocks()
+        return {
+            'switches_by_hour': self.switches_by_hour,
+            'ping_pong_count': self.ping_pong_count,
+            'blocks': self.blocks,
+            'open_block': self.open_block,
+            'last_apps': self.last_apps,
+            'median_block_minutes': round(statistics.median(blocks), 1) if blocks else 0,
+            'fragmentation_index': fragmentation_index(blocks)
+        }
+
+
+def fragmentation_index(blocks):
+    """0 when all focus time is one block, approaching 1 as it splinters"""
+    total = sum(blocks)
+    if total <= 0:
+        return 0
+    return round(1 - sum(b * b for b in blocks) / (total * total), 3)
+
+
+def combine_fragmentation(day_results):
+    """Aggregate stored per-day results for weekly/monthly views"""
+    switches_by_hour = [0] * 24
+    ping_pong_count = 0
+    blocks = []
+
+    for result in day_results:
+        switches_by_hour = [a + b for a, b in zip(switches_by_hour, result.get('switches_by_hour', [0] * 24))]
+        ping_pong_count += result.get('ping_pong_count', 0)
+        blocks.extend(result.get('blocks', []))
+        if result.get('open_block'):
+            blocks.append(result['open_block']['minutes'])
+
+    return {
+        'switches_by_hour': switches_by_hour,
+        'ping_pong_count': ping_pong_count,
+        'median_block_minutes': round(statistics.median(blocks), 1) if blocks else 0,
+        'fragmentation_index': fragmentation_index(blocks),
+        'focus_blocks': len(blocks)
+    }
+
+
+def day_fragmentation(day_data):
+    """Stored fragmentation for a day, replaying sessions only for legacy files"""
+    if 'fragmentation' in day_data:
+        return day_data['fragmentation']
+    if day_data.get('sessions'):
+        return SwitchAnalyzer.from_sessions(day_data['sessions']).to_dict()
+    return SwitchAnalyzer().to_dict()
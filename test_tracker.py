@@ -6,6 +6,21 @@ from data_logger import DataLogger
 from category_engine import CategoryEngine
 from stats_calculator import StatsCalculator
 from focus_manager import FocusManager, FocusMode
+from activity_heatmap import HeatmapCalculator
+from leaderboard import ActivityLeaderboard, SpaceSavingCounter
+from trend_analyzer import TrendAnalyzer
+from rolling_trends import RollingTrendEngine
+from forecaster import ProductivityForecaster
+from anomaly_detector import RollingRobustWindow, StreamingAnomalyDetector
+from stats_worker import StatsWorker
+from clock import VirtualClock
+from activity_monitor import ActivityMonitor
+import threading
+from datetime import datetime, timedelta
+import tempfile
+import os
+import json
+import random
 import time
 
 def test_basic_functionality():
@@ -62,7 +77,8 @@ def test_basic_functionality():
     
     # Test FocusManager
     print("\n4. Testing FocusManager...")
-    focus_manager = FocusManager(logger)
+    clock = VirtualClock()
+    focus_manager = FocusManager(logger, clock=clock)
     
     # Start a quick focus session
     success = focus_manager.start_focus_session(FocusMode.QUICK_FOCUS)
@@ -74,7 +90,7 @@ def test_basic_functionality():
         print(f"   Target time: {session_info['target_minutes']} minutes")
     
     # Simulate some time passing
-    time.sleep(1)
+    clock.advance(5 * 60)
     
     # End session
     session_data = focus_manager.end_current_session()
@@ -85,5 +101,908 @@ def test_basic_functionality():
     print("\nTo run the full GUI application:")
     print("python main.py")
 
+def test_minute_slot_heatmap():
+    print("\n🗓️ Testing minute-slot heatmaps...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        logger.start_session({'start_time': '09:15:00', 'category': 'Building', 'is_pseudo_productive': False})
+        logger.end_session({'end_time': '10:05:00', 'duration_minutes': 50.0})
+        logger.start_session({'start_time': '10:05:00', 'category': 'Knowledge', 'is_pseudo_productive': True})
+        logger.end_session({'end_time': '10:15:00', 'duration_minutes': 10.0})
+
+        heatmap = HeatmapCalculator(logger)
+        today = datetime.now()
+        hourly = heatmap.get_hourly_heatmap(today, today)
+        print(f"   09h: {hourly[9]}m, 10h: {hourly[10]}m productive")
+        assert hourly[9] == 45 and hourly[10] == 5
+
+        grid = heatmap.get_weekday_hour_heatmap(today, today, categories=['pseudo_productive'])
+        assert grid[today.weekday()][10] == 10
+
+def test_leaderboard_top_k():
+    print("\n🏆 Testing top-K leaderboard...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        board = ActivityLeaderboard(logger)
+        logger.start_session({'start_time': '09:00:00', 'application': 'code.exe', 'window_title': '● app.py - Visual Studio Code', 'category': 'Building'})
+        logger.end_session({'duration_minutes': 30.0})
+
+        assert board.get_current_top(k=1)['applications'][0] == {'name': 'code.exe', 'minutes': 30.0, 'error': 0.0}
+
+        # Incremental update after seeding
+        logger.start_session({'start_time': '10:00:00', 'application': 'chrome.exe', 'window_title': '(3) Python docs - Google Chrome', 'category': 'Knowledge'})
+        logger.end_session({'duration_minutes': 45.0})
+        top = board.get_current_top(k=2)
+        print(f"   Top titles: {top['titles']}")
+        assert top['titles'][0]['name'] == 'python docs'
+        assert top['titles'][1]['name'] == 'app.py'
+
+        today = datetime.now()
+        assert board.get_top(today, today, k=2) == {'applications': top['applications'], 'titles': top['titles']}
+
+    # A session ending while the month is being seeded is counted once
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        boards = []
+        logger.add_session_listener(lambda session: boards[0].get_current_top() if boards else None)
+        board = ActivityLeaderboard(logger)  # Its listener runs after the seed has read the session
+        boards.append(board)
+        logger.start_session({'start_time': '09:00:00', 'application': 'code.exe', 'window_title': 'app.py', 'category': 'Building'})
+        logger.end_session({'duration_minutes': 30.0})
+        assert board.get_current_top(k=1)['applications'][0]['minutes'] == 30.0
+
+def test_space_saving_error_bound():
+    print("\n📏 Testing Space-Saving error bounds...")
+    rng = random.Random(7)
+    counter = SpaceSavingCounter(capacity=20)
+    truth = {}
+    # A few heavy apps among many one-off titles; keys leave and come back
+    for i in range(3000):
+        key = f"heavy{i % 5}" if rng.random() < 0.4 else f"rare{rng.randrange(400)}"
+        minutes = rng.uniform(1, 10)
+        counter.add(key, minutes)
+        truth[key] = truth.get(key, 0) + minutes
+
+    assert len(counter.counts) <= 20
+    for key, minutes, error in counter.top(20):
+        assert truth[key] <= minutes + 1e-6 <= truth[key] + error + 1e-6
+        assert error <= counter.max_error() + 1e-6
+    top5 = {key for key, _, _ in counter.top(5)}
+    assert top5 == {f"heavy{i}" for i in range(5)}
+    print(f"✅ Max error bound: {counter.max_error():.0f} of {counter.total:.0f} minutes")
+
+def test_versioned_stats_cache():
+    print("\n💾 Testing version-stamped stats cache...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        calculator = StatsCalculator(logger)
+        trends = TrendAnalyzer(calculator)
+
+        first = calculator.calculate_weekly_stats()
+        first['totals']['building'] = 999  # Callers get copies; the cached result is untouched
+        again = calculator.calculate_weekly_stats()
+        assert again is not first and again['totals']['building'] == 0
+        assert calculator.get_cache_stats()['hits'] == 1
+        trends.get_productivity_insights()
+        trends.get_productivity_insights()
+        assert trends.get_cache_stats()['hits'] == 1
+
+        logger.start_session({'start_time': '09:00:00', 'category': 'Building'})
+        logger.end_session({'duration_minutes': 30.0})
+        refreshed = calculator.calculate_weekly_stats()
+        stats = calculator.get_cache_stats()
+        print(f"   Cache stats: {stats}")
+        assert refreshed['totals']['building'] == 30.0
+        assert stats['stale'] >= 1
+
+def test_fragmentation_analytics():
+    print("\n🔀 Testing context-switch fragmentation...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        sessions = [
+            ('09:00:00', 'code.exe', 'Building', False, 40.0),
+            ('09:40:00', 'chrome.exe', 'Knowledge', True, 5.0),
+            ('09:45:00', 'code.exe', 'Building', False, 20.0),
+            ('10:05:00', 'powershell.exe', 'Building', False, 10.0),
+        ]
+        for start, app, category, pseudo, minutes in sessions:
+            logger.start_session({'start_time': start, 'application': app, 'category': category, 'is_pseudo_productive': pseudo})
+            logger.end_session({'duration_minutes': minutes})
+
+        frag = logger.today_data['fragmentation']
+        print(f"   Blocks: {frag['blocks']} + {frag['open_block']}, index {frag['fragmentation_index']}")
+        assert frag['ping_pong_count'] == 1
+        assert frag['switches_by_hour'][9] == 2 and frag['switches_by_hour'][10] == 1
+        assert frag['median_block_minutes'] == 35.0
+        assert frag['fragmentation_index'] == round(1 - (40 * 40 + 30 * 30) / (70 * 70), 3)
+
+        weekly = StatsCalculator(logger).calculate_weekly_stats()
+        assert weekly['fragmentation']['ping_pong_count'] == 1
+
+def test_insights_single_data_pass():
+    print("\n📚 Testing shared-window insights...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        loads = []
+        range_reader = logger.get_range_data
+        logger.get_range_data = lambda start, end: loads.append((start, end)) or range_reader(start, end)
+
+        trends = TrendAnalyzer(StatsCalculator(logger))
+        insights = trends.get_productivity_insights()
+        print(f"   {len(loads)} range load(s) -> {insights}")
+        assert len(loads) == 1
+        assert trends.get_weekly_comparison()['total_productive']['current'] == 0
+
+def test_rolling_trend_engine():
+    print("\n📈 Testing rolling trend engine...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = RollingTrendEngine(data_dir)
+        start = datetime(2025, 1, 1)
+        for i in range(10):
+            engine.ingest_day((start + timedelta(days=i)).strftime('%Y-%m-%d'), {'total_productive': 60 * (i % 2 + 1)})
+
+        windows = engine.get_snapshot()['windows']
+        assert windows[7]['total_productive']['sum_minutes'] == 4 * 120 + 3 * 60  # Days 3..9
+        assert windows[28]['total_productive']['daily_average_hours'] == 1.5
+
+        # Survives a restart without replaying history, then skips a gap day
+        reloaded = RollingTrendEngine(data_dir)
+        assert reloaded.get_snapshot() == engine.get_snapshot()
+        reloaded.ingest_day('2025-01-12', {'total_productive': 60})
+        windows = reloaded.get_snapshot()['windows']
+        print(f"   7-day: {windows[7]['total_productive']}")
+        assert windows[7]['total_productive']['sum_minutes'] == 3 * 120 + 3 * 60  # Gap day counts as zero
+
+    # Closing a day after days the engine missed reads those days from disk
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        analyzer = TrendAnalyzer(StatsCalculator(logger))
+        today = datetime.now()
+        analyzer.rolling_engine.ingest_day((today - timedelta(days=6)).strftime('%Y-%m-%d'), {'total_productive': 120})
+        for offset in range(5, 1, -1):
+            day = logger.get_empty_day_data(today - timedelta(days=offset))
+            day['daily_summary']['total_productive'] = 120
+            with open(logger.get_day_filename(today - timedelta(days=offset)), 'w') as f:
+                json.dump(day, f)
+        logger.today_data = logger.get_empty_day_data(today - timedelta(days=1))
+        logger.today_data['daily_summary']['total_productive'] = 120
+        logger.save_today_data()
+        assert logger.roll_over_if_needed()
+        windows = analyzer.rolling_engine.get_snapshot()['windows']
+        assert windows[7]['total_productive']['sum_minutes'] == 6 * 120
+
+def test_session_across_midnight_stays_on_start_day():
+    print("\n🌙 Testing a session that runs past midnight...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        closed = []
+        logger.add_day_closed_listener(closed.append)
+        logger.start_session({'start_time': '23:50:00', 'category': 'Building'})
+        yesterday = datetime.now() - timedelta(days=1)
+        logger.today_data['date'] = yesterday.strftime('%Y-%m-%d')  # Started before midnight
+        logger.end_session({'duration_minutes': 20.0})
+
+        with open(logger.get_day_filename(yesterday)) as f:
+            start_day = json.load(f)
+        assert start_day['daily_summary']['building'] == 20.0
+        assert 'building' in start_day['minute_slots']
+        assert closed and closed[0]['sessions'][0]['start_time'] == '23:50:00'
+        assert logger.today_data['date'] == datetime.now().strftime('%Y-%m-%d')
+        assert logger.today_data['sessions'] == []
+
+def test_weekday_forecaster():
+    print("\n🔮 Testing weekday-aware forecaster...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        history = {}
+        today = datetime.now()
+        for offset in range(1, 57):
+            date = today - timedelta(days=offset)
+            history[date.strftime('%Y-%m-%d')] = 0 if date.weekday() >= 5 else 240  # Weekdays only
+        logger.iter_range_data = lambda start, end: (
+            {'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+             'daily_summary': {'total_productive': history.get((start + timedelta(days=i)).strftime('%Y-%m-%d'), 0)}}
+            for i in range((end.date() - start.date()).days + 1))
+
+        forecaster = ProductivityForecaster(logger)
+        model = forecaster.get_model()
+        assert forecaster.get_model() is model  # Cached until a new day closes
+        monday = datetime(today.year, today.month, today.day) + timedelta(days=7 - today.weekday())
+        assert round(forecaster.predict_day(model, monday)) == 240
+        assert round(forecaster.predict_day(model, monday + timedelta(days=5))) == 0
+
+        week = forecaster.forecast_week()
+        print(f"   Week forecast: {week}")
+        assert week['lower'] <= week['predicted_total'] <= week['upper']
+
+    # Three weeks of steady growth must not extrapolate into impossible days
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        clock = VirtualClock(datetime(2025, 2, 1, 9, 0))
+        first = datetime(2025, 1, 11)
+        history = {(first + timedelta(days=i)).strftime('%Y-%m-%d'): 60 + 10 * i + (i % 3) * 5 for i in range(21)}
+        logger.iter_range_data = lambda start, end: (
+            {'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+             'daily_summary': {'total_productive': history.get((start + timedelta(days=i)).strftime('%Y-%m-%d'), 0)}}
+            for i in range((end.date() - start.date()).days + 1))
+
+        forecaster = ProductivityForecaster(logger, clock=clock)
+        year = forecaster.forecast_year()
+        week = forecaster.forecast_week()
+        print(f"   Year forecast from a rising history: {year}")
+        days = year['days_remaining'] + 1
+        assert year['upper'] <= year['current_total'] + 24 * days
+        assert (year['predicted_total'] - year['current_total']) / days < 10  # Trend held at ~2 months past the data
+        assert year['upper'] - year['lower'] > 10 * (week['upper'] - week['lower'])  # Wider far out
+
+def test_streaming_anomaly_detector():
+    print("\n🔍 Testing streaming anomaly detection...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        detector = StreamingAnomalyDetector(data_dir)
+        start = datetime(2025, 3, 1)
+
+        def day(i, total, pseudo=10):
+            return {'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+                    'daily_summary': {'total_productive': total, 'pseudo_productive': pseudo}}
+
+        for i in range(35):
+            assert detector.ingest_day(day(i, 240 + (i % 5) * 10)) == []
+
+        # State survives a restart; the outlier is flagged as the day closes
+        detector = StreamingAnomalyDetector(data_dir)
+        flags = detector.ingest_day(day(35, 30, pseudo=200))
+        print(f"   Flags: {flags}")
+        assert {f['series'] for f in flags} == {'total_productive', 'pseudo_productive'}
+        assert detector.ingest_day(day(35, 30)) == []  # Already ingested
+
+    # A Monday-Friday routine: empty weekends are normal, an empty Wednesday is not
+    with tempfile.TemporaryDirectory() as data_dir:
+        detector = StreamingAnomalyDetector(data_dir)
+        monday = datetime(2025, 3, 3)
+        flags = []
+        for i in range(8 * 7):
+            date = monday + timedelta(days=i)
+            total = 300 + (i % 3) * 20 if date.weekday() < 5 else 0
+            if i == 7 * 7 + 2:
+                total = 20  # Wednesday of the last week
+            flags += detector.ingest_day({'date': date.strftime('%Y-%m-%d'),
+                                          'daily_summary': {'total_productive': total, 'pseudo_productive': 0}})
+        print(f"   Work-week flags: {flags}")
+        assert [(f['date'], f['series']) for f in flags] == [('2025-04-23', 'total_productive')]
+
+    # Days missed before a day closes are scored from disk, not skipped
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        analyzer = TrendAnalyzer(StatsCalculator(logger))
+        detector = analyzer.anomaly_detector
+        today = datetime.now()
+        detector.ingest_day(logger.get_empty_day_data(today - timedelta(days=8)))
+        for offset in range(7, 1, -1):
+            day = logger.get_empty_day_data(today - timedelta(days=offset))
+            day['daily_summary']['total_productive'] = 200 + offset
+            with open(logger.get_day_filename(today - timedelta(days=offset)), 'w') as f:
+                json.dump(day, f)
+        logger.today_data = logger.get_empty_day_data(today - timedelta(days=1))
+        logger.save_today_data()
+        assert logger.roll_over_if_needed()
+        assert detector.last_date == (today - timedelta(days=1)).strftime('%Y-%m-%d')
+        for offset in range(7, 1, -1):
+            weekday = (today - timedelta(days=offset)).weekday()
+            assert list(detector.daily_windows['total_productive'][weekday].values) == [200.0 + offset]
+
+    # MAD from the merged deviation runs matches a full sort
+    rng = random.Random(3)
+    window = RollingRobustWindow(9)
+    for _ in range(40):
+        window.push(rng.randrange(0, 500))
+        median, mad = window.stats()
+        deviations = sorted(abs(v - median) for v in window.values)
+        n = len(deviations)
+        assert mad == (deviations[n // 2] if n % 2 else (deviations[n // 2 - 1] + deviations[n // 2]) / 2)
+
+def test_stats_worker_drops_stale_requests():
+    print("\n🧵 Testing background stats worker...")
+    gate = threading.Event()
+    computed = []
+
+    def compute(view):
+        gate.wait(2)
+        computed.append(view)
+        return {'view': view}
+
+    worker = StatsWorker(compute)
+    worker.submit('Today')
+    worker.submit('This Week')
+    latest = worker.submit('This Year')
+    gate.set()
+
+    deadline = time.time() + 2
+    result = None
+    while result is None and time.time() < deadline:
+        result = worker.poll()
+        time.sleep(0.01)
+    worker.stop()
+
+    print(f"   Computed {computed}, dropped {worker.dropped_requests}")
+    assert result['request_id'] == latest and result['stats'] == {'view': 'This Year'}
+    assert 'This Week' not in computed
+
+def test_session_cursor_and_row_diff():
+    from dashboard import diff_rows
+    print("\n📋 Testing incremental activity rows...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        logger.start_session({'start_time': '09:00:00', 'application': 'code.exe', 'category': 'Building'})
+        logger.end_session({'duration_minutes': 5.0})
+
+        cursor = logger.get_session_cursor()
+        assert cursor == (logger.today_data['date'], 1)
+        assert logger.get_session_cursor() == cursor  # Unchanged until a session is logged
+
+        logger.start_session({'start_time': '09:05:00', 'application': 'chrome.exe', 'category': 'Knowledge'})
+        logger.end_session({'duration_minutes': 2.0})
+        assert logger.get_session_cursor() != cursor
+
+    current = {'a': (1,), 'b': (2,)}
+    assert diff_rows(current, dict(current)) == ([], [], [])
+    assert diff_rows(current, {'b': (3,), 'c': (4,)}) == (['c'], ['b'], ['a'])
+
+def test_paged_sessions_over_range():
+    print("\n📜 Testing paged session history...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        today = datetime.now()
+        start = today - timedelta(days=3)
+        for offset, count in ((3, 4), (1, 3)):  # Two days ago stays empty
+            day = logger.get_empty_day_data(today - timedelta(days=offset))
+            day['sessions'] = [{'start_time': f'09:0{i}:00', 'application': f'app{i}.exe'} for i in range(count)]
+            with open(logger.get_day_filename(today - timedelta(days=offset)), 'w') as f:
+                json.dump(day, f)
+        logger.start_session({'start_time': '10:00:00', 'application': 'code.exe', 'category': 'Building'})
+        logger.end_session({'duration_minutes': 5.0})
+
+        assert logger.get_range_session_count(start, today) == 8
+        loads = []
+        day_reader = logger.load_day_data
+        logger.load_day_data = lambda date: loads.append(date) or day_reader(date)
+
+        page = logger.get_sessions_page(start, today, 3, 3)
+        print(f"   Page: {[key for key, _ in page]}")
+        yesterday = (today - timedelta(days=1)).strftime('%Y-%m-%d')
+        assert [key for key, _ in page] == [f"{start.strftime('%Y-%m-%d')}#3", f"{yesterday}#0", f"{yesterday}#1"]
+        assert loads == []  # Counting already cached both closed days
+        assert logger.get_sessions_page(start, today, 7, 5)[0][1]['label'] == 'code.exe'
+
+        # Saving edits merges per session instead of overwriting earlier saves
+        logger.save_activity_overrides({f"{yesterday}#0": {'label': 'Reading'}})
+        logger.save_activity_overrides({f"{yesterday}#1": {'category': 'Studying'}},
+                                       deleted={f"{yesterday}#2"}, added=[{'label': 'Gym'}])
+        logger.save_activity_overrides({f"{yesterday}#0": {'start_time': '09:30'}}, added=[{'label': 'Gym'}])
+        overrides = logger.load_activity_overrides()
+        assert overrides['edits'] == {f"{yesterday}#0": {'label': 'Reading', 'start_time': '09:30'},
+                                      f"{yesterday}#1": {'category': 'Studying'}}
+        assert overrides['deleted'] == [f"{yesterday}#2"] and overrides['added'] == [{'label': 'Gym'}]
+
+def test_chart_layouts():
+    from chart_canvas import bar_layout, heat_color, timeline_segments
+    print("\n📊 Testing chart layouts...")
+    rects = bar_layout([30, 60, 0], width=400, row_height=18, label_width=100, value_width=50)
+    assert rects[1]['fill'] == (100, 22, 350, 40)  # Largest value fills the track
+    assert rects[0]['fill'][2] == 225 and rects[2]['fill'][2] == 100
+    shares = bar_layout([30, 60, 10], width=400, row_height=18, label_width=100, value_width=50, scale_to=100)
+    assert [r['fill'][2] for r in shares] == [175, 250, 125]  # Share of the total, not of the largest
+
+    engine = CategoryEngine()
+    segments = timeline_segments([
+        {'start_time': '09:00:00', 'duration_minutes': 30, 'category': 'Building'},
+        {'start_time': '10:00:00', 'duration_minutes': 5, 'category': 'Knowledge', 'is_pseudo_productive': True},
+        {'start_time': 'bad', 'duration_minutes': 5, 'category': 'Building'}
+    ], engine.get_category_color)
+    print(f"   Segments: {segments}")
+    assert segments == [(540, 570, '#4CAF50'), (600, 605, '#757575')]
+    assert heat_color(0, 10) == '#333333' and heat_color(10, 10) == '#4caf50'
+
+def test_refresh_scheduler_dirty_tracking():
+    from refresh_scheduler import RefreshScheduler
+    print("\n🔁 Testing per-panel refresh scheduling...")
+    state = {'version': 0, 'tab': 'stats'}
+    runs = []
+    scheduler = RefreshScheduler()
+    scheduler.add_panel('timer', lambda: runs.append('timer'), 1000, visible=lambda: state['tab'] == 'focus')
+    scheduler.add_panel('stats', lambda: runs.append('stats'), 2000,
+                        token=lambda: state['version'], visible=lambda: state['tab'] == 'stats')
+
+    assert scheduler.run_due(now=0) == ['stats']  # Timer's tab is hidden
+    assert scheduler.run_due(now=2) == []  # Stats inputs unchanged
+    state['version'] += 1  # A session ended
+    assert scheduler.run_due(now=4) == ['stats']
+    assert scheduler.run_due(now=5) == []  # Not due yet
+
+    state['tab'] = 'focus'
+    assert scheduler.expedite() == ['timer']
+    stats = scheduler.get_stats()
+    print(f"   Stats: {stats}")
+    assert stats['stats']['runs'] == 2 and stats['stats']['skipped_clean'] == 1
+    assert stats['timer']['skipped_hidden'] == 4
+
+    # A panel that couldn't take new inputs (compute still running) stays dirty
+    state['tab'] = 'activities'
+    busy = {'pending': True}
+    submits = []
+    scheduler.add_panel('slow', lambda: False if busy['pending'] else submits.append(state['version']), 2000,
+                        token=lambda: state['version'])
+    assert scheduler.run_due(now=10) == ['slow'] and submits == []
+    assert scheduler.run_due(now=12) == ['slow']  # Same token, but not marked clean
+    busy['pending'] = False
+    assert scheduler.run_due(now=14) == ['slow'] and submits == [1]
+    assert scheduler.run_due(now=16) == []
+
+def test_frame_timer_histograms():
+    from frame_timing import FrameTimer
+    print("\n⏱️ Testing frame-time histograms...")
+    timer = FrameTimer(slow_ms=50)
+    for _ in range(95):
+        timer.record('panel:stats', 2.0, 'This Week')
+    for _ in range(5):
+        timer.record('panel:stats', 120.0, 'This Year')
+
+    summary = timer.get_summary()['panel:stats']
+    print(f"   {summary}")
+    assert summary['count'] == 100 and summary['max_ms'] == 120.0
+    assert 2.0 <= summary['p50_ms'] <= 2.5 and summary['p95_ms'] <= 2.5
+    assert len(timer.slow_frames) == 5 and timer.slow_frames[-1]['context'] == 'This Year'
+
+    timer.wrap('after:poll', lambda: None)()
+    assert timer.get_summary()['after:poll']['count'] == 1
+
+def test_startup_timer_phases():
+    from frame_timing import StartupTimer
+    import subprocess
+    import sys
+    print("\n🚀 Testing startup phase report...")
+    # A fresh interpreter, so imports made by other tests can't hide an eager import
+    probe = ("import sys, main, activity_monitor; "
+             "print(activity_monitor.WINDOWS_AVAILABLE, "
+             "[m for m in ('psutil', 'win32gui', 'stats_calculator', 'trend_analyzer', 'focus_manager') if m in sys.modules])")
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "None []"  # Platform modules and tab services not imported yet
+
+    startup = StartupTimer()
+    startup.mark('imports')
+    time.sleep(0.01)
+    startup.mark('first_paint')
+    print(f"   {startup.format_report()}")
+    assert [phase for phase, _ in startup.phases] == ['imports', 'first_paint']
+    assert startup.phases[1][1] >= 10 and startup.total_ms() >= startup.phases[1][1]
+
+def test_virtual_clock_focus_and_capture():
+    print("\n🕰️ Testing virtual-clock focus and capture...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        clock = VirtualClock()
+
+        focus = FocusManager(logger, clock=clock)
+        focus.start_focus_session(FocusMode.QUICK_FOCUS)
+        clock.advance(10 * 60)
+        focus.pause_session()
+        clock.advance(3 * 3600)  # A long pause doesn't count towards the session
+        focus.resume_session()
+        assert focus.get_remaining_time() == 15 * 60
+        clock.advance(15 * 60)
+        result = focus.update()
+        print(f"   Focus result: {result}")
+        assert result['active_minutes'] == 25 and result['completion_percentage'] == 100
+
+        monitor = ActivityMonitor(logger, clock=clock)
+        monitor.start_new_session('code.exe', 'main.py - Visual Studio Code')
+        monitor.current_app, monitor.current_window_title = 'code.exe', 'main.py - Visual Studio Code'
+        clock.advance(2 * 3600)
+        assert monitor.get_current_activity()['duration'] == 120
+        monitor.end_current_session()
+        assert logger.get_today_summary()['building'] == 120
+
+def test_focus_session_index():
+    print("\n🎯 Testing persisted focus sessions...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        clock = VirtualClock(start=datetime.now())
+        focus = FocusManager(logger, clock=clock)
+
+        focus.start_focus_session(FocusMode.QUICK_FOCUS)
+        clock.advance(25 * 60)
+        focus.update()  # Completes
+        focus.start_focus_session(FocusMode.QUICK_FOCUS)
+        clock.advance(5 * 60)
+        focus.end_current_session()  # Stopped early at 20%
+
+        stats = focus.get_daily_focus_stats()
+        print(f"   Today: {stats}")
+        assert stats['total_sessions'] == 2 and stats['sessions_completed'] == 1
+        assert stats['quick_focus_sessions'] == 2 and stats['total_focus_time'] == 30
+        assert stats['average_completion'] == 60
+        assert logger.get_focus_stats(datetime.now() - timedelta(days=1))['total_sessions'] == 0
+
+        # A lost index is rebuilt from the day files
+        os.remove(logger.get_focus_index_filename())
+        assert DataLogger(data_dir=data_dir).get_focus_stats() == stats
+
+    # Activity sessions and focus sessions logged from different threads at once
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+
+        def log_activity():
+            for i in range(100):
+                logger.start_session({'start_time': '09:00:00', 'category': 'Building'})
+                logger.end_session({'duration_minutes': 1.0})
+
+        def log_focus():
+            for i in range(100):
+                logger.log_focus_session({'mode': 'Quick Focus', 'active_minutes': 1, 'completion_percentage': 100})
+
+        threads = [threading.Thread(target=log_activity), threading.Thread(target=log_focus)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(logger.get_today_filename()) as f:
+            saved = json.load(f)
+        assert len(saved['sessions']) == 100 and len(saved['focus_sessions']) == 100
+        assert saved['daily_summary']['building'] == 100.0
+        assert logger.get_focus_stats()['total_sessions'] == 100
+
+def test_deadline_scheduler_focus_completion():
+    from deadline_scheduler import DeadlineScheduler
+    print("\n⏰ Testing deadline-driven focus completion...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        clock = VirtualClock(start=datetime.now())
+        scheduler = DeadlineScheduler(clock)
+        focus = FocusManager(DataLogger(data_dir=data_dir), clock=clock, scheduler=scheduler)
+        events = []
+        focus.add_warning_listener(lambda minutes: events.append(('warning', minutes)))
+        focus.add_completion_listener(lambda data: events.append(('done', data['active_minutes'])))
+
+        focus.start_focus_session(FocusMode.QUICK_FOCUS)
+        clock.advance(10 * 60)
+        focus.pause_session()  # Cancels both timers
+        clock.advance(60 * 60)
+        assert scheduler.run_pending() == 0
+        focus.resume_session()
+
+        clock.advance(10 * 60)
+        assert scheduler.run_pending() == 1 and events == [('warning', 5)]
+        clock.advance(5 * 60 + 0.25)  # Timer thread woke up a quarter second late
+        scheduler.run_pending()
+        stats = scheduler.get_stats()
+        print(f"   Events: {events}, scheduler: {stats}")
+        assert events[-1] == ('done', 25.0) and focus.state.value == 'Completed'
+        assert stats['pending'] == 0 and stats['cancelled'] == 2 and stats['max_lag_ms'] == 250
+
+class FakeEnforcer:
+    """Stands in for ProductivityEnforcer: records calls instead of touching the hosts file"""
+
+    def __init__(self):
+        self.calls = []
+
+    def start_enforcement(self, hours):
+        self.calls.append(('start', round(hours, 2)))
+        return True
+
+    def save_enforcement_state(self, end_time):
+        self.calls.append(('extend',))
+
+    def stop_enforcement(self):
+        self.calls.append(('stop',))
+        return True
+
+    def scan(self):
+        self.calls.append(('scan',))
+
+    def get_scan_stats(self):
+        return {'scans': self.calls.count(('scan',))}
+
+def test_enforcement_service_merges_owners():
+    from enforcement_service import EnforcementService
+    print("\n🔒 Testing shared enforcement service...")
+    clock = VirtualClock()
+    enforcer = FakeEnforcer()
+    service = EnforcementService(lambda: enforcer, clock=clock, threaded=False)
+
+    service.start('focus', 1.5)
+    service.run_once()
+    service.start('manual', 2)  # Overlaps: same jail, later end
+    service.run_once()
+    assert enforcer.calls == [('start', 1.5), ('scan',), ('extend',)]
+
+    clock.advance(5)
+    service.run_once()
+    service.stop('focus')
+    service.run_once()
+    assert service.is_active() and not service.is_active('focus')
+
+    clock.advance(2 * 3600)  # Manual jail expires on its own
+    service.run_once()
+    status = service.get_status()
+    print(f"   Calls: {enforcer.calls}, status: {status}")
+    assert enforcer.calls[-1] == ('stop',) and not status['active']
+    assert status['stats']['activations'] == 1 and status['stats']['expired'] == 1
+    service.run_once()
+    assert enforcer.calls.count(('scan',)) == 2  # Idle service doesn't rescan
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        focus = FocusManager(DataLogger(data_dir=data_dir), clock=clock, enforcement=service)
+        focus.start_focus_session(FocusMode.DEEP_WORK)
+        service.run_once()
+        assert service.is_active('focus') and enforcer.calls[-2:] == [('start', 1.5), ('scan',)]
+        focus.end_current_session()
+        service.run_once()
+        assert enforcer.calls[-1] == ('stop',) and service.get_status()['owners'] == {}
+
+        # A jail only counts as active once the enforcer confirms it started
+        results = []
+        service.start('manual', 1, on_result=lambda ok, error: results.append((ok, error)))
+        service.run_once()
+        assert results == [(True, None)]
+        service.stop()
+        service.run_once()
+
+        failing = FakeEnforcer()
+        failing.start_enforcement = lambda hours: False
+        failed_service = EnforcementService(lambda: failing, clock=clock, threaded=False)
+        failed_service.start('manual', 1, on_result=lambda ok, error: results.append((ok, error)))
+        failed_service.run_once()
+        assert results[-1] == (False, failed_service.last_error) and results[-1][1]
+        focus = FocusManager(DataLogger(data_dir=data_dir), clock=clock, enforcement=failed_service)
+        focus.start_focus_session(FocusMode.DEEP_WORK)
+        assert not focus.session_data['jail_active']  # Not claimed before the answer
+        failed_service.run_once()
+        print(f"   Failed start: {focus.session_data['jail_error']}")
+        assert not focus.session_data['jail_active'] and focus.session_data['jail_error']
+        focus.end_current_session()
+
+    # Force stop clears a leftover block even when this run never started one
+    fresh = FakeEnforcer()
+    idle_service = EnforcementService(lambda: fresh, clock=clock, threaded=False)
+    idle_service.force_stop()
+    idle_service.run_once()
+    assert fresh.calls == [('stop',)] and idle_service.get_status()['stats']['forced_stops'] == 1
+
+class FakeProcess:
+    """psutil.Process stand-in for the enforcer's process checks"""
+
+    def __init__(self, pid, name, create_time):
+        self.pid = pid
+        self.info = {'create_time': create_time}
+        self._name = name
+        self.name_calls = 0
+        self.terminated = False
+
+    def name(self):
+        self.name_calls += 1
+        return self._name
+
+    def terminate(self):
+        self.terminated = True
+
+def test_incremental_process_scan():
+    from productivity_enforcer import ProductivityEnforcer
+    print("\n🛡️ Testing incremental process scanning...")
+    enforcer = ProductivityEnforcer()
+    assert 'discord.exe' in enforcer.blocked_app_names
+
+    editor = FakeProcess(100, 'Code.exe', 1.0)
+    game = FakeProcess(200, 'Discord.exe', 2.0)
+    stats = enforcer.evaluate_processes([editor, game])
+    assert stats['last_new'] == 2 and stats['last_killed'] == 1
+    assert game.terminated and not editor.terminated
+
+    # Same processes again: the allowed one is not re-judged
+    stats = enforcer.evaluate_processes([editor])
+    assert stats['last_new'] == 0 and editor.name_calls == 1
+
+    # PID reused by a blocked app with a new create_time is judged afresh
+    reused = FakeProcess(100, 'steam.exe', 5.0)
+    stats = enforcer.evaluate_processes([reused])
+    assert stats['last_new'] == 1 and reused.terminated
+    assert enforcer.get_scan_stats()['tracked_processes'] == 0
+    assert enforcer.get_scan_stats()['total_killed'] == 2
+    print(f"✅ Scan stats: {enforcer.get_scan_stats()}")
+
+def test_process_watcher_blocks_at_launch():
+    from productivity_enforcer import ProductivityEnforcer
+    from process_watcher import FakeProcessWatcher, ProcProcessWatcher
+    print("\n⚡ Testing launch-time process blocking...")
+    clock = VirtualClock()
+    killed = []
+
+    def terminate(pid):
+        clock.advance(0.004)  # A kill takes a few ms
+        killed.append(pid)
+        return True
+
+    enforcer = ProductivityEnforcer()
+    watcher = FakeProcessWatcher(clock=clock)
+    assert enforcer.start_process_watcher(watcher, terminate)
+    watcher.emit(300, 'Code.exe')
+    watcher.emit(301, 'Steam.exe')
+    assert killed == [301]
+    stats = enforcer.get_watcher_stats()
+    assert stats['blocked'] == 1 and stats['running']
+    assert 3.9 <= stats['latency']['max_ms'] <= 4.1
+
+    enforcer.stop_process_watcher()
+    watcher.emit(302, 'discord.exe')  # Stopped: the timed scan takes over
+    assert killed == [301]
+
+    # /proc polling reports PIDs that appeared since the previous poll
+    with tempfile.TemporaryDirectory() as proc_dir:
+        def spawn(pid, name):
+            os.makedirs(os.path.join(proc_dir, str(pid)))
+            with open(os.path.join(proc_dir, str(pid), 'comm'), 'w') as f:
+                f.write(name + '\n')
+
+        seen = []
+        proc_watcher = ProcProcessWatcher(proc_dir=proc_dir, clock=clock)
+        spawn(1, 'init')
+        proc_watcher.prime(lambda pid, name, detected_at: seen.append((pid, name)))
+        spawn(42, 'discord.exe')
+        os.makedirs(os.path.join(proc_dir, 'self'))
+        assert proc_watcher.poll() == 1 and seen == [(42, 'discord.exe')]
+        assert proc_watcher.poll() == 0
+    print(f"✅ Watcher stats: {stats}")
+
+def test_browser_title_cache():
+    from productivity_enforcer import ProductivityEnforcer
+    print("\n🌐 Testing browser title cache...")
+    enforcer = ProductivityEnforcer()
+    notices = []
+    enforcer.show_block_message = lambda title, message: notices.append((title, message))
+
+    windows = [(1, 'main.py - Visual Studio Code'),
+               (2, 'reddit.com - Chrome'),
+               (3, 'NeetCode 150 - youtube.com - Chrome')]
+    stats = enforcer.evaluate_windows(windows)
+    assert stats['last_evaluated'] == 3 and stats['last_blocked'] == 1
+    assert notices == [('Website blocked', 'reddit.com is not allowed during work time')]
+
+    # Unchanged titles reuse their verdict; a retitled window is matched again
+    windows[2] = (3, 'Funny fails compilation - youtube.com - Chrome')
+    stats = enforcer.evaluate_windows(windows)
+    assert stats['last_evaluated'] == 1 and stats['last_skipped'] == 2
+    assert stats['last_blocked'] == 2 and notices[-1][0] == 'YouTube content blocked'
+
+    stats = enforcer.evaluate_windows(windows[:1])  # Other windows closed
+    assert stats['last_windows'] == 1 and stats['last_skipped'] == 1
+    print(f"✅ Browser stats: {stats}")
+
+def test_block_notifications_deduplicated():
+    from notifications import NotificationQueue
+    from productivity_enforcer import ProductivityEnforcer
+    print("\n🔔 Testing block notification queue...")
+    clock = VirtualClock()
+    notifications = NotificationQueue(clock=clock, dedupe_seconds=300, rate_limit=(2, 60))
+    enforcer = ProductivityEnforcer()
+    enforcer.notifications = notifications
+
+    # A tab left open re-triggers every scan but is announced once
+    windows = [(1, 'Funny fails - youtube.com - Chrome')]
+    for _ in range(5):
+        enforcer.evaluate_windows(windows)
+        clock.advance(5)
+    notices = notifications.drain()
+    assert len(notices) == 1 and notices[0]['title'] == 'YouTube content blocked'
+
+    # Different sites pass, up to the rate cap
+    assert notifications.post('reddit.com', 'Website blocked', 'reddit')
+    assert not notifications.post('imgur.com', 'Website blocked', 'imgur')  # 2 in the last minute already
+    clock.advance(60)
+    assert notifications.post('imgur.com', 'Website blocked', 'imgur')
+    clock.advance(300)
+    enforcer.evaluate_windows(windows)  # Dedupe window over: announced again
+    stats = notifications.get_stats()
+    assert stats['posted'] == 4 and stats['deduplicated'] == 4 and stats['rate_limited'] == 1
+    assert [n['key'] for n in notifications.drain()] == ['reddit.com', 'imgur.com', 'Only educational content allowed!']
+
+    # Standalone CLI: the monitor loop drains and shows notices itself
+    clock.advance(300)
+    enforcer.evaluate_windows(windows)
+    shown = []
+    assert enforcer.show_pending_notices(lambda title, message: shown.append(title)) == 1
+    assert shown == ['YouTube content blocked'] and notifications.get_stats()['pending'] == 0
+
+    # Real dialogs all go through one thread, never one Tk interpreter per notice
+    from productivity_enforcer import show_notice_dialog
+    for i in range(3):
+        show_notice_dialog('Website blocked', f'site{i}')
+    assert sum(t.name == 'BlockNotices' for t in threading.enumerate()) == 1
+    print(f"✅ Notification stats: {notifications.get_stats()}")
+
+def test_trend_insights_for_stats_views():
+    from dashboard import trend_insights
+    print("\n💡 Testing trend insights for the Statistics views...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        logger = DataLogger(data_dir=data_dir)
+        today = datetime.now()
+        for offset in range(1, 30):
+            day = logger.get_empty_day_data(today - timedelta(days=offset))
+            day['daily_summary']['total_productive'] = 120
+            with open(logger.get_day_filename(today - timedelta(days=offset)), 'w') as f:
+                json.dump(day, f)
+        trends = TrendAnalyzer(StatsCalculator(logger))
+        assert trends._on_day_closed in logger.day_closed_listeners
+
+        week = trend_insights(trends, 'This Week')
+        print(f"   Week: {week}")
+        assert week[0].startswith('7-day average 2.0h/day vs 28-day 2.0h')
+        assert week[1].startswith('On pace for')
+        assert trend_insights(trends, 'This Year')[0].startswith('On pace for')
+        assert len(trend_insights(trends, 'Today')) >= 1
+
+class FakeCanvas:
+    """Records Canvas calls so item reuse can be checked without a display"""
+
+    def __init__(self, width=400):
+        self.options = {'width': width, 'height': 120}
+        self.items = {}
+        self.calls = []
+
+    def _create(self, *coords, **options):
+        item = len(self.items) + 1
+        self.items[item] = (coords, options)
+        self.calls.append(('create', item))
+        return item
+
+    create_rectangle = create_text = _create
+
+    def coords(self, item, *coords):
+        self.calls.append(('coords', item))
+
+    def itemconfigure(self, item, **options):
+        self.calls.append(('config', item, tuple(sorted(options))))
+
+    def bind(self, *args):
+        pass
+
+    def winfo_width(self):
+        return 1  # Not laid out yet; ChartCanvas falls back to the requested width
+
+    def cget(self, name):
+        return self.options[name]
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def find_all(self):
+        return tuple(self.items)
+
+def test_stats_chart_updates_in_place():
+    from chart_canvas import ChartCanvas
+    print("\n🖼️ Testing retained stats chart items...")
+    canvas = FakeCanvas()
+    chart = ChartCanvas(None, canvas=canvas)
+    rows = [('Building', 120, '#4CAF50', '2.0h'), ('Studying', 60, '#2196F3', '1.0h')]
+
+    chart.draw_bars(rows)
+    assert chart.stats['created'] == 8 and len(canvas.find_all()) == 8
+
+    # Same data again: nothing is created or touched
+    canvas.calls.clear()
+    chart.draw_bars(rows)
+    assert canvas.calls == [] and chart.stats['created'] == 8 and chart.stats['updated'] == 0
+
+    # One value changes: only its bar and value text are updated, in place
+    rows[1] = ('Studying', 90, '#2196F3', '1.5h')
+    chart.draw_bars(rows)
+    assert not [c for c in canvas.calls if c[0] == 'create']
+    touched = {c[1] for c in canvas.calls}
+    assert len(touched) == 2 and chart.stats['updated'] == 2
+
+    # Fewer rows hide the leftovers rather than deleting them
+    chart.draw_bars(rows[:1])
+    assert chart.stats['hidden'] == 4 and len(canvas.find_all()) == 8
+    print(f"✅ Chart stats: {chart.stats}")
+
 if __name__ == "__main__":
     test_basic_functionality()
\ No newline at end of file
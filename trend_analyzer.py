@@ -2,22 +2,108 @@
 Trend Analyzer - Growth tracking and insights
 Analyzes productivity trends over time and provides insights
 """
+import calendar
 from datetime import datetime, timedelta
 from collections import defaultdict
+from result_cache import ResultCache
+from rolling_trends import RollingTrendEngine
+from forecaster import ProductivityForecaster
+from anomaly_detector import StreamingAnomalyDetector
 
 class TrendAnalyzer:
-    def __init__(self, stats_calculator):
+    def __init__(self, stats_calculator, cache_size=32):
         self.stats_calculator = stats_calculator
+        self.clock = stats_calculator.clock
+        self.cache = ResultCache(cache_size)
+        
+        data_logger = stats_calculator.data_logger
+        self.rolling_engine = RollingTrendEngine(data_logger.data_dir, clock=self.clock)
+        self.forecaster = ProductivityForecaster(data_logger, clock=self.clock)
+        self.anomaly_detector = StreamingAnomalyDetector(data_logger.data_dir, clock=self.clock)
+        data_logger.add_day_closed_listener(self._on_day_closed)
+    
+    def _on_day_closed(self, day_data):
+        """Fold a finished day into the incremental trend engines"""
+        # Days between the last ingested one and this one (app not running) come from disk first
+        data_logger = self.stats_calculator.data_logger
+        day_before = datetime.strptime(day_data['date'], '%Y-%m-%d') - timedelta(days=1)
+        self.rolling_engine.catch_up(data_logger, until=day_before)
+        self.rolling_engine.ingest_day(day_data['date'], day_data['daily_summary'])
+        self.anomaly_detector.catch_up(data_logger, until=day_before)
+        self.anomaly_detector.ingest_day(day_data)
+    
+    def _memoize(self, name, args, compute):
+        """Reuse a trend result for today until the stored data changes"""
+        key = (name, args, self.clock.now().strftime('%Y-%m-%d'))
+        return self.cache.get_or_compute(key, self.stats_calculator.data_logger.data_version, compute)
+    
+    def get_cache_stats(self):
+        """Get memoization hit/miss counters"""
+        return self.cache.get_stats()
     
+    # ---------------- Shared windows ----------------
+    def _week_starts(self, weeks_back):
+        """Mondays of this week and the previous weeks, newest first"""
+        today = self.clock.now()
+        monday = datetime(today.year, today.month, today.day) - timedelta(days=today.weekday())
+        return [monday - timedelta(days=7 * i) for i in range(weeks_back)]
+    
+    def _month_targets(self, months_back):
+        """(year, month) for this month and the previous months, newest first"""
+        current_date = self.clock.now()
+        targets = []
+        
+        for i in range(months_back):
+            target_month = current_date.month - i
+            target_year = current_date.year
+            
+            while target_month <= 0:
+                target_month += 12
+                target_year -= 1
+            
+            targets.append((target_year, target_month))
+        
+        return targets
+    
+    def _plan_windows(self, weeks_back=0, months_back=0):
+        """List every (first_day, last_day) window the requested trends need"""
+        windows = [(start, start + timedelta(days=6)) for start in self._week_starts(weeks_back)]
+        for year, month in self._month_targets(months_back):
+            last_day = calendar.monthrange(year, month)[1]
+            windows.append((datetime(year, month, 1), datetime(year, month, last_day)))
+        return windows
+    
+    def _load_shared_slice(self, windows):
+        """Load the union of all windows once, keyed by date"""
+        if not windows:
+            return {}
+        start = min(first for first, _ in windows)
+        end = max(last for _, last in windows)
+        days = self.stats_calculator.data_logger.get_range_data(start, end)
+        return {day['date']: day for day in days}
+    
+    def _window_days(self, days_by_date, first_day, last_day):
+        """Days of one window taken from the shared slice"""
+        return [days_by_date[(first_day + timedelta(days=i)).strftime('%Y-%m-%d')]
+                for i in range((last_day - first_day).days + 1)]
+    
+    # ---------------- Trends ----------------
     def analyze_weekly_trends(self, weeks_back=4):
         """Analyze trends over the last few weeks"""
+        return self._memoize('weekly_trends', (weeks_back,), lambda: self._compute_weekly_trends(weeks_back))
+    
+    def _compute_weekly_trends(self, weeks_back):
+        """Compute weekly trends with a single load of all weeks"""
+        days = self._load_shared_slice(self._plan_windows(weeks_back=weeks_back))
+        return self._weekly_trends_from(days, weeks_back)
+    
+    def _weekly_trends_from(self, days, weeks_back):
+        """Build weekly trends from a shared in-memory slice"""
         trends = []
-        current_date = datetime.now()
         
-        for i in range(weeks_back):
-            # Get Monday of each week
-            week_start = current_date - timedelta(days=current_date.weekday() + (i * 7))
-            week_stats = self.stats_calculator.calculate_weekly_stats(week_start)
+        for week_start in self._week_starts(weeks_back):
+            week_days = self._window_days(days, week_start, week_start + timedelta(days=6))
+            week_stats = self.stats_calculator.summarize_week(week_days)
             
             trends.append({
                 'week_start': week_start.strftime('%Y-%m-%d'),
@@ -48,19 +134,22 @@ class TrendAnalyzer:
     
     def analyze_monthly_trends(self, months_back=6):
         """Analyze trends over the last few months"""
+        return self._memoize('monthly_trends', (months_back,), lambda: self._compute_monthly_trends(months_back))
+    
+    def _compute_monthly_trends(self, months_back):
+        """Compute monthly trends with a single load of all months"""
+        days = self._load_shared_slice(self._plan_windows(months_back=months_back))
+        return self._monthly_trends_from(days, months_back)
+    
+    def _monthly_trends_from(self, days, months_back):
+        """Build monthly trends from a shared in-memory slice"""
         trends = []
-        current_date = datetime.now()
         
-        for i in range(months_back):
-            # Calculate target month/year
-            target_month = current_date.month - i
-            target_year = current_date.year
-            
-            while target_month <= 0:
-                target_month += 12
-                target_year -= 1
-            
-            month_stats = self.stats_calculator.calculate_monthly_stats(target_year, target_month)
+        for target_year, target_month in self._month_targets(months_back):
+            last_day = calendar.monthrange(target_year, target_month)[1]
+            month_days = self._window_days(days, datetime(target_year, target_month, 1),
+                                           datetime(target_year, target_month, last_day))
+            month_stats = self.stats_calculator.summarize_month(month_days)
             
             trends.append({
                 'month': f"{target_year}-{target_month:02d}",
@@ -127,10 +216,15 @@ class TrendAnalyzer:
     
     def get_productivity_insights(self):
         """Generate insights about productivity patterns"""
+        return self._memoize('insights', (), self._compute_productivity_insights)
+    
+    def _compute_productivity_insights(self):
+        """Compute insights from one shared load of every window they need"""
         insights = []
+        days = self._load_shared_slice(self._plan_windows(weeks_back=4, months_back=3))
         
         # Weekly trends
-        weekly_trends = self.analyze_weekly_trends(4)
+        weekly_trends = self._weekly_trends_from(days, 4)
         if 'growth_percentage' in weekly_trends:
             if weekly_trends['growth_percentage'] > 10:
                 insights.append(f"📈 Great progress! Up {weekly_trends['growth_percentage']}% from last week")
@@ -143,8 +237,11 @@ class TrendAnalyzer:
             if category_info['improvement'] > 20:
                 insights.append(f"🚀 {category_info['category']} time up {category_info['improvement']}%!")
         
+        # Anomalies flagged as recent days closed
+        insights.extend(self._anomaly_insights())
+        
         # Monthly trends
-        monthly_trends = self.analyze_monthly_trends(3)
+        monthly_trends = self._monthly_trends_from(days, 3)
         if monthly_trends['consistency_trend'] == 'improving':
             insights.append("⭐ Your consistency is improving month over month")
         elif monthly_trends['consistency_trend'] == 'declining':
@@ -156,13 +253,32 @@ class TrendAnalyzer:
         
         return insights[:3]  # Return top 3 insights
     
+    def get_anomalies(self, days=7):
+        """Unusual days flagged by the streaming detector"""
+        self.anomaly_detector.catch_up(self.stats_calculator.data_logger)
+        return self.anomaly_detector.get_recent_flags(days)
+    
+    def _anomaly_insights(self):
+        """Turn recent anomaly flags into insight lines"""
+        insights = []
+        for flag in reversed(self.get_anomalies(days=3)):
+            day = datetime.strptime(flag['date'], '%Y-%m-%d').strftime('%a %m/%d')
+            if flag['series'] == 'total_productive':
+                insights.append(f"🔍 Unusually low focus on {day}: {flag['value'] / 60:.1f}h vs typical {flag['median'] / 60:.1f}h")
+            elif flag['series'] == 'pseudo_productive':
+                insights.append(f"⚠️ Pseudo-productive spike on {day}: {flag['value'] / 60:.1f}h vs typical {flag['median'] / 60:.1f}h")
+        return insights[:1]
+    
     def get_weekly_comparison(self):
         """Compare this week to last week"""
-        current_week = self.stats_calculator.calculate_weekly_stats()
-        
-        # Get last week's stats
-        last_monday = datetime.now() - timedelta(days=datetime.now().weekday() + 7)
-        last_week = self.stats_calculator.calculate_weekly_stats(last_monday)
+        return self._memoize('weekly_comparison', (), self._compute_weekly_comparison)
+    
+    def _compute_weekly_comparison(self):
+        """Compute this week vs last week from one two-week load"""
+        this_monday, last_monday = self._week_starts(2)
+        days = self._load_shared_slice(self._plan_windows(weeks_back=2))
+        current_week = self.stats_calculator.summarize_week(self._window_days(days, this_monday, this_monday + timedelta(days=6)))
+        last_week = self.stats_calculator.summarize_week(self._window_days(days, last_monday, last_monday + timedelta(days=6)))
         
         comparison = {}
         
@@ -184,26 +300,35 @@ class TrendAnalyzer:
         
         return comparison
     
-    def predict_monthly_total(self):
-        """Predict end-of-month total based on current pace"""
-        today = datetime.now()
-        days_in_month = (datetime(today.year, today.month + 1, 1) - timedelta(days=1)).day if today.month < 12 else 31
-        days_elapsed = today.day
-        days_remaining = days_in_month - days_elapsed
-        
-        # Get current month's data
-        monthly_stats = self.stats_calculator.calculate_monthly_stats()
-        current_total = monthly_stats['totals']['total_productive'] / 60  # Convert to hours
-        
-        if days_elapsed > 0:
-            daily_average = current_total / days_elapsed
-            predicted_total = current_total + (daily_average * days_remaining)
-            
-            return {
-                'current_total': round(current_total, 1),
-                'predicted_total': round(predicted_total, 1),
-                'daily_average': round(daily_average, 1),
-                'days_remaining': days_remaining
-            }
+    def get_rolling_trends(self):
+        """7/28/90-day moving sums, averages and EWMAs per category"""
+        self.rolling_engine.catch_up(self.stats_calculator.data_logger)
+        return self.rolling_engine.get_snapshot()
+    
+    def get_rolling_momentum(self, series='total_productive'):
+        """Compare the 7-day average against the 28-day baseline"""
+        windows = self.get_rolling_trends()['windows']
+        recent = windows[7][series]['daily_average_hours']
+        baseline = windows[28][series]['daily_average_hours']
+        change = ((recent - baseline) / baseline * 100) if baseline > 0 else 0
         
-        return None
\ No newline at end of file
+        return {
+            'series': series,
+            'recent_daily_hours': recent,
+            'baseline_daily_hours': baseline,
+            'ewma_daily_hours': windows[7][series]['ewma_hours'],
+            'change_percentage': round(change, 1),
+            'direction': 'up' if change > 5 else 'down' if change < -5 else 'stable'
+        }
+    
+    def predict_monthly_total(self):
+        """Predict end-of-month total from the weekday-aware forecast"""
+        return self.forecaster.forecast_month()
+    
+    def get_forecasts(self):
+        """End-of-week, end-of-month and end-of-year projections with 95% intervals"""
+        return {
+            'week': self.forecaster.forecast_week(),
+            'month': self.forecaster.forecast_month(),
+            'year': self.forecaster.forecast_year()
+        }